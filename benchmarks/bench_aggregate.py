@@ -0,0 +1,41 @@
+"""Full model versus staff-class aggregation on stores with interchangeable staff.
+
+Instances are generated with ``num_profiles`` staff profiles, so staff
+sharing a profile are identical for the model.  Run from the repository
+root::
+
+    python -m benchmarks.bench_aggregate
+"""
+
+import time
+
+from shift_optimizer import ShiftSchedulingModel
+from shift_optimizer.generator import generate_instance
+
+CASES = ((100, 8), (300, 12), (1000, 20))
+TIME_LIMIT = 300
+
+
+def solve(data, aggregate: bool):
+    model = ShiftSchedulingModel(data, backend="matrix", sparse=True, aggregate=aggregate)
+    model.build()
+    start = time.perf_counter()
+    model.solve(msg=False, time_limit=TIME_LIMIT)
+    seconds = time.perf_counter() - start
+    return seconds, float(model.results()[2]["ObjectiveValue"].iloc[0]), model.metrics.solver
+
+
+def main() -> None:
+    print(f"{'staff':>6} {'profiles':>8} {'full [s]':>9} {'agg [s]':>8} {'speedup':>8} {'classes':>8} {'obj diff':>9}")
+    for num_staff, num_profiles in CASES:
+        data = generate_instance(num_staff, num_profiles=num_profiles)
+        t_full, obj_full, _ = solve(data, False)
+        t_agg, obj_agg, stats = solve(data, True)
+        print(
+            f"{num_staff:>6} {num_profiles:>8} {t_full:>9.2f} {t_agg:>8.2f} {t_full / t_agg:>7.0f}x "
+            f"{stats.get('classes', '-'):>8} {(obj_agg - obj_full) / abs(obj_full):>9.2e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Time to a usable schedule with anytime solving versus a blocking solve.
+
+For each size a plain ``solve`` is timed, then ``iter_incumbents`` with
+CBC (matrix backend, greedy warm start) at a few snapshot intervals.  The
+table shows when the first schedule and the first schedule within 1% and
+0.1% of the blocking optimum were available, the total time and the final
+objective relative to the blocking solve.  Run from the repository root::
+
+    python -m benchmarks.bench_anytime
+    python -m benchmarks.bench_anytime --sizes 1000x1 --intervals 30 60
+"""
+
+import argparse
+import time
+from typing import List, Optional
+
+from shift_optimizer import ShiftSchedulingModel
+
+from .common import make_input
+
+
+def _first(times: List[tuple], objective: float, within: float) -> str:
+    for elapsed, value in times:
+        if value <= objective + within * abs(objective):
+            return f"{elapsed:.2f}"
+    return "-"
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare anytime solving with a blocking solve")
+    parser.add_argument("--sizes", nargs="+", default=["100x1", "300x1"], help="STAFFxWEEKS")
+    parser.add_argument("--intervals", nargs="+", type=float, default=[1.0, 5.0], help="Snapshot intervals [s]")
+    parser.add_argument("--time-limit", type=int, default=300, help="Time limit per solve in seconds")
+    args = parser.parse_args(argv)
+
+    print(
+        f"{'size':>7} {'mode':>14} {'first [s]':>10} {'1% [s]':>8} {'0.1% [s]':>9} "
+        f"{'total [s]':>10} {'vs solve':>9} {'restarts':>9}"
+    )
+    for size in args.sizes:
+        num_staff, _, num_weeks = size.partition("x")
+        data = make_input(int(num_staff), int(num_weeks or 1))
+        model = ShiftSchedulingModel(data, backend="matrix", sparse=True)
+        model.build()
+        start = time.perf_counter()
+        model.solve(msg=False, time_limit=args.time_limit, warm_start=True)
+        total = time.perf_counter() - start
+        best = model.matrix.objective_value()
+        print(f"{size:>7} {'solve':>14} {total:>10.2f} {total:>8.2f} {total:>9.2f} {total:>10.2f} {0:>9.1e} {'-':>9}")
+
+        for interval in args.intervals:
+            model = ShiftSchedulingModel(data, backend="matrix", sparse=True)
+            model.build()
+            start = time.perf_counter()
+            schedules = [
+                (time.perf_counter() - start, incumbent.objective)
+                for incumbent in model.iter_incumbents(
+                    time_limit=args.time_limit, snapshot_interval=interval, warm_start=True
+                )
+                if incumbent.assign is not None
+            ]
+            total = time.perf_counter() - start
+            final = model.matrix.objective_value()
+            print(
+                f"{size:>7} {f'anytime {interval:g}s':>14} {_first(schedules, best, float('inf')):>10} "
+                f"{_first(schedules, best, 0.01):>8} {_first(schedules, best, 0.001):>9} {total:>10.2f} "
+                f"{(final - best) / abs(best):>9.1e} {model.metrics.solver.get('restarts', '-'):>9}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""``shift-optimizer batch`` versus one CLI process per store.
+
+Writes ``--stores`` generated workbooks to a temporary directory and
+solves them once with a CLI call per store, as a shell loop would, and
+once with the ``batch`` subcommand.  Run from the repository root::
+
+    python -m benchmarks.bench_batch
+    python -m benchmarks.bench_batch --stores 24 --staff 100
+"""
+
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from shift_optimizer.generator import generate_instance, write_instance
+
+
+def cli(*args: str) -> None:
+    subprocess.run([sys.executable, "-m", "shift_optimizer.cli", *args], check=True, capture_output=True)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare batch solving with one CLI call per store")
+    parser.add_argument("--stores", type=int, default=12, help="Number of store workbooks")
+    parser.add_argument("--staff", type=int, default=30, help="Staff per store")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        inputs = Path(tmp, "inputs")
+        inputs.mkdir()
+        for seed in range(args.stores):
+            write_instance(generate_instance(args.staff, seed=seed), inputs / f"store{seed:03d}.xlsx")
+
+        start = time.perf_counter()
+        for path in sorted(inputs.iterdir()):
+            cli("--input", str(path), "--output", str(Path(tmp, f"{path.stem}_out.xlsx")), "--no-cache")
+        t_loop = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cli("batch", str(inputs), "--output-dir", str(Path(tmp, "batch")))
+        t_batch = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cli("batch", str(inputs), "--output-dir", str(Path(tmp, "batch")))
+        t_resume = time.perf_counter() - start
+
+    print(f"{args.stores} stores x {args.staff} staff")
+    print(f"CLI per store: {t_loop:8.2f} s")
+    print(f"batch:         {t_batch:8.2f} s ({t_loop / t_batch:.1f}x)")
+    print(f"batch resumed: {t_resume:8.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Memory of the raw input tables versus ``InputData.compact``.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_compact_input
+"""
+
+import numpy as np
+
+from .common import best_of, make_input
+
+
+def frame_bytes(data) -> int:
+    tables = (data.staff, data.availability, data.demand)
+    return sum(int(table.memory_usage(deep=True).sum()) for table in tables)
+
+
+def compact_bytes(compact) -> int:
+    arrays = [value for value in vars(compact).values() if isinstance(value, np.ndarray)]
+    return sum(array.nbytes for array in arrays) + int(compact.staff_ids.memory_usage(deep=True))
+
+
+def main() -> None:
+    print(f"{'staff':>6} {'weeks':>6} {'tables [MB]':>12} {'compact [MB]':>13} {'build [s]':>10}")
+    for num_staff, num_weeks in ((30, 1), (300, 1), (300, 4), (1000, 4)):
+        data = make_input(num_staff, num_weeks)
+        t_build, compact = best_of(lambda: (data.invalidate(), data.compact)[1])
+        print(
+            f"{num_staff:>6} {num_weeks:>6} {frame_bytes(data) / 2**20:>12.2f} "
+            f"{compact_bytes(compact) / 2**20:>13.2f} {t_build:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
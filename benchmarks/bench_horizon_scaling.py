@@ -0,0 +1,31 @@
+"""Measure how model build time grows with the planning horizon.
+
+Build time should grow linearly with the number of weeks, i.e. the time per
+(staff, slot) cell should stay roughly flat.  Run from the repository root::
+
+    python -m benchmarks.bench_horizon_scaling
+"""
+
+import time
+
+from shift_optimizer import ShiftSchedulingModel
+
+from .common import make_input
+
+NUM_STAFF = 100
+
+
+def main() -> None:
+    print(f"{'weeks':>6} {'slots':>6} {'build [s]':>10} {'us / cell':>10}")
+    for num_weeks in (1, 4, 8):
+        data = make_input(NUM_STAFF, num_weeks)
+        model = ShiftSchedulingModel(data)
+        start = time.perf_counter()
+        model.build()
+        elapsed = time.perf_counter() - start
+        cells = NUM_STAFF * len(data.demand)
+        print(f"{num_weeks:>6} {len(data.demand):>6} {elapsed:>10.3f} {1e6 * elapsed / cells:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Compare a single-cell what-if re-solve against a full rebuild.
+
+``update`` is the time to apply the edit to the live model, ``build`` the
+time a full rebuild spends before calling CBC.  Both re-solves run CBC
+from scratch, so ``resolve`` only saves ``build`` and CBC run-to-run
+variance can hide it.  Run from the repository root::
+
+    python -m benchmarks.bench_incremental
+"""
+
+import time
+
+from shift_optimizer import ShiftSchedulingModel
+
+from .common import make_input
+
+NUM_STAFF = 300
+
+
+def full_run(data, backend: str):
+    start = time.perf_counter()
+    model = ShiftSchedulingModel(data, backend=backend)
+    model.build()
+    t_build = time.perf_counter() - start
+    model.solve(msg=False)
+    return t_build, time.perf_counter() - start
+
+
+def main() -> None:
+    print(
+        f"{'backend':>8} {'edit':>13} {'build [s]':>10} {'rebuild [s]':>12} "
+        f"{'update [ms]':>12} {'resolve [s]':>12}"
+    )
+    for backend in ("pulp", "matrix"):
+        data = make_input(NUM_STAFF)
+        model = ShiftSchedulingModel(data, backend=backend)
+        model.build()
+        model.solve(msg=False)
+        sid, date, slot = model.results()[0].iloc[0][["StaffID", "Date", "Slot"]]
+        required = model.req[(date, slot)]
+
+        edits = {
+            "availability": lambda: model.set_availability(sid, date, slot, "NG"),
+            "demand": lambda: model.set_demand(date, slot, required + 1),
+        }
+        for name, apply_edit in edits.items():
+            start = time.perf_counter()
+            apply_edit()
+            t_update = time.perf_counter() - start
+            model.resolve(msg=False)
+            t_resolve = time.perf_counter() - start
+            t_build, t_full = full_run(model.data, backend)
+            print(
+                f"{backend:>8} {name:>13} {t_build:>10.2f} {t_full:>12.2f} "
+                f"{1e3 * t_update:>12.2f} {t_resolve:>12.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Compare model assembly time of the ``pulp`` and ``matrix`` backends.
+
+Both backends must write byte-identical MPS files, so the solve itself is
+not repeated here.  Run from the repository root::
+
+    python -m benchmarks.bench_matrix_backend
+"""
+
+import filecmp
+import os
+import tempfile
+import time
+
+from shift_optimizer import ShiftSchedulingModel
+
+from .common import make_input
+
+
+def build_and_write(data, backend: str, path: str) -> float:
+    start = time.perf_counter()
+    model = ShiftSchedulingModel(data, backend=backend)
+    model.build()
+    if backend == "matrix":
+        model.matrix.write_mps(path)
+    else:
+        model.problem.writeMPS(path, rename=1)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    print(f"{'staff':>6} {'weeks':>6} {'pulp [s]':>9} {'matrix [s]':>11} {'speedup':>8} {'same MPS':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        pulp_mps, matrix_mps = os.path.join(tmp, "pulp.mps"), os.path.join(tmp, "matrix.mps")
+        for num_staff, num_weeks in ((30, 1), (100, 4), (500, 4)):
+            data = make_input(num_staff, num_weeks)
+            t_pulp = build_and_write(data, "pulp", pulp_mps)
+            t_matrix = build_and_write(data, "matrix", matrix_mps)
+            same = filecmp.cmp(pulp_mps, matrix_mps, shallow=False)
+            print(f"{num_staff:>6} {num_weeks:>6} {t_pulp:>9.2f} {t_matrix:>11.2f} {t_pulp / t_matrix:>7.1f}x {same!s:>9}")
+
+
+if __name__ == "__main__":
+    main()
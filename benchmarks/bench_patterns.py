@@ -0,0 +1,54 @@
+"""Compact MILP versus the column-generation pattern engine.
+
+For each size the table shows both solve times, the pattern engine's
+objective relative to the compact optimum, its gap to the converged LP
+bound and the number of generated patterns.  Run from the repository
+root::
+
+    python -m benchmarks.bench_patterns
+    python -m benchmarks.bench_patterns --sizes 300x1 1000x1 --time-limit 600
+"""
+
+import argparse
+import time
+from typing import List, Optional
+
+from shift_optimizer import ShiftSchedulingModel
+
+from .common import make_input
+
+
+def solve(data, engine: str, time_limit: int):
+    model = ShiftSchedulingModel(data, backend="matrix", sparse=True, engine=engine)
+    model.build()
+    start = time.perf_counter()
+    model.solve(msg=False, time_limit=time_limit)
+    seconds = time.perf_counter() - start
+    return seconds, float(model.results()[2]["ObjectiveValue"].iloc[0]), model.metrics.solver
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare the compact and pattern engines")
+    parser.add_argument("--sizes", nargs="+", default=["100x1", "300x1", "1000x1"], help="STAFFxWEEKS")
+    parser.add_argument("--time-limit", type=int, default=300, help="Time limit per solve in seconds")
+    args = parser.parse_args(argv)
+
+    print(
+        f"{'size':>7} {'compact [s]':>12} {'patterns [s]':>13} {'speedup':>8} "
+        f"{'vs compact':>11} {'LP gap':>9} {'patterns':>9}"
+    )
+    for size in args.sizes:
+        num_staff, _, num_weeks = size.partition("x")
+        data = make_input(int(num_staff), int(num_weeks or 1))
+        t_compact, obj_compact, _ = solve(data, "compact", args.time_limit)
+        t_patterns, obj_patterns, stats = solve(data, "patterns", args.time_limit)
+        gap = stats.get("gap")
+        print(
+            f"{size:>7} {t_compact:>12.2f} {t_patterns:>13.2f} {t_compact / t_patterns:>7.1f}x "
+            f"{(obj_patterns - obj_compact) / abs(obj_compact):>11.2e} "
+            f"{'-' if gap is None else f'{gap:.2e}':>9} {stats.get('patterns', '-'):>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Compare the vectorized ``_prepare_parameters`` against the old per-row loops.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_prepare_parameters
+"""
+
+from datetime import datetime
+
+from shift_optimizer import ShiftSchedulingModel
+
+from .common import best_of, make_input
+
+SLOT_HOURS = 4
+
+
+def legacy_prepare_parameters(model: ShiftSchedulingModel) -> None:
+    """The original dict-based implementation, kept for comparison."""
+    staff_df = model.data.staff
+    avail_df = model.data.availability
+    demand_df = model.data.demand
+    wages_row = model.data.wages
+
+    model.staff_ids = list(staff_df["StaffID"])
+    model.slot_keys = [(row.Date, row.Slot) for row in demand_df.itertuples()]
+    model.req = demand_df.set_index(["Date", "Slot"]).RequiredCnt.to_dict()
+    model.avail_ok = {
+        (r.StaffID, r.Date, r.Slot): 1 if r.Availability in ("OK", "Wish") else 0 for r in avail_df.itertuples()
+    }
+    model.wish = {(r.StaffID, r.Date, r.Slot): 1 if r.Availability == "Wish" else 0 for r in avail_df.itertuples()}
+    model.cost = {}
+    for sid in model.staff_ids:
+        base = int(staff_df.loc[staff_df.StaffID == sid, "HourlyWage"].values[0])
+        for date, slot in model.slot_keys:
+            dt = datetime.strptime(date, "%Y-%m-%d")
+            mult = 1.0
+            if slot == "22-26":
+                mult *= wages_row["NightRate"]
+            if dt.weekday() == 6:
+                mult *= wages_row["HolidayRate"]
+            model.cost[(sid, date, slot)] = int(base * SLOT_HOURS * mult)
+    model.dates_unique = avail_df["Date"].unique()
+
+
+def main() -> None:
+    print(f"{'staff':>6} {'legacy [s]':>11} {'vectorized [s]':>15} {'speedup':>8}")
+    for num_staff in (30, 300, 1000):
+        data = make_input(num_staff)
+        old = ShiftSchedulingModel(data)
+        new = ShiftSchedulingModel(data)
+        t_old, _ = best_of(lambda: legacy_prepare_parameters(old))
+        # include validating and compacting the input tables
+        t_new, _ = best_of(lambda: (data.invalidate(), new._prepare_parameters()))
+        assert old.cost == new.cost
+        assert all(new.avail_ok[k] == old.avail_ok.get(k, 0) for k in new.avail_ok)
+        assert all(new.wish[k] == old.wish.get(k, 0) for k in new.wish)
+        print(f"{num_staff:>6} {t_old:>11.4f} {t_new:>15.4f} {t_old / t_new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
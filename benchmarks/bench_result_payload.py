@@ -0,0 +1,52 @@
+"""Browser payload of Dash results: whole frames as JSON versus one page.
+
+Before results were kept server-side, the result Store carried every
+table and the raw inputs as JSON and the schedule was rendered in full.
+Now the Store holds the job id and each table sends one page of records.
+Run from the repository root::
+
+    python -m benchmarks.bench_result_payload
+"""
+
+import json
+
+from shift_optimizer.result_store import PAGE_SIZE, query_table
+
+from .common import best_of, make_input
+
+SIZES = ((30, 1), (300, 4), (1000, 4))
+
+
+def main() -> None:
+    print(f"{'size':>8} {'rows':>8} {'old [KiB]':>10} {'page [KiB]':>11} {'filter+sort+page [ms]':>22}")
+    for num_staff, num_weeks in SIZES:
+        data = make_input(num_staff, num_weeks)
+        # every feasible cell assigned: an upper bound on the schedule size
+        schedule = data.availability.loc[data.availability["Availability"] != "NG", ["StaffID", "Date", "Slot"]]
+        schedule = schedule.assign(Assigned=1).reset_index(drop=True)
+        old = {
+            "schedule": schedule.to_json(orient="split"),
+            "availability": data.availability.to_json(orient="split"),
+            "demand": data.demand.to_json(orient="split"),
+        }
+        old_bytes = len(json.dumps(old)) + len(json.dumps(schedule.to_dict("records")))
+
+        page, _ = query_table(schedule)
+        new_bytes = len(json.dumps({"id": "0" * 32})) + len(json.dumps(page.to_dict("records")))
+        seconds, _ = best_of(
+            lambda: query_table(
+                schedule,
+                filter_query="{StaffID} contains S00 && {Slot} = 18-22",
+                sort_by=[{"column_id": "Date", "direction": "desc"}],
+                page=3,
+            )
+        )
+        print(
+            f"{num_staff:>4}x{num_weeks:<3} {len(schedule):>8} {old_bytes / 1024:>10.0f} "
+            f"{new_bytes / 1024:>11.1f} {1000 * seconds:>22.1f}"
+        )
+    print(f"(page size {PAGE_SIZE})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Time of ``results()`` and of writing the result tables in each format.
+
+Uses the greedy schedule so large instances need no CBC run.  The export
+columns give wall time and tracemalloc peak memory.  Run from the
+repository root::
+
+    python -m benchmarks.bench_results_export
+"""
+
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Tuple
+
+from shift_optimizer import ShiftSchedulingModel, export_results, schedule_grid
+from shift_optimizer.data import _parquet_available
+
+from .common import best_of, make_input
+
+FORMATS = {
+    "xlsx": {"suffix": ".xlsx"},
+    "xlsx-cm": {"suffix": ".xlsx", "constant_memory": True},
+    "csv": {"suffix": ".csv"},
+    "json": {"suffix": ".json"},
+    "parquet": {"suffix": ".parquet"},
+}
+
+
+def time_export(tables, path: str, constant_memory: bool) -> Tuple[float, float]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    export_results(tables, path, constant_memory=constant_memory)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak / 2**20
+
+
+def main() -> None:
+    formats = [name for name in FORMATS if name != "parquet" or _parquet_available()]
+    header = " ".join(f"{name + ' [s/MB]':>16}" for name in formats)
+    print(f"{'staff':>6} {'weeks':>6} {'results [s]':>12} {'grid [s]':>9} {header}")
+    for num_staff, num_weeks in ((30, 1), (300, 4), (1000, 4)):
+        data = make_input(num_staff, num_weeks)
+        model = ShiftSchedulingModel(data)
+        model.solve_heuristic()
+        t_results, (schedule_df, hours_df, kpi_df) = best_of(model.results)
+        t_grid, grid_df = best_of(lambda: schedule_grid(schedule_df, data))
+        tables = {"Schedule": schedule_df, "Hours": hours_df, "KPI": kpi_df, "Grid": grid_df}
+
+        cells = []
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in formats:
+                options = FORMATS[name]
+                path = os.path.join(tmp, f"out_{name}{options['suffix']}")
+                seconds, peak = time_export(tables, path, options.get("constant_memory", False))
+                cells.append(f"{f'{seconds:.2f}/{peak:.1f}':>16}")
+        print(f"{num_staff:>6} {num_weeks:>6} {t_results:>12.4f} {t_grid:>9.4f} " + " ".join(cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Load test of ``shift-optimizer serve`` against one cold CLI call per request.
+
+Writes ``--inputs`` generated workbooks, starts the service in a
+subprocess and sends ``--requests`` solve requests from ``--concurrency``
+client threads, each submitting a job and long-polling its result.  Every
+request uses its own fairness weight so none is answered from the result
+cache; a second round repeats the same requests to show the cached path.
+The same number of requests is then run as sequential CLI calls with
+``--no-cache``.  Reports p50/p99 latency and throughput of each.  Run from
+the repository root::
+
+    python -m benchmarks.bench_service
+    python -m benchmarks.bench_service --staff 50 --requests 100 --concurrency 8
+"""
+
+import argparse
+import json
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from shift_optimizer.generator import generate_instance, write_instance
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def call(url: str, body: Optional[dict] = None) -> dict:
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+def wait_until_up(base: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            call(f"{base}/health")
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+def service_request(base: str, body: dict) -> float:
+    start = time.perf_counter()
+    job = call(f"{base}/jobs", body)
+    result = call(f"{base}/jobs/{job['id']}/result?wait=300")
+    if "Schedule" not in result:
+        raise RuntimeError(f"Job {job['id']} finished as {result['status']}: {result.get('error')}")
+    return time.perf_counter() - start
+
+
+def load(base: str, bodies: List[dict], concurrency: int) -> Tuple[np.ndarray, float]:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        latencies = list(pool.map(lambda body: service_request(base, body), bodies))
+    return np.array(latencies), time.perf_counter() - start
+
+
+def cold_cli(paths: List[Path], runs: int, output: Path) -> Tuple[np.ndarray, float]:
+    latencies = []
+    start = time.perf_counter()
+    for i in range(runs):
+        command = [sys.executable, "-m", "shift_optimizer.cli", "--input", str(paths[i % len(paths)])]
+        command += ["--output", str(output), "--no-cache", "--w-fair", f"{1 + i / 1000:.3f}"]
+        begin = time.perf_counter()
+        subprocess.run(command, check=True, capture_output=True)
+        latencies.append(time.perf_counter() - begin)
+    return np.array(latencies), time.perf_counter() - start
+
+
+def report(name: str, latencies: np.ndarray, total: float) -> None:
+    p50, p99 = np.percentile(latencies, [50, 99])
+    print(f"{name:<16} {p50:8.3f} {p99:8.3f} {len(latencies) / total:10.2f}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Load-test the optimizer service against the cold CLI")
+    parser.add_argument("--staff", type=int, default=20, help="Staff per generated store")
+    parser.add_argument("--inputs", type=int, default=4, help="Number of distinct store workbooks")
+    parser.add_argument("--requests", type=int, default=40, help="Requests sent to the service")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent client threads")
+    parser.add_argument("--workers", type=int, help="Service solver threads (default: CPU count)")
+    parser.add_argument("--cli-runs", type=int, default=10, help="Sequential cold CLI calls")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [Path(tmp, f"store{seed:03d}.xlsx") for seed in range(args.inputs)]
+        for seed, path in enumerate(paths):
+            write_instance(generate_instance(args.staff, seed=seed), path)
+        bodies = [
+            {"input": str(paths[i % len(paths)]), "w_fair": 1 + i / 1000} for i in range(args.requests)
+        ]
+
+        port = free_port()
+        command = [sys.executable, "-m", "shift_optimizer.cli", "serve", "--port", str(port)]
+        if args.workers:
+            command += ["--workers", str(args.workers)]
+        server = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+        base = f"http://127.0.0.1:{port}"
+        try:
+            start = time.perf_counter()
+            wait_until_up(base)
+            t_startup = time.perf_counter() - start
+            unique = load(base, bodies, args.concurrency)
+            repeated = load(base, bodies, args.concurrency)
+            stats = call(f"{base}/health")
+        finally:
+            server.terminate()
+            server.wait()
+        cli = cold_cli(paths, args.cli_runs, Path(tmp, "out.json"))
+
+    print(f"{args.requests} requests over {args.inputs} stores x {args.staff} staff, concurrency {args.concurrency}")
+    print(f"service startup: {t_startup:.2f} s; {stats['solves']} solves in {stats['batches']} batches")
+    print(f"{'':<16} {'p50 [s]':>8} {'p99 [s]':>8} {'req/s':>10}")
+    report("cold CLI", *cli)
+    report("service", *unique)
+    report("service cached", *repeated)
+
+
+if __name__ == "__main__":
+    main()
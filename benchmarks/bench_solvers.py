@@ -0,0 +1,75 @@
+"""Time-to-quality of the available solvers.
+
+Every solver is run with increasing time limits on generated instances;
+the table shows the wall time, the objective relative to the best one
+found by any run and the gap the solver reports.  Run from the repository
+root::
+
+    python -m benchmarks.bench_solvers
+    python -m benchmarks.bench_solvers --sizes 100x1 300x1 --limits 5 30 --threads 1 8
+"""
+
+import argparse
+import time
+from typing import List, Optional
+
+import pulp
+
+from shift_optimizer import ShiftSchedulingModel
+from shift_optimizer.metrics import ModelMetrics
+from shift_optimizer.solvers import available_solvers
+
+from .common import make_input
+
+
+def run(data, solver: str, time_limit: int, threads: Optional[int]) -> dict:
+    # profiling parses the CBC log, which is where CBC reports its gap
+    metrics = ModelMetrics(profile=solver == "cbc")
+    model = ShiftSchedulingModel(data, backend="matrix", solver=solver, threads=threads, metrics=metrics)
+    model.build()
+    start = time.perf_counter()
+    model.solve(msg=False, time_limit=time_limit)
+    seconds = time.perf_counter() - start
+    solved = model.problem.sol_status in (pulp.LpSolutionOptimal, pulp.LpSolutionIntegerFeasible)
+    return {
+        "seconds": seconds,
+        "objective": float(model.results()[2]["ObjectiveValue"].iloc[0]) if solved else None,
+        "gap": model.metrics.solver.get("gap") if solved else None,
+        "status": model.metrics.solver["solution"],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare solver backends")
+    parser.add_argument("--sizes", nargs="+", default=["30x1", "100x1", "300x1"], help="STAFFxWEEKS")
+    parser.add_argument("--limits", nargs="+", type=int, default=[2, 10, 30], help="Time limits in seconds")
+    parser.add_argument("--threads", nargs="+", type=int, default=[1, 4], help="Thread counts to compare")
+    args = parser.parse_args(argv)
+
+    solvers = available_solvers("matrix")
+    print(f"Solvers: {', '.join(solvers)}")
+    print(f"{'size':>7} {'solver':>6} {'thr':>4} {'limit':>6} {'time [s]':>9} {'vs best':>9} {'gap':>8}  status")
+    for size in args.sizes:
+        num_staff, _, num_weeks = size.partition("x")
+        data = make_input(int(num_staff), int(num_weeks or 1))
+        rows = []
+        for solver in solvers:
+            # scipy's HiGHS interface has no thread setting
+            for threads in [None] if solver == "highs" else args.threads:
+                for limit in args.limits:
+                    rows.append((solver, threads, limit, run(data, solver, limit, threads)))
+        objectives = [result["objective"] for *_, result in rows if result["objective"] is not None]
+        best = min(objectives) if objectives else None
+        for solver, threads, limit, result in rows:
+            excess = "-"
+            if result["objective"] is not None:
+                excess = f"{(result['objective'] - best) / abs(best) if best else 0.0:.3%}"
+            gap = "-" if result["gap"] is None else f"{result['gap']:.2%}"
+            print(
+                f"{size:>7} {solver:>6} {threads or '-':>4} {limit:>6} {result['seconds']:>9.2f} "
+                f"{excess:>9} {gap:>8}  {result['status']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
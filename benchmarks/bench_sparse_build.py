@@ -0,0 +1,46 @@
+"""Compare model size and build/solve time of the dense and sparse builds.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_sparse_build
+"""
+
+import time
+
+import pulp
+
+from shift_optimizer import ShiftSchedulingModel
+
+from .common import make_input
+
+
+def run(data, sparse: bool):
+    model = ShiftSchedulingModel(data, sparse=sparse)
+    start = time.perf_counter()
+    model.build()
+    t_build = time.perf_counter() - start
+    start = time.perf_counter()
+    model.solve(msg=False, time_limit=120)
+    t_solve = time.perf_counter() - start
+    return model, t_build, t_solve
+
+
+def main() -> None:
+    header = f"{'staff':>6} {'mode':>7} {'rows':>7} {'cols':>7} {'build [s]':>10} {'solve [s]':>10} {'objective':>12}"
+    print(header)
+    for num_staff in (30, 100, 300):
+        data = make_input(num_staff)
+        for sparse in (False, True):
+            model, t_build, t_solve = run(data, sparse)
+            rows = len(model.problem.constraints)
+            cols = len(model.problem.variables())
+            objective = pulp.value(model.problem.objective)
+            mode = "sparse" if sparse else "dense"
+            print(
+                f"{num_staff:>6} {mode:>7} {rows:>7} {cols:>7} {t_build:>10.3f} {t_solve:>10.3f} "
+                f"{objective if objective is not None else float('nan'):>12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
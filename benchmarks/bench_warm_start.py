@@ -0,0 +1,44 @@
+"""Time the greedy heuristic and compare CBC with and without a MIP start.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_warm_start
+"""
+
+import time
+
+import pulp
+
+from shift_optimizer import ShiftSchedulingModel
+
+from .common import make_input
+
+TIME_LIMIT = 60
+
+
+def main() -> None:
+    print(
+        f"{'staff':>6} {'heur [s]':>9} {'heur obj':>12} {'feasible':>9} "
+        f"{'cold [s]':>9} {'cold obj':>12} {'warm [s]':>9} {'warm obj':>12}"
+    )
+    for num_staff in (30, 100, 300):
+        data = make_input(num_staff)
+        model = ShiftSchedulingModel(data)
+        start = time.perf_counter()
+        draft = model.solve_heuristic()
+        t_heur = time.perf_counter() - start
+
+        row = [f"{num_staff:>6} {t_heur:>9.3f} {draft.objective:>12.1f} {draft.feasible!s:>9}"]
+        for warm_start in (False, True):
+            model = ShiftSchedulingModel(data, backend="matrix")
+            model.build()
+            start = time.perf_counter()
+            model.solve(msg=False, time_limit=TIME_LIMIT, warm_start=warm_start)
+            elapsed = time.perf_counter() - start
+            objective = model.matrix.objective_value() if model.problem.status == pulp.LpStatusOptimal else float("nan")
+            row.append(f"{elapsed:>9.2f} {objective:>12.1f}")
+        print(" ".join(row))
+
+
+if __name__ == "__main__":
+    main()
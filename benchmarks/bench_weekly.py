@@ -0,0 +1,50 @@
+"""Weekly decomposition of multi-week horizons: process pool speedup.
+
+Each instance is solved with :func:`solve_weekly` in one process and in a
+pool of ``--processes`` workers; the table shows both wall times, the
+number of cells blocked by the rest coupling and the horizon objective.
+The monolithic model is not compared, as it applies the weekly rules to
+the whole horizon and is infeasible on these instances.  Run from the
+repository root::
+
+    python -m benchmarks.bench_weekly
+    python -m benchmarks.bench_weekly --sizes 300x4 --processes 8
+"""
+
+import argparse
+import time
+from typing import List, Optional
+
+from shift_optimizer.generator import generate_instance
+from shift_optimizer.horizon import solve_weekly
+
+
+def run(data, processes: int, time_limit: int):
+    start = time.perf_counter()
+    solution = solve_weekly(data, processes=processes, time_limit=time_limit)
+    seconds = time.perf_counter() - start
+    return seconds, solution
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Time the weekly decomposition")
+    parser.add_argument("--sizes", nargs="+", default=["30x4", "100x4", "100x5"], help="STAFFxWEEKS")
+    parser.add_argument("--processes", type=int, default=4, help="Pool size to compare with one process")
+    parser.add_argument("--time-limit", type=int, default=60, help="Time limit per week in seconds")
+    args = parser.parse_args(argv)
+
+    print(f"{'size':>7} {'1 proc [s]':>11} {f'{args.processes} proc [s]':>11} {'speedup':>8} {'blocked':>8} {'objective':>12}")
+    for size in args.sizes:
+        num_staff, _, num_weeks = size.partition("x")
+        data = generate_instance(int(num_staff), int(num_weeks or 1))
+        t_serial, _ = run(data, 1, args.time_limit)
+        t_pool, solution = run(data, args.processes, args.time_limit)
+        objective = float(solution.results()[2]["ObjectiveValue"].iloc[0])
+        print(
+            f"{size:>7} {t_serial:>11.2f} {t_pool:>11.2f} {t_serial / t_pool:>7.1f}x "
+            f"{int(solution.weeks['Blocked'].sum()):>8} {objective:>12.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""Helpers shared by the benchmark scripts."""
+
+import time
+from typing import Callable, Tuple
+
+from shift_optimizer import InputData
+from shift_optimizer.generator import generate_instance
+
+
+def make_input(num_staff: int, num_weeks: int = 1, seed: int = 42) -> InputData:
+    """Return a random instance shaped like ``sample_shift_input.xlsx``."""
+    return generate_instance(num_staff, num_weeks, demand_profile="random", seed=seed)
+
+
+def best_of(fn: Callable[[], object], repeat: int = 3) -> Tuple[float, object]:
+    """Run ``fn`` ``repeat`` times and return the fastest wall time and last result."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
@@ -0,0 +1,173 @@
+"""End-to-end benchmark suite with JSON output and regression checks.
+
+For each instance size the suite generates a workbook, then times
+read -> build -> solve -> results -> export through ``ModelMetrics``.
+Results are written as JSON.  Phases that got slower than the stored
+baseline by more than the tolerance, a changed solver status and, for
+optimal runs, a changed objective are reported as regressions, and the
+exit status is 1.  Run from the repository root::
+
+    python -m benchmarks.suite                      # compare with baseline.json
+    python -m benchmarks.suite --save-baseline      # record a new baseline
+    python -m benchmarks.suite --sizes 30x1 100x2 --backend matrix
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import pulp
+
+from shift_optimizer import ShiftSchedulingModel, export_to_excel, read_data
+from shift_optimizer.generator import generate_instance, write_instance
+from shift_optimizer.metrics import ModelMetrics
+
+# the compact model applies the weekly rules to the whole horizon, so
+# multi-week sizes must stay small enough to be feasible (100x4 is not)
+DEFAULT_SIZES = ["30x1", "100x1", "300x1", "100x2"]
+BASELINE = Path(__file__).with_name("baseline.json")
+# LpSolution names of runs that have a schedule
+_SOLVED = (pulp.LpSolution[pulp.LpSolutionOptimal], pulp.LpSolution[pulp.LpSolutionIntegerFeasible])
+
+
+def parse_size(size: str) -> Tuple[int, int]:
+    """``"300x4"`` -> 300 staff, 4 weeks."""
+    staff, _, weeks = size.partition("x")
+    return int(staff), int(weeks or 1)
+
+
+def run_case(path: str, *, backend: str, sparse: bool, time_limit: int) -> Dict[str, object]:
+    """Run the full pipeline on the workbook at ``path`` once."""
+    metrics = ModelMetrics()
+    with metrics.phase("read_data"):
+        data = read_data(path, cache=False)  # time the parsing, not the input cache
+    model = ShiftSchedulingModel(data, backend=backend, sparse=sparse, metrics=metrics)
+    model.build()
+    model.solve(msg=False, time_limit=time_limit)
+    schedule_df, hours_df, kpi_df = model.results()
+    # export_to_excel prints the output path
+    with metrics.phase("export"), open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        export_to_excel(schedule_df, hours_df, kpi_df, path.replace(".xlsx", "_out.xlsx"))
+
+    phases: Dict[str, float] = {}
+    for phase in metrics.phases:
+        phases[phase.name] = phases.get(phase.name, 0.0) + phase.seconds
+    solved = pulp.LpSolution[model.problem.sol_status] in _SOLVED
+    return {
+        "phases": phases,
+        "total": metrics.total_seconds,
+        "variables": metrics.num_variables,
+        "constraints": metrics.num_constraints,
+        "nonzeros": metrics.num_nonzeros,
+        "status": pulp.LpStatus[model.problem.status],
+        "objective": float(kpi_df["ObjectiveValue"].iloc[0]) if solved else None,
+    }
+
+
+def run_suite(
+    sizes: List[str], *, backend: str, sparse: bool, time_limit: int, repeat: int, seed: int
+) -> Dict[str, object]:
+    """Benchmark every size; each phase keeps its best time over ``repeat`` runs."""
+    cases = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            num_staff, num_weeks = parse_size(size)
+            path = os.path.join(tmp, f"input_{size}.xlsx")
+            write_instance(generate_instance(num_staff, num_weeks, seed=seed), path)
+            runs = [run_case(path, backend=backend, sparse=sparse, time_limit=time_limit) for _ in range(repeat)]
+            case = runs[-1]
+            case["phases"] = {name: min(run["phases"][name] for run in runs) for name in case["phases"]}
+            case["total"] = min(run["total"] for run in runs)
+            cases[size] = case
+            print(f"{size:>8} {case['total']:8.2f}s  " + "  ".join(f"{k}={v:.3f}" for k, v in case["phases"].items()))
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "settings": {"backend": backend, "sparse": sparse, "time_limit": time_limit, "repeat": repeat, "seed": seed},
+        "cases": cases,
+    }
+
+
+def find_regressions(
+    result: Dict[str, object], baseline: Dict[str, object], *, tolerance: float, min_seconds: float
+) -> List[str]:
+    """Phases slower than the baseline by more than ``tolerance`` and ``min_seconds``.
+
+    A changed status is a regression too; objectives are compared only
+    when both runs are optimal.
+    """
+    regressions = []
+    for size, case in result["cases"].items():
+        base = baseline["cases"].get(size)
+        if base is None:
+            continue
+        timings = dict(case["phases"], total=case["total"])
+        base_timings = dict(base["phases"], total=base["total"])
+        for name, seconds in timings.items():
+            before = base_timings.get(name)
+            if before is not None and seconds > before * (1 + tolerance) and seconds - before > min_seconds:
+                regressions.append(f"{size} {name}: {before:.3f}s -> {seconds:.3f}s (+{seconds / before - 1:.0%})")
+        if base.get("status") is not None and case["status"] != base["status"]:
+            regressions.append(f"{size} status changed: {base['status']} -> {case['status']}")
+            continue
+        if case["status"] != "Optimal" or base.get("objective") is None:
+            continue
+        if abs(case["objective"] - base["objective"]) > 1e-6 * max(1.0, abs(base["objective"])):
+            regressions.append(f"{size} objective changed: {base['objective']} -> {case['objective']}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="End-to-end shift optimizer benchmarks")
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES, help="Instance sizes as STAFFxWEEKS")
+    parser.add_argument("--backend", choices=["pulp", "matrix"], default="pulp")
+    parser.add_argument("--sparse", action="store_true")
+    parser.add_argument("--time-limit", type=int, default=120, help="CBC time limit per run in seconds")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per size; the fastest is kept")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON results path")
+    parser.add_argument("--baseline", default=str(BASELINE), help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown")
+    parser.add_argument("--min-seconds", type=float, default=0.05, help="Ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    result = run_suite(
+        args.sizes,
+        backend=args.backend,
+        sparse=args.sparse,
+        time_limit=args.time_limit,
+        repeat=args.repeat,
+        seed=args.seed,
+    )
+    Path(args.output).write_text(json.dumps(result, indent=2))
+    print(f"Written results to {args.output}")
+
+    if args.save_baseline:
+        Path(args.baseline).write_text(json.dumps(result, indent=2))
+        print(f"Written baseline to {args.baseline}")
+        return
+    if not Path(args.baseline).exists():
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+    baseline = json.loads(Path(args.baseline).read_text())
+    if baseline["settings"] != result["settings"]:
+        print("Warning: baseline was recorded with different settings", baseline["settings"])
+    regressions = find_regressions(result, baseline, tolerance=args.tolerance, min_seconds=args.min_seconds)
+    for line in regressions:
+        print("REGRESSION", line)
+    if regressions:
+        sys.exit(1)
+    print("No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
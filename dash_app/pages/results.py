@@ -1,46 +1,87 @@
 import pandas as pd
 import dash
 import dash_bootstrap_components as dbc
-from dash import html, dash_table, dcc, callback, Input, Output
+from dash import html, dash_table, dcc, callback, Input, Output, State, MATCH
 import plotly.graph_objects as go
 
+from shift_optimizer.result_store import PAGE_SIZE, query_table
+from state import results
+
 dash.register_page(__name__, path="/results")
 
 layout = html.Div(
     [
         html.H2("Results"),
         dcc.Store(id="result-store", storage_type="session"),
-        html.Div(id="results-content"),
+        dcc.Loading(html.Div(id="results-content")),
     ]
 )
 
 
+def _stored_tables(ref):
+    return results.get(ref.get("id")) if ref else None
+
+
+def table_from_df(name: str, df: pd.DataFrame) -> dash_table.DataTable:
+    """A table whose rows are fetched page by page by ``load_page``."""
+    return dash_table.DataTable(
+        id={"type": "result-table", "table": name},
+        columns=[{"name": c, "id": c} for c in df.columns],
+        page_action="custom",
+        page_current=0,
+        page_size=PAGE_SIZE,
+        filter_action="custom",
+        filter_query="",
+        sort_action="custom",
+        sort_mode="multi",
+        sort_by=[],
+    )
+
+
+@callback(
+    Output({"type": "result-table", "table": MATCH}, "data"),
+    Output({"type": "result-table", "table": MATCH}, "page_count"),
+    Input({"type": "result-table", "table": MATCH}, "page_current"),
+    Input({"type": "result-table", "table": MATCH}, "page_size"),
+    Input({"type": "result-table", "table": MATCH}, "filter_query"),
+    Input({"type": "result-table", "table": MATCH}, "sort_by"),
+    State({"type": "result-table", "table": MATCH}, "id"),
+    State("result-store", "data"),
+)
+def load_page(page_current, page_size, filter_query, sort_by, table_id, ref):
+    tables = _stored_tables(ref)
+    if tables is None:
+        return [], 1
+    page, page_count = query_table(
+        tables[table_id["table"]],
+        filter_query=filter_query,
+        sort_by=sort_by,
+        page=page_current,
+        page_size=page_size or PAGE_SIZE,
+    )
+    return page.to_dict("records"), page_count
+
+
 @callback(
     Output("results-content", "children"),
     Input("result-store", "data"),
 )
-def display_results(data):
-    if not data:
+def display_results(ref):
+    if not ref:
         return "No results available."
-    schedule_df = pd.read_json(data["schedule"], orient="split")
-    hours_df = pd.read_json(data["hours"], orient="split")
-    kpi_df = pd.read_json(data["kpi"], orient="split")
-    demand_df = None
-    avail_df = None
-    if "demand" in data and "availability" in data:
-        demand_df = pd.read_json(data["demand"], orient="split")
-        avail_df = pd.read_json(data["availability"], orient="split")
-
-    def table_from_df(df: pd.DataFrame) -> dash_table.DataTable:
-        return dash_table.DataTable(
-            data=df.to_dict("records"),
-            columns=[{"name": c, "id": c} for c in df.columns],
-        )
+    tables = _stored_tables(ref)
+    if tables is None:
+        return "These results are no longer available; please run the optimization again."
+    hours_df = tables["Hours"]
+    kpi_df = tables["KPI"]
+    # copies, as the slot columns are made categorical below
+    demand_df = tables["Demand"].copy()
+    avail_df = tables["Availability"].copy()
 
     components = []
 
     # 需要・希望・OK集計とグラフ
-    if demand_df is not None and avail_df is not None:
+    if not demand_df.empty:
         slot_order = ["10-14", "14-18", "18-22", "22-26"]
         demand_df["Slot"] = pd.Categorical(demand_df["Slot"], categories=slot_order, ordered=True)
         avail_df["Slot"] = pd.Categorical(avail_df["Slot"], categories=slot_order, ordered=True)
@@ -126,15 +167,21 @@ def display_results(data):
     components.extend(
         [
             html.Div(
-                [html.H4("Shift Schedule"), table_from_df(schedule_df)],
+                [html.H4("Shift Schedule"), table_from_df("Schedule", tables["Schedule"])],
                 className="mb-4",
             ),
             html.Div(
-                [html.H4("Work Hours Summary"), table_from_df(hours_df)],
+                [html.H4("Work Hours Summary"), table_from_df("Hours", hours_df)],
                 className="mb-4",
             ),
             html.Div(
-                [html.H4("Key Performance Indicators"), table_from_df(kpi_df)],
+                [
+                    html.H4("Key Performance Indicators"),
+                    dash_table.DataTable(
+                        data=kpi_df.to_dict("records"),
+                        columns=[{"name": c, "id": c} for c in kpi_df.columns],
+                    ),
+                ],
                 className="mb-4",
             ),
         ]
@@ -1,58 +1,157 @@
 import base64
-from io import BytesIO
+import uuid
 
-import pandas as pd
 import dash
 import dash_bootstrap_components as dbc
 from dash import html, dcc, callback, Input, Output, State
 
-from shift_optimizer import InputData, ShiftSchedulingModel
+from shift_optimizer import read_data_from_bytes
+from shift_optimizer.cache import SolutionCache
+from shift_optimizer.diagnostics import check_feasibility
+from shift_optimizer.jobs import CANCELLED, FAILED, QUEUED, RUNNING, JobLimitError, JobManager
+from shift_optimizer.solvers import SOLVERS, available_solvers
+from state import results
 
 
-def read_data_from_bytes(data: bytes) -> InputData:
-    xls = pd.ExcelFile(BytesIO(data))
-    staff = pd.read_excel(xls, "Staff")
-    avail = pd.read_excel(xls, "Availability")
-    demand = pd.read_excel(xls, "Demand")
-    wages = pd.read_excel(xls, "Wages").iloc[0]
-    return InputData(staff, avail, demand, wages)
+dash.register_page(__name__, path="/")
 
+jobs = JobManager(max_workers=2, max_per_user=1, cache=SolutionCache())
+SOLVER_LABELS = {"cbc": "CBC", "highs": "HiGHS", "cpsat": "OR-Tools CP-SAT"}
 
-dash.register_page(__name__, path="/")
 
-layout = html.Div(
-    [
-        html.H2("Upload Input"),
-        dcc.Upload(id="upload-data", children=dbc.Button("Select Excel File")),
-        dbc.Button("Run Optimization", id="run-button", className="mt-2"),
-        html.Div(id="run-status", className="mt-2"),
-        dcc.Store(id="result-store", storage_type="session"),
-    ]
-)
+def layout():
+    available = available_solvers(backend="matrix")
+    return html.Div(
+        [
+            html.H2("Upload Input"),
+            dcc.Upload(id="upload-data", children=dbc.Button("Select Excel File")),
+            dbc.Label("Solver", html_for="solver-select", className="mt-2"),
+            dcc.Dropdown(
+                id="solver-select",
+                options=[
+                    {"label": SOLVER_LABELS[name], "value": name, "disabled": name not in available}
+                    for name in SOLVERS
+                ],
+                value="cbc",
+                clearable=False,
+                style={"maxWidth": "20rem"},
+            ),
+            dbc.Checkbox(
+                id="anytime-toggle",
+                label="Show the best schedule so far while solving (CBC and CP-SAT)",
+                value=False,
+                className="mt-2",
+            ),
+            dbc.Button("Run Optimization", id="run-button", className="mt-2"),
+            dbc.Button("Cancel", id="cancel-button", color="secondary", className="mt-2 ms-2", disabled=True),
+            html.Div(id="run-status", className="mt-2"),
+            dcc.Interval(id="job-poll", interval=1000, disabled=True),
+            dcc.Store(id="job-store"),
+            dcc.Store(id="session-id", data=uuid.uuid4().hex, storage_type="session"),
+            dcc.Store(id="result-store", storage_type="session"),
+        ]
+    )
 
 
 @callback(
-    Output("run-status", "children"),
-    Output("result-store", "data"),
+    Output("job-store", "data"),
     Input("run-button", "n_clicks"),
     State("upload-data", "contents"),
+    State("solver-select", "value"),
+    State("anytime-toggle", "value"),
+    State("session-id", "data"),
     prevent_initial_call=True,
 )
-def run_optimizer(n_clicks, contents):
+def run_optimizer(n_clicks, contents, solver, anytime, session_id):
     if contents is None:
-        return "Please upload a file first.", dash.no_update
+        return {"error": "Please upload a file first."}
     content_type, content_string = contents.split(",")
     decoded = base64.b64decode(content_string)
-    data = read_data_from_bytes(decoded)
-    model = ShiftSchedulingModel(data)
-    model.build()
-    model.solve()
-    schedule_df, hours_df, kpi_df = model.results()
-    result = {
-        "schedule": schedule_df.to_json(orient="split"),
-        "hours": hours_df.to_json(orient="split"),
-        "kpi": kpi_df.to_json(orient="split"),
-        "availability": data.availability.to_json(orient="split"),
-        "demand": data.demand.to_json(orient="split"),
-    }
-    return "Optimization complete.", result
+    try:
+        data = read_data_from_bytes(decoded)
+    except ValueError as exc:
+        return {"error": f"Invalid input file: {exc}"}
+    violations = check_feasibility(data)
+    if violations:
+        return {"error": "The input is infeasible:", "violations": [violation.message for violation in violations]}
+    if anytime and solver not in ("cbc", "cpsat"):
+        return {"error": f"{SOLVER_LABELS[solver]} cannot report schedules while solving."}
+    try:
+        job = jobs.submit(session_id, data, backend="matrix", solver=solver, anytime=bool(anytime))
+    except JobLimitError:
+        return {"error": "An optimization is already running for this session."}
+    return {"id": job.id}
+
+
+def _error_message(job_ref):
+    violations = job_ref.get("violations")
+    if not violations:
+        return job_ref.get("error")
+    return html.Div([job_ref["error"], html.Ul([html.Li(message) for message in violations])], className="text-danger")
+
+
+@callback(
+    Output("run-status", "children"),
+    Output("result-store", "data"),
+    Output("job-poll", "disabled"),
+    Output("cancel-button", "disabled"),
+    Input("job-store", "data"),
+    Input("job-poll", "n_intervals"),
+    Input("cancel-button", "n_clicks"),
+    State("result-store", "data"),
+    prevent_initial_call=True,
+)
+def poll_job(job_ref, n_intervals, cancel_clicks, current_ref):
+    if not job_ref or "error" in job_ref:
+        return _error_message(job_ref or {}), dash.no_update, True, True
+    try:
+        job = jobs.get(job_ref["id"])
+    except KeyError:  # already published
+        return dash.no_update, dash.no_update, True, True
+    if dash.ctx.triggered_id == "cancel-button":
+        jobs.cancel(job.id)
+
+    if job.status == QUEUED:
+        return f"Queued ({jobs.position(job.id)} job(s) ahead)...", dash.no_update, False, False
+    if job.status == RUNNING:
+        status = f"Running... {job.elapsed:.0f}s elapsed"
+        if job.incumbent is None:
+            return status, dash.no_update, False, False
+        gap = "" if job.incumbent.gap is None else f", gap {job.incumbent.gap:.2%}"
+        lines = [status, html.Br(), f"Best objective so far {job.incumbent.objective:,.1f}{gap}"]
+        ref = dash.no_update
+        if job.best is not None:
+            lines += [" ", dcc.Link("View current schedule", href="/results")]
+            if current_ref != {"id": job.id, "schedules": job.schedules}:
+                # the Results page shows the best schedule so far and redraws on a new ref
+                _publish(job.id, job.best, job.data)
+                ref = {"id": job.id, "schedules": job.schedules}
+        return html.Div(lines), ref, False, False
+
+    jobs.pop(job.id)
+    data = job.data
+    if job.status == CANCELLED:
+        if job.best is not None:
+            _publish(job.id, job.best, data)
+            return "Optimization cancelled; showing the best schedule found.", {"id": job.id}, True, True
+        return "Optimization cancelled.", dash.no_update, True, True
+    if job.status == FAILED:
+        return f"Optimization failed: {job.error}", dash.no_update, True, True
+    _publish(job.id, job.result, data)
+    status = "Loaded cached solution." if job.cached else f"Optimization complete in {job.elapsed:.0f}s."
+    return status, {"id": job.id}, True, True
+
+
+def _publish(job_id, result, data):
+    """Put a job's result frames, or its best schedule so far, into the server-side store."""
+    schedule_df, hours_df, kpi_df = result
+    results.put(
+        job_id,
+        {
+            "Schedule": schedule_df,
+            "Hours": hours_df,
+            "KPI": kpi_df,
+            "Availability": data.availability,
+            "Demand": data.demand,
+        },
+    )
@@ -0,0 +1,6 @@
+"""Server-side state shared by the pages of the app."""
+
+from shift_optimizer.result_store import ResultStore
+
+# finished results by job id; the browser only keeps the id
+results = ResultStore()
@@ -1,5 +1,20 @@
-from .data import InputData, read_data
-from .model import ShiftSchedulingModel, export_to_excel
+from .data import CompactInput, InputData, read_data, read_data_from_bytes
+from .diagnostics import InfeasibleInputError, check_feasibility
+from .export import export_results, export_to_excel, schedule_grid
+from .model import ShiftSchedulingModel
+from .timeindex import TimeIndex
 
-__all__ = ["InputData", "read_data", "ShiftSchedulingModel", "export_to_excel"]
+__all__ = [
+    "CompactInput",
+    "InputData",
+    "read_data",
+    "read_data_from_bytes",
+    "ShiftSchedulingModel",
+    "TimeIndex",
+    "InfeasibleInputError",
+    "check_feasibility",
+    "export_results",
+    "export_to_excel",
+    "schedule_grid",
+]
 
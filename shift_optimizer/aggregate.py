@@ -0,0 +1,231 @@
+"""Staff equivalence-class aggregation of the shift scheduling model.
+
+Staff with the same wage, minor status, hour bounds and availability row
+are interchangeable: any schedule stays feasible, and keeps its cost and
+wish terms, when two of them swap rows.  The aggregated model therefore
+has one integer ``z[c, t]`` per class and slot, counting how many members
+of class ``c`` work slot ``t``, instead of one binary per person.  Hour,
+daily-slot and worked-day limits become class totals, and fairness is
+charged as if every member worked the class average.  This makes the
+aggregated optimum a lower bound on the full model.
+
+:func:`disaggregate` then hands each class's slot counts to its members,
+giving every slot to the members with the fewest hours so far.  This
+keeps the hours within a class close to the average.  The result is
+checked against the individual limits; ``None`` means the class totals
+could not be split and the full model has to be solved instead.
+"""
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+import numpy as np
+import pulp
+
+from .solvers import pulp_solver
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .model import ShiftSchedulingModel
+
+
+@dataclass
+class StaffClasses:
+    """Partition of the staff into interchangeable classes.
+
+    ``labels[i]`` is the class of staff ``i`` and ``members[c]`` the staff
+    indices of class ``c``, in staff order; classes are numbered by first
+    appearance.
+    """
+
+    labels: np.ndarray
+    members: List[np.ndarray]
+
+    @property
+    def sizes(self) -> np.ndarray:
+        return np.array([len(members) for members in self.members], dtype=np.int64)
+
+    @property
+    def representatives(self) -> np.ndarray:
+        return np.array([members[0] for members in self.members], dtype=np.int64)
+
+
+@dataclass
+class AggregateSolution:
+    """Disaggregated schedule with its PuLP status codes and the aggregated bound."""
+
+    assign: Optional[np.ndarray]
+    status: int
+    sol_status: int
+    stats: Dict[str, object] = field(default_factory=dict)
+
+
+def staff_classes(model: "ShiftSchedulingModel") -> StaffClasses:
+    """Group the staff of a prepared ``model`` into interchangeable classes."""
+    compact = model.data.compact
+    key = np.column_stack(
+        [
+            compact.age < 18,
+            compact.wage,
+            compact.min_hours,
+            compact.max_hours,
+            compact.availability,
+        ]
+    ).astype(np.int64)
+    _, first, inverse = np.unique(key, axis=0, return_index=True, return_inverse=True)
+    # renumber classes by the position of their first member
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    labels = rank[inverse.ravel()]
+    members = [np.nonzero(labels == c)[0] for c in range(len(order))]
+    return StaffClasses(labels, members)
+
+
+def solve_aggregated(
+    model: "ShiftSchedulingModel",
+    classes: StaffClasses,
+    *,
+    max_slots_per_day: int,
+    max_worked_days: int,
+    msg: bool,
+    time_limit: int,
+    solver: str = "cbc",
+    threads: Optional[int] = None,
+    gap: Optional[float] = None,
+) -> AggregateSolution:
+    """Solve the class-count model and disaggregate its solution.
+
+    ``solver`` is ``"cbc"`` or ``"highs"``.  ``assign`` is ``None`` when
+    the aggregated model has no solution or cannot be disaggregated.
+    """
+    compact = model.data.compact
+    time = model.time
+    hours = time.hours.tolist()
+    sizes = classes.sizes.tolist()
+    rep = classes.representatives
+    feasible = model.feasible_matrix[rep]
+    score = (model.w_cost * model.cost_matrix - model.w_wish * model.wish_matrix)[rep]
+    n_classes, n_slots = feasible.shape
+    n_staff = len(model.staff_ids)
+
+    problem = pulp.LpProblem("ShiftSchedulingAggregated", pulp.LpMinimize)
+    z = {
+        (c, t): pulp.LpVariable(f"z_{c}_{t}", lowBound=0, upBound=sizes[c], cat="Integer")
+        for c, t in np.argwhere(feasible).tolist()
+    }
+    worked = {
+        (c, d): pulp.LpVariable(f"worked_{c}_{d}", lowBound=0, upBound=sizes[c], cat="Integer")
+        for c in range(n_classes)
+        for d in range(len(model.dates_unique))
+    }
+    mean_h = pulp.LpVariable("mean_h", lowBound=0)
+    dev = [pulp.LpVariable(f"dev_{c}", lowBound=0) for c in range(n_classes)]
+
+    for t, key in enumerate(model.slot_keys):
+        problem += pulp.lpSum(z[(c, t)] for c in range(n_classes) if (c, t) in z) >= model.req[key]
+
+    total_h = []
+    for c in range(n_classes):
+        class_h = pulp.LpAffineExpression((z[(c, t)], hours[t]) for t in range(n_slots) if (c, t) in z)
+        min_h, max_h = compact.min_hours[rep[c]], compact.max_hours[rep[c]]
+        problem += class_h >= sizes[c] * min_h
+        problem += class_h <= sizes[c] * max_h
+        for d, date in enumerate(model.dates_unique):
+            day = [z[(c, t)] for t in time.day_slots.get(date, []) if (c, t) in z]
+            problem += pulp.lpSum(day) <= max_slots_per_day * worked[(c, d)]
+            for var in day:
+                problem += var <= worked[(c, d)]
+        problem += pulp.lpSum(worked[(c, d)] for d in range(len(model.dates_unique))) <= max_worked_days * sizes[c]
+        # sum over members of |h_i - mean| >= |class hours - size * mean|
+        problem += dev[c] >= class_h - sizes[c] * mean_h
+        problem += dev[c] >= sizes[c] * mean_h - class_h
+        total_h.append(class_h)
+    problem += mean_h * n_staff == pulp.lpSum(total_h)
+
+    problem += (
+        pulp.lpSum(score[c, t] * var for (c, t), var in z.items()) + model.w_fair * pulp.lpSum(dev)
+    )
+    problem.solve(pulp_solver(solver, msg=msg, time_limit=time_limit, threads=threads, gap=gap))
+
+    stats: Dict[str, object] = {"classes": n_classes, "aggregated_status": pulp.LpStatus[problem.status]}
+    if problem.sol_status not in (pulp.LpSolutionOptimal, pulp.LpSolutionIntegerFeasible):
+        return AggregateSolution(None, problem.status, problem.sol_status, stats)
+
+    counts = np.zeros((n_classes, n_slots), dtype=np.int64)
+    for (c, t), var in z.items():
+        counts[c, t] = round(var.varValue)
+    bound = pulp.value(problem.objective)
+    stats["aggregated_objective"] = bound
+    assign = disaggregate(
+        model, classes, counts, max_slots_per_day=max_slots_per_day, max_worked_days=max_worked_days
+    )
+    if assign is None:
+        return AggregateSolution(None, pulp.LpStatusNotSolved, pulp.LpSolutionNoSolutionFound, stats)
+    sol_status = problem.sol_status
+    if sol_status == pulp.LpSolutionOptimal:
+        # the aggregated optimum is only a bound once fairness is split per person
+        objective = _objective(model, assign)
+        stats["objective"] = objective
+        stats["best_bound"] = bound
+        stats["gap"] = abs(objective - bound) / max(1.0, abs(objective))
+        if stats["gap"] > 1e-9:
+            sol_status = pulp.LpSolutionIntegerFeasible
+    return AggregateSolution(assign, pulp.LpStatusOptimal, sol_status, stats)
+
+
+def disaggregate(
+    model: "ShiftSchedulingModel",
+    classes: StaffClasses,
+    counts: np.ndarray,
+    *,
+    max_slots_per_day: int,
+    max_worked_days: int,
+) -> Optional[np.ndarray]:
+    """Split the class x slot ``counts`` into a staff x slot assignment.
+
+    Returns ``None`` if the individual hour, daily-slot or worked-day
+    limits cannot be met this way.
+    """
+    compact = model.data.compact
+    time = model.time
+    slot_hours = time.hours
+    assign = np.zeros(model.feasible_matrix.shape, dtype=bool)
+    # slots grouped by day; slots on days without a daily limit form their own groups
+    groups = [time.day_slots.get(date, []) for date in model.dates_unique]
+    limited = np.zeros(len(slot_hours), dtype=bool)
+    for day in groups:
+        limited[day] = True
+    groups += [[t] for t in np.nonzero(~limited)[0].tolist()]
+
+    for c, members in enumerate(classes.members):
+        hours = np.zeros(len(members))
+        days = np.zeros(len(members), dtype=np.int64)
+        for g, day in enumerate(groups):
+            in_day = np.zeros(len(members), dtype=np.int64)
+            # busiest slots first, so they can still pick from every member
+            for t in sorted(day, key=lambda t: -counts[c, t]):
+                need = counts[c, t]
+                if need == 0:
+                    continue
+                eligible = np.ones(len(members), dtype=bool)
+                if g < len(model.dates_unique):
+                    eligible &= in_day < max_slots_per_day
+                    eligible &= (in_day > 0) | (days < max_worked_days)
+                candidates = np.nonzero(eligible)[0]
+                if len(candidates) < need:
+                    return None
+                chosen = candidates[np.lexsort((days[candidates], hours[candidates]))[:need]]
+                assign[members[chosen], t] = True
+                hours[chosen] += slot_hours[t]
+                in_day[chosen] += 1
+            if g < len(model.dates_unique):
+                days += in_day > 0
+        if (hours < compact.min_hours[members]).any() or (hours > compact.max_hours[members]).any():
+            return None
+    return assign
+
+
+def _objective(model: "ShiftSchedulingModel", assign: np.ndarray) -> float:
+    hours = (assign * model.time.hours).sum(axis=1)
+    score = model.w_cost * model.cost_matrix - model.w_wish * model.wish_matrix
+    return float((score * assign).sum() + model.w_fair * np.abs(hours - hours.mean()).sum())
@@ -0,0 +1,362 @@
+"""Anytime solving: improved schedules are reported while the solver runs.
+
+:meth:`ShiftSchedulingModel.iter_incumbents` yields an :class:`Incumbent`
+for every improved solution with its objective, the best bound and the
+relative gap, so a good schedule can be used long before the solver
+proves optimality.  The search stops early once the gap is at most
+``target_gap``, when the objective has not improved for ``stall``
+seconds, or after ``time_limit`` seconds.
+
+CP-SAT reports its solutions through a solution callback, so every
+incumbent comes with its schedule.  CBC only writes its solution file
+when it stops.  Its log is therefore read while it runs, through a
+pseudo-terminal where available because CBC block-buffers a pipe.  Every
+``Integer solution of ...`` line yields an incumbent without a schedule
+(``assign is None``).  At most every ``snapshot_interval`` seconds CBC
+is interrupted with SIGINT, which makes it stop and write its best
+solution.  That schedule is yielded and CBC is restarted from it as a
+MIP start.  Each restart repeats the root processing, so short intervals
+trade solve time for fresher schedules.  Where CBC cannot be interrupted
+(Windows), its schedule arrives when it finishes.
+"""
+
+import os
+import queue
+import re
+import signal
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional
+
+import numpy as np
+import pulp
+
+from .cpsat import solve_cpsat
+from .matrix import cbc_command, read_cbc_solution
+
+try:
+    import pty
+except ImportError:  # pragma: no cover - Windows
+    pty = None
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .model import ShiftSchedulingModel
+
+# seconds between CBC interruptions that collect the current schedule
+SNAPSHOT_INTERVAL = 30.0
+# how often stop conditions are checked while the solver is silent
+POLL_SECONDS = 0.5
+_INTERRUPTIBLE = os.name == "posix"
+
+# CBC log lines carrying the incumbent objective and the best bound
+_CBC_INCUMBENT = re.compile(r"^Cbc00(?:04|12)I Integer solution of (\S+)")
+_CBC_PROGRESS = re.compile(r"^Cbc0010I After \d+ nodes, \d+ on tree, (\S+) best solution, best possible (\S+)")
+_CBC_PARTIAL = re.compile(r"^Cbc0005I Partial search - best objective (\S+) \(best possible ([^),]+)")
+# CBC prints this objective while it has no solution
+_NO_SOLUTION = 1e49
+# relative rounding of the objectives CBC prints, and of exact objectives
+_LOG_PRECISION = 1e-7
+_PRECISION = 1e-9
+
+
+@dataclass
+class Incumbent:
+    """An improved solution reported during an anytime solve.
+
+    ``gap`` is ``(objective - bound) / max(1, |objective|)``, as for the
+    other solvers, and ``elapsed`` the seconds since the solve started.
+    ``assign`` is the staff x slot schedule, or ``None`` when the
+    improvement was read from the CBC log and its schedule follows with
+    the next snapshot.
+    """
+
+    objective: float
+    bound: Optional[float]
+    gap: Optional[float]
+    elapsed: float
+    assign: Optional[np.ndarray] = field(default=None, repr=False)
+
+
+@dataclass
+class AnytimeSolution:
+    """Final schedule of an anytime solve with its PuLP status codes."""
+
+    assign: Optional[np.ndarray]
+    status: int
+    sol_status: int
+    stats: Dict[str, object] = field(default_factory=dict)
+
+
+def relative_gap(objective: float, bound: Optional[float]) -> Optional[float]:
+    if bound is None:
+        return None
+    return max(0.0, objective - bound) / max(1.0, abs(objective))
+
+
+def schedule_objective(model: "ShiftSchedulingModel", assign: np.ndarray) -> float:
+    """Objective of the staff x slot schedule ``assign`` with exact deviations."""
+    hours = (assign * model.time.hours).sum(axis=1)
+    score = model.w_cost * model.cost_matrix - model.w_wish * model.wish_matrix
+    fairness = float(np.abs(hours - hours.mean()).sum()) if len(hours) else 0.0
+    return float((score * assign).sum()) + model.w_fair * fairness
+
+
+class StopRule:
+    """The gap, stall and time targets of an anytime solve."""
+
+    def __init__(self, time_limit: float, target_gap: Optional[float], stall: Optional[float]) -> None:
+        self.start = time.perf_counter()
+        self.time_limit = time_limit
+        self.target_gap = target_gap
+        self.stall = stall
+        self.objective = np.inf
+        # objective of the last incumbent yielded with a schedule
+        self.scheduled = np.inf
+        self.bound: Optional[float] = None
+        self.improved: Optional[float] = None
+        self.reason: Optional[str] = None
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    @property
+    def gap(self) -> Optional[float]:
+        return relative_gap(self.objective, self.bound) if np.isfinite(self.objective) else None
+
+    def update_bound(self, bound: float) -> None:
+        # every restart proves its own bound; keep the best one
+        if self.bound is None or bound > self.bound:
+            self.bound = bound
+
+    def improve(self, objective: float, *, exact: bool = True) -> bool:
+        """Record ``objective``; returns whether it improves the incumbent.
+
+        Objectives read from the CBC log are rounded (``exact=False``) and
+        only count if they improve by more than the rounding.  An exact
+        objective within that rounding replaces the rounded one.
+        """
+        scale = max(1.0, abs(objective))
+        if objective < self.objective - (_PRECISION if exact else _LOG_PRECISION) * scale:
+            self.objective = objective
+            self.improved = self.elapsed
+            return True
+        if exact and objective < self.objective + _LOG_PRECISION * scale:
+            self.objective = objective
+        return False
+
+    @property
+    def unscheduled(self) -> bool:
+        """Whether a better incumbent than the last schedule is known."""
+        return self.objective < self.scheduled - _LOG_PRECISION * max(1.0, abs(self.objective))
+
+    def incumbent(self, assign: Optional[np.ndarray] = None) -> Incumbent:
+        if assign is not None:
+            self.scheduled = self.objective
+        return Incumbent(self.objective, self.bound, self.gap, self.elapsed, assign)
+
+    def check(self) -> Optional[str]:
+        """Return why the search should stop now, if it should."""
+        gap = self.gap
+        if self.target_gap is not None and gap is not None and gap <= self.target_gap:
+            self.reason = "gap"
+        elif self.stall is not None and self.improved is not None and self.elapsed - self.improved >= self.stall:
+            self.reason = "stall"
+        elif self.elapsed >= self.time_limit:
+            self.reason = "time"
+        return self.reason
+
+    def stats(self) -> Dict[str, object]:
+        stats: Dict[str, object] = {"stopped": self.reason or "finished"}
+        if np.isfinite(self.objective):
+            stats["objective"] = self.objective
+        if self.bound is not None:
+            stats["best_bound"] = self.bound
+        if self.gap is not None:
+            stats["gap"] = self.gap
+        return stats
+
+
+def _read_lines(stream, lines: "queue.Queue[Optional[str]]") -> None:
+    try:
+        for line in stream:
+            lines.put(line)
+    except OSError:  # the pseudo-terminal is closed once CBC exits
+        pass
+    finally:
+        stream.close()
+        lines.put(None)
+
+
+def _start_cbc(args: List[str]):
+    """Start CBC with its output on a line queue; ``None`` marks the end."""
+    lines: "queue.Queue[Optional[str]]" = queue.Queue()
+    if pty is not None:
+        # CBC flushes a terminal line by line, a pipe only when its buffer fills
+        master, slave = pty.openpty()
+        process = subprocess.Popen(args, stdout=slave, stderr=slave, stdin=subprocess.DEVNULL)
+        os.close(slave)
+        stream = open(master, errors="replace")
+    else:
+        process = subprocess.Popen(
+            args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL, text=True
+        )
+        stream = process.stdout
+    threading.Thread(target=_read_lines, args=(stream, lines), daemon=True).start()
+    return process, lines
+
+
+def iter_cbc(
+    model: "ShiftSchedulingModel",
+    rule: StopRule,
+    *,
+    msg: bool,
+    snapshot_interval: float,
+    initial: Optional[np.ndarray] = None,
+) -> Iterator[Incumbent]:
+    """Anytime CBC on the matrix backend of ``model``; returns an :class:`AnytimeSolution`."""
+    matrix, problem = model.matrix, model.problem
+    last_snapshot = rule.elapsed
+    restarts = 0
+    while True:
+        remaining = max(1, int(np.ceil(rule.time_limit - rule.elapsed)))
+        solver, args, tmp_files = cbc_command(
+            matrix,
+            problem,
+            msg=msg,
+            time_limit=remaining,
+            initial=initial,
+            metrics=model.metrics,
+            threads=model.threads,
+            gap=model.gap,
+        )
+        process, lines = _start_cbc(args)
+        interrupted = None
+        try:
+            while True:
+                try:
+                    line = lines.get(timeout=POLL_SECONDS)
+                except queue.Empty:
+                    line = ""
+                if line is None:  # CBC closed its output; it may not have exited yet
+                    break
+                if msg and line:
+                    print(line, end="")
+                found = _CBC_INCUMBENT.match(line)
+                progress = _CBC_PROGRESS.match(line) or _CBC_PARTIAL.match(line)
+                if progress:
+                    rule.update_bound(float(progress.group(2)))
+                    found = found or progress
+                objective = float(found.group(1)) if found else _NO_SOLUTION
+                if objective < _NO_SOLUTION and rule.improve(objective, exact=False):
+                    yield rule.incumbent()
+                if interrupted is None and _INTERRUPTIBLE:
+                    if rule.check() is not None:
+                        interrupted = "stop"
+                    elif rule.unscheduled and rule.elapsed - last_snapshot >= snapshot_interval:
+                        interrupted = "snapshot"
+                    if interrupted is not None:
+                        process.send_signal(signal.SIGINT)
+        except BaseException:  # GeneratorExit when the consumer stops early, or an error in this loop
+            process.kill()
+            process.wait()
+            solver.delete_tmp_files(*tmp_files)
+            raise
+        returncode = process.wait()
+        if returncode != 0 or not os.path.exists(tmp_files[1]):
+            solver.delete_tmp_files(*tmp_files)
+            raise pulp.PulpSolverError(f"Pulp: Error while executing {solver.path}")
+        read_cbc_solution(matrix, problem, solver, tmp_files)
+
+        # the consumer may store an incumbent on the model while we are suspended
+        assign, status, sol_status = None, problem.status, problem.sol_status
+        if sol_status in (pulp.LpSolutionOptimal, pulp.LpSolutionIntegerFeasible):
+            assign = model.assignment()
+            objective = matrix.objective_value()
+            initial = matrix.values.copy()
+            rule.improve(objective)
+            if sol_status == pulp.LpSolutionOptimal and model.gap is None:
+                rule.update_bound(objective)
+            if objective < rule.scheduled - _PRECISION * max(1.0, abs(objective)):
+                last_snapshot = rule.elapsed
+                yield rule.incumbent(assign)
+        stopped = interrupted != "snapshot" or sol_status != pulp.LpSolutionIntegerFeasible
+        if stopped or rule.check() is not None:
+            stats = rule.stats()
+            stats["restarts"] = restarts
+            return AnytimeSolution(assign, status, sol_status, stats)
+        restarts += 1
+
+
+def iter_cpsat(
+    model: "ShiftSchedulingModel",
+    rule: StopRule,
+    *,
+    msg: bool,
+    hint: Optional[np.ndarray] = None,
+    max_slots_per_day: int,
+    max_worked_days: int,
+) -> Iterator[Incumbent]:
+    """Anytime CP-SAT; returns an :class:`AnytimeSolution`."""
+    events: "queue.Queue[tuple]" = queue.Queue()
+    stop = threading.Event()
+
+    def on_solution(assign: np.ndarray, objective: float, bound: float) -> None:
+        events.put(("solution", assign, objective, bound))
+
+    def run() -> None:
+        try:
+            events.put(
+                (
+                    "done",
+                    solve_cpsat(
+                        model,
+                        max_slots_per_day=max_slots_per_day,
+                        max_worked_days=max_worked_days,
+                        msg=msg,
+                        time_limit=max(1, int(np.ceil(rule.time_limit - rule.elapsed))),
+                        threads=model.threads,
+                        gap=model.gap,
+                        hint=hint,
+                        on_solution=on_solution,
+                        stop=stop,
+                    ),
+                )
+            )
+        except Exception as exc:  # re-raised in the consuming thread
+            events.put(("error", exc))
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    try:
+        while True:
+            try:
+                event = events.get(timeout=POLL_SECONDS)
+            except queue.Empty:
+                event = ("idle",)
+            if event[0] == "error":
+                raise event[1]
+            if event[0] == "done":
+                solution = event[1]
+                bound = solution.stats.get("best_bound")
+                if bound is not None:
+                    rule.update_bound(bound)
+                stats = rule.stats()
+                stats.update({k: v for k, v in solution.stats.items() if k not in stats})
+                found = solution.sol_status in (pulp.LpSolutionOptimal, pulp.LpSolutionIntegerFeasible)
+                return AnytimeSolution(
+                    solution.assign if found else None, solution.status, solution.sol_status, stats
+                )
+            if event[0] == "solution":
+                _, assign, _, bound = event
+                rule.update_bound(bound)
+                # intermediate CP-SAT solutions need not have tight deviations
+                if rule.improve(schedule_objective(model, assign)):
+                    yield rule.incumbent(assign)
+            if not stop.is_set() and rule.check() is not None:
+                stop.set()
+    finally:
+        stop.set()
+        thread.join()
@@ -0,0 +1,172 @@
+"""Solve many store workbooks in one run.
+
+Each input is read, checked, solved and written by a worker of a process
+pool, so the interpreter, pandas and PuLP are loaded once per worker
+instead of once per store.  Every solver run may itself use ``threads``
+CBC threads, so the default pool size is the CPU count divided by that.
+
+A ``summary.csv`` in the output directory gets one row per store with its
+status, KPIs, runtime and output files, rewritten as stores finish.  On a
+rerun, stores whose summary row has a solution, whose input hash is
+unchanged and whose outputs still exist are skipped, so an interrupted
+batch resumes where it stopped.
+"""
+
+import glob
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+import pandas as pd
+import pulp
+
+from .data import EXCEL_SUFFIXES, read_data
+from .diagnostics import check_feasibility
+from .export import export_results
+from .model import ShiftSchedulingModel
+
+SUMMARY_FILE = "summary.csv"
+SUMMARY_COLUMNS = [
+    "Store",
+    "Input",
+    "Status",
+    "Solution",
+    "ObjectiveValue",
+    "TotalCost",
+    "WishSatisfied",
+    "Fairness",
+    "Runtime",
+    "Output",
+    "InputHash",
+    "Error",
+]
+# summary statuses of stores that are not solved again on a rerun
+_SOLVED = (pulp.LpSolution[pulp.LpSolutionOptimal], pulp.LpSolution[pulp.LpSolutionIntegerFeasible])
+
+
+def find_inputs(patterns: Sequence[Union[str, Path]]) -> List[Path]:
+    """Expand directories (their Excel workbooks) and glob patterns into input paths."""
+    paths: List[Path] = []
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            matches = [file for file in path.iterdir() if file.suffix.lower() in EXCEL_SUFFIXES]
+        else:
+            matches = [Path(match) for match in glob.glob(str(pattern))]
+        if not matches:
+            raise FileNotFoundError(f"No input workbooks match {str(pattern)!r}")
+        paths.extend(sorted(matches))
+    stems = pd.Series([path.stem for path in paths])
+    if stems.duplicated().any():
+        raise ValueError(f"Two inputs are both named {stems[stems.duplicated()].iloc[0]!r}; outputs would clash")
+    return paths
+
+
+def default_processes(threads: Optional[int]) -> int:
+    """Pool size that keeps ``processes * threads`` within the CPU count."""
+    return max(1, (os.cpu_count() or 1) // max(1, threads or 1))
+
+
+def _file_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _solve_store(path: Path, output_dir: Path, suffix: str, time_limit: int, options: Dict[str, object]) -> dict:
+    """Solve one workbook and write its outputs; never raises."""
+    row: Dict[str, object] = {"Store": path.stem, "Input": str(path), "InputHash": _file_hash(path)}
+    start = time.perf_counter()
+    try:
+        data = read_data(path, cache=False)  # workers would race on the shared input cache
+        violations = check_feasibility(data)
+        if violations:
+            row.update(Status="Infeasible", Error="; ".join(violation.message for violation in violations))
+            return row
+        model = ShiftSchedulingModel(data, **options)
+        model.build()
+        model.solve(msg=False, time_limit=time_limit)
+        row["Status"] = pulp.LpStatus[model.problem.status]
+        row["Solution"] = pulp.LpSolution[model.problem.sol_status]
+        if row["Solution"] in _SOLVED:
+            schedule_df, hours_df, kpi_df = model.results()
+            row.update(kpi_df.iloc[0].to_dict())
+            written = export_results(
+                {"Schedule": schedule_df, "Hours": hours_df, "KPI": kpi_df}, output_dir / f"{path.stem}{suffix}"
+            )
+            row["Output"] = ";".join(written)
+    except Exception as exc:  # one bad workbook must not stop the batch
+        row.update(Status="Error", Error=f"{type(exc).__name__}: {exc}")
+    finally:
+        row["Runtime"] = time.perf_counter() - start
+    return row
+
+
+def _load_summary(path: Path) -> pd.DataFrame:
+    if not path.exists():
+        return pd.DataFrame(columns=SUMMARY_COLUMNS)
+    return pd.read_csv(path, dtype={"Store": str, "Output": str, "InputHash": str})
+
+
+def _is_done(previous: Optional[pd.Series], input_hash: str) -> bool:
+    if previous is None or previous["Solution"] not in _SOLVED or previous["InputHash"] != input_hash:
+        return False
+    outputs = str(previous["Output"]).split(";")
+    return all(Path(output).exists() for output in outputs)
+
+
+def run_batch(
+    inputs: Sequence[Union[str, Path]],
+    output_dir: Union[str, Path],
+    *,
+    output_format: str = ".xlsx",
+    processes: Optional[int] = None,
+    time_limit: int = 300,
+    resume: bool = True,
+    progress: bool = True,
+    **options,
+) -> pd.DataFrame:
+    """Solve every input workbook in a process pool; return the summary table.
+
+    ``inputs`` are workbook paths, directories or glob patterns and
+    ``options`` are passed to :class:`ShiftSchedulingModel`.  Each store's
+    tables are written to ``output_dir/<store><output_format>`` and the
+    summary to ``output_dir/summary.csv``.  With ``resume`` stores that
+    were already solved from the same input are skipped.
+    """
+    paths = find_inputs(inputs)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    summary_path = output_dir / SUMMARY_FILE
+    previous = _load_summary(summary_path).drop_duplicates("Store", keep="last").set_index("Store", drop=False)
+    if processes is None:
+        processes = default_processes(options.get("threads"))
+
+    rows: Dict[str, dict] = {}
+    pending = []
+    for path in paths:
+        row = previous.loc[path.stem] if path.stem in previous.index else None
+        if resume and _is_done(row, _file_hash(path)):
+            rows[path.stem] = row.to_dict()
+            if progress:
+                print(f"{path.stem}: already solved, skipping")
+        else:
+            pending.append(path)
+
+    def write_summary() -> pd.DataFrame:
+        table = pd.DataFrame([rows[path.stem] for path in paths if path.stem in rows], columns=SUMMARY_COLUMNS)
+        table.to_csv(summary_path, index=False)
+        return table
+
+    with ProcessPoolExecutor(max_workers=min(processes, max(1, len(pending)))) as pool:
+        futures = [
+            pool.submit(_solve_store, path, output_dir, output_format, time_limit, options) for path in pending
+        ]
+        for future in as_completed(futures):
+            row = future.result()
+            rows[row["Store"]] = row
+            write_summary()
+            if progress:
+                print(f"{row['Store']}: {row['Status']} in {row['Runtime']:.1f}s")
+    return write_summary()
@@ -0,0 +1,224 @@
+"""Persistent on-disk cache of solved schedules.
+
+Entries are keyed by a canonical hash of the ``InputData`` tables together
+with the model options, solver settings and time limit, so re-uploading the
+same workbook or running the same configuration twice returns the stored
+schedule, hours and KPI frames without calling CBC.  Entries are evicted in
+least-recently-used order once the entry count or total size exceeds the
+configured limits.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple, Union
+
+import pandas as pd
+import pulp
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+from .data import InputData
+from .model import ShiftSchedulingModel
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_DIR = Path(
+    os.environ.get("SHIFT_OPTIMIZER_CACHE", Path.home() / ".cache" / "shift_optimizer")
+)
+
+Result = Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]
+
+
+def _update_table(digest, table: Union[pd.DataFrame, pd.Series]) -> None:
+    if isinstance(table, pd.Series):
+        # the Wages row is keyed by its index labels
+        table = table.to_frame().T
+    digest.update(json.dumps([str(column) for column in table.columns]).encode())
+    digest.update(pd.util.hash_pandas_object(table, index=False).to_numpy().tobytes())
+
+
+def cache_key(data: InputData, **settings) -> str:
+    """Return a hex digest identifying ``data`` solved with ``settings``.
+
+    The tables are hashed by content rather than file bytes, so the same
+    sheets saved twice map to the same key.  ``settings`` must be JSON
+    serialisable.
+    """
+    digest = hashlib.sha256(f"v{CACHE_VERSION}".encode())
+    for table in (data.staff, data.availability, data.demand, data.wages):
+        _update_table(digest, table)
+    digest.update(json.dumps(settings, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+class SolutionCache:
+    """Directory of pickled ``(schedule, hours, kpi)`` results.
+
+    Hit and miss counts are kept in ``stats.json`` next to the entries so
+    they accumulate across processes and runs.  The file is replaced
+    atomically and updated under a lock on ``stats.lock`` (on POSIX), so
+    the CLI, batch workers and Dash job processes can share a cache.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path] = DEFAULT_CACHE_DIR,
+        *,
+        max_entries: int = 256,
+        max_bytes: int = 512 * 2**20,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.pkl"
+
+    def _entries(self) -> List[Tuple[Path, os.stat_result]]:
+        """Entries and their stat, least recently used first.
+
+        Entries removed by another process meanwhile are skipped.
+        """
+        entries = []
+        for path in self.directory.glob("*.pkl"):
+            try:
+                entries.append((path, path.stat()))
+            except FileNotFoundError:
+                continue
+        return sorted(entries, key=lambda entry: entry[1].st_mtime)
+
+    def get(self, key: str) -> Optional[Result]:
+        """Return the cached result for ``key`` or ``None`` on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as fh:
+                result = pickle.load(fh)
+            os.utime(path)  # mark as most recently used
+        except FileNotFoundError:
+            result = None
+        except (OSError, pickle.UnpicklingError, EOFError):
+            path.unlink(missing_ok=True)
+            result = None
+        self._count("hits" if result is not None else "misses")
+        return result
+
+    def put(self, key: str, result: Result) -> None:
+        """Store ``result`` under ``key`` and evict old entries if needed."""
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            pickle.dump(tuple(result), fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self._path(key))
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = self._entries()
+        count = len(entries)
+        total = sum(stat.st_size for _, stat in entries)
+        for path, stat in entries:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)  # another process may have evicted it already
+            count -= 1
+            total -= stat.st_size
+
+    def clear(self) -> None:
+        """Remove every entry and reset the counters."""
+        for path in self.directory.glob("*.pkl"):
+            path.unlink(missing_ok=True)
+        with self._stats_lock():
+            (self.directory / "stats.json").unlink(missing_ok=True)
+
+    def _read_counts(self) -> dict:
+        try:
+            return json.loads((self.directory / "stats.json").read_text())
+        except (FileNotFoundError, ValueError):
+            return {"hits": 0, "misses": 0}
+
+    @contextmanager
+    def _stats_lock(self) -> Iterator[None]:
+        with self._lock, open(self.directory / "stats.lock", "a") as fh:
+            if fcntl is not None:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+            yield  # the lock is released when the file is closed
+
+    def _count(self, field: str) -> None:
+        with self._stats_lock():
+            counts = self._read_counts()
+            counts[field] = counts.get(field, 0) + 1
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w") as fh:
+                json.dump(counts, fh)
+            os.replace(tmp, self.directory / "stats.json")
+
+    @property
+    def hits(self) -> int:
+        return self._read_counts().get("hits", 0)
+
+    @property
+    def misses(self) -> int:
+        return self._read_counts().get("misses", 0)
+
+    def stats(self) -> dict:
+        """Hit/miss counters, hit rate and current size of the cache."""
+        counts = self._read_counts()
+        hits, misses = counts.get("hits", 0), counts.get("misses", 0)
+        entries = self._entries()
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "entries": len(entries),
+            "bytes": sum(stat.st_size for _, stat in entries),
+        }
+
+
+def run_model(
+    data: InputData,
+    *,
+    msg: bool = True,
+    time_limit: int = 300,
+    warm_start: bool = False,
+    **options,
+) -> Tuple[Result, bool]:
+    """Build and solve ``data``; return the result frames and whether a solution was found."""
+    model = ShiftSchedulingModel(data, **options)
+    model.build()
+    model.solve(msg=msg, time_limit=time_limit, warm_start=warm_start)
+    solved = model.problem.sol_status in (pulp.LpSolutionOptimal, pulp.LpSolutionIntegerFeasible)
+    return model.results(), solved
+
+
+def solve_cached(
+    data: InputData,
+    cache: Optional[SolutionCache],
+    *,
+    time_limit: int = 300,
+    warm_start: bool = False,
+    **options,
+) -> Tuple[Result, bool]:
+    """Solve ``data`` or fetch the result of an identical earlier run.
+
+    ``options`` are passed to :class:`ShiftSchedulingModel`.  Returns the
+    ``(schedule, hours, kpi)`` frames and whether they came from the cache.
+    Only runs that found a solution are stored.
+    """
+    key = cache_key(data, time_limit=time_limit, warm_start=warm_start, **options)
+    if cache is not None:
+        result = cache.get(key)
+        if result is not None:
+            return result, True
+
+    result, solved = run_model(data, time_limit=time_limit, warm_start=warm_start, **options)
+    if cache is not None and solved:
+        cache.put(key, result)
+    return result, False
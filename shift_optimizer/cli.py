@@ -1,23 +1,374 @@
 import argparse
+import os
+import sys
+from typing import List, Optional
 
+from .cache import DEFAULT_CACHE_DIR, SolutionCache, solve_cached
 from .data import read_data
-from .model import ShiftSchedulingModel, export_to_excel
+from .diagnostics import InfeasibleInputError, check_feasibility
+from .export import EXPORT_FORMATS, export_to_excel, schedule_grid
+from .anytime import SNAPSHOT_INTERVAL
+from .horizon import MIN_REST_HOURS, solve_weekly, split_weeks, week_data
+from .metrics import ModelMetrics
+from .solvers import SOLVERS
+from .model import BACKENDS, ENGINES, W_COST, W_FAIR, W_WISH, ShiftSchedulingModel
 
 
-def main() -> None:
-    parser = argparse.ArgumentParser()
+def add_weight_arguments(parser: argparse.ArgumentParser, *, many: bool = False) -> None:
+    nargs = "+" if many else None
+    for flag, default, label in (
+        ("--w-cost", W_COST, "labour cost"),
+        ("--w-wish", W_WISH, "wish satisfaction"),
+        ("--w-fair", W_FAIR, "fairness"),
+    ):
+        parser.add_argument(
+            flag,
+            type=float,
+            nargs=nargs,
+            default=[default] if many else default,
+            help=f"Objective weight(s) for {label}",
+        )
+
+
+def sweep_main(argv: List[str]) -> None:
+    from .sweep import run_sweep, weight_grid
+
+    parser = argparse.ArgumentParser(prog="shift-optimizer sweep", description="Solve a grid of objective weights")
     parser.add_argument("--input", required=True, help="Input Excel path")
-    parser.add_argument("--output", default="schedule_output.xlsx", help="Output Excel path")
-    args = parser.parse_args()
+    parser.add_argument("--output", help="Optional CSV or Excel path for the sweep table")
+    add_weight_arguments(parser, many=True)
+    parser.add_argument("--processes", type=int, help="Number of worker processes")
+    parser.add_argument("--time-limit", type=int, default=300, help="CBC time limit per run in seconds")
+    args = parser.parse_args(argv)
 
     data = read_data(args.input)
-    model = ShiftSchedulingModel(data)
-    model.build()
-    model.solve()
-    schedule_df, hours_df, kpi_df = model.results()
-    export_to_excel(schedule_df, hours_df, kpi_df, args.output)
+    violations = check_feasibility(data)
+    if violations:
+        sys.exit(str(InfeasibleInputError(violations)))
+    table = run_sweep(
+        data,
+        weight_grid(args.w_cost, args.w_wish, args.w_fair),
+        processes=args.processes,
+        time_limit=args.time_limit,
+    )
+    print(table.to_string(index=False))
+    if args.output:
+        if args.output.endswith(".csv"):
+            table.to_csv(args.output, index=False)
+        else:
+            table.to_excel(args.output, sheet_name="Sweep", index=False)
+        print(f"Written sweep to {args.output}")
+
+
+def batch_main(argv: List[str]) -> None:
+    from .batch import SUMMARY_FILE, run_batch
+
+    parser = argparse.ArgumentParser(
+        prog="shift-optimizer batch", description="Solve many store workbooks concurrently"
+    )
+    parser.add_argument("inputs", nargs="+", help="Input workbooks, directories of workbooks or glob patterns")
+    parser.add_argument("--output-dir", required=True, help="Directory for per-store outputs and the summary")
+    parser.add_argument(
+        "--format", choices=EXPORT_FORMATS, default=".xlsx", help="Per-store output format (default .xlsx)"
+    )
+    parser.add_argument(
+        "--processes", type=int, help="Concurrent stores (default: CPU count divided by --threads)"
+    )
+    parser.add_argument("--time-limit", type=int, default=300, help="Solver time limit per store in seconds")
+    parser.add_argument("--solver", choices=SOLVERS, default="cbc", help="MILP/CP solver")
+    parser.add_argument("--threads", type=int, help="Solver threads per store")
+    parser.add_argument("--gap", type=float, help="Relative MIP gap at which the solver stops")
+    parser.add_argument("--aggregate", action="store_true", help="Solve interchangeable staff as classes")
+    parser.add_argument("--engine", choices=ENGINES, default="compact", help="compact MILP or pattern engine")
+    add_weight_arguments(parser)
+    parser.add_argument("--force", action="store_true", help="Solve every store again instead of resuming")
+    args = parser.parse_args(argv)
+
+    table = run_batch(
+        args.inputs,
+        args.output_dir,
+        output_format=args.format,
+        processes=args.processes,
+        time_limit=args.time_limit,
+        resume=not args.force,
+        sparse=True,
+        backend="matrix",
+        solver=args.solver,
+        threads=args.threads,
+        gap=args.gap,
+        aggregate=args.aggregate,
+        engine=args.engine,
+        w_cost=args.w_cost,
+        w_wish=args.w_wish,
+        w_fair=args.w_fair,
+    )
+    print(table[["Store", "Status", "ObjectiveValue", "Runtime"]].to_string(index=False))
+    for store, error in table.loc[table["Error"].notna(), ["Store", "Error"]].itertuples(index=False):
+        print(f"{store}: {error}")
+    print(f"Written summary to {os.path.join(args.output_dir, SUMMARY_FILE)}")
+    failed = table["Output"].isna().sum()
+    if failed:
+        sys.exit(f"{failed} of {len(table)} store(s) have no solution")
+
+
+def cache_main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(prog="shift-optimizer cache", description="Show or clear the solution cache")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Solution cache directory")
+    parser.add_argument("--clear", action="store_true", help="Remove all cached solutions and reset the counters")
+    args = parser.parse_args(argv)
+
+    cache = SolutionCache(args.cache_dir)
+    if args.clear:
+        cache.clear()
+    stats = cache.stats()
+    print(f"Cache:    {cache.directory}")
+    print(f"Entries:  {stats['entries']} ({stats['bytes'] / 2**20:.1f} MiB)")
+    print(f"Hits:     {stats['hits']}")
+    print(f"Misses:   {stats['misses']}")
+    print(f"Hit rate: {stats['hit_rate']:.1%}")
+
+
+def serve_main(argv: List[str]) -> None:
+    from .service import BATCH_WINDOW, DEFAULT_HOST, DEFAULT_PORT, MAX_BATCH, serve
+
+    parser = argparse.ArgumentParser(
+        prog="shift-optimizer serve", description="Run the optimizer as a local HTTP/JSON service"
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Address to bind (default {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to listen on (default {DEFAULT_PORT})")
+    parser.add_argument("--workers", type=int, help="Concurrent solves (default: CPU count)")
+    parser.add_argument(
+        "--batch-window",
+        type=float,
+        default=BATCH_WINDOW,
+        help=f"Seconds to collect requests into one batch (default {BATCH_WINDOW})",
+    )
+    parser.add_argument(
+        "--max-batch", type=int, default=MAX_BATCH, help=f"Most requests per batch (default {MAX_BATCH})"
+    )
+    parser.add_argument("--verbose", action="store_true", help="Log every HTTP request")
+    args = parser.parse_args(argv)
+
+    serve(
+        args.host,
+        args.port,
+        quiet=not args.verbose,
+        workers=args.workers,
+        batch_window=args.batch_window,
+        max_batch=args.max_batch,
+    )
+
+
+COMMANDS = {"sweep": sweep_main, "batch": batch_main, "cache": cache_main, "serve": serve_main}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in COMMANDS:
+        COMMANDS[argv[0]](argv[1:])
+        return
+
+    parser = argparse.ArgumentParser(epilog=f"Subcommands: {', '.join(COMMANDS)}")
+    parser.add_argument(
+        "--input", required=True, help="Input Excel workbook or directory of CSV/Parquet/Arrow tables"
+    )
+    parser.add_argument(
+        "--output",
+        default="schedule_output.xlsx",
+        help="Output path; .xlsx, .json, or .csv/.parquet (one file per table)",
+    )
+    parser.add_argument(
+        "--grid",
+        action="store_true",
+        help="Add a wide staff x slot Grid table to the output",
+    )
+    parser.add_argument(
+        "--constant-memory",
+        action="store_true",
+        help="Write Excel output row by row with xlsxwriter's constant_memory mode",
+    )
+    parser.add_argument(
+        "--sparse",
+        action="store_true",
+        help="Only create assignment variables for feasible (staff, slot) pairs",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="pulp",
+        help="Model assembly backend",
+    )
+    parser.add_argument("--solver", choices=SOLVERS, default="cbc", help="MILP/CP solver")
+    parser.add_argument("--time-limit", type=int, default=300, help="Solver time limit in seconds")
+    parser.add_argument("--threads", type=int, help="Solver threads (CP-SAT workers); solver default if omitted")
+    parser.add_argument("--gap", type=float, help="Relative MIP gap at which the solver stops, e.g. 0.01")
+    parser.add_argument(
+        "--aggregate",
+        action="store_true",
+        help="Solve interchangeable staff as classes and split the result onto individuals",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="compact",
+        help="compact MILP, or weekly patterns generated by column generation",
+    )
+    parser.add_argument(
+        "--weekly",
+        action="store_true",
+        help="Solve each week separately in a process pool and stitch the schedules",
+    )
+    parser.add_argument("--processes", type=int, help="Worker processes for --weekly")
+    parser.add_argument(
+        "--rest-hours",
+        type=float,
+        default=MIN_REST_HOURS,
+        help="Minimum rest between shifts of neighbouring weeks with --weekly",
+    )
+    parser.add_argument(
+        "--warm-start",
+        action="store_true",
+        help="Pass a greedy schedule to the solver as a MIP start (a hint for CP-SAT)",
+    )
+    parser.add_argument(
+        "--heuristic-only",
+        action="store_true",
+        help="Write the greedy draft schedule without running CBC",
+    )
+    parser.add_argument(
+        "--anytime",
+        action="store_true",
+        help="Print every improved schedule while solving and keep the latest one written to --output",
+    )
+    parser.add_argument("--target-gap", type=float, help="With --anytime, stop once the gap is at most this")
+    parser.add_argument("--stall", type=float, help="With --anytime, stop after this many seconds without improvement")
+    parser.add_argument(
+        "--snapshot-interval",
+        type=float,
+        default=SNAPSHOT_INTERVAL,
+        help="With --anytime, seconds between written schedules (CBC is restarted for each)",
+    )
+    add_weight_arguments(parser)
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Solution cache directory")
+    parser.add_argument("--no-cache", action="store_true", help="Always solve, bypassing the solution cache")
+    parser.add_argument(
+        "--input-cache", action="store_true", help="Cache the parsed workbook so later runs skip Excel parsing"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print phase timings, memory and solver statistics and add a Diagnostics sheet (implies --no-cache)",
+    )
+    args = parser.parse_args(argv)
+    if args.weekly and (args.heuristic_only or args.aggregate or args.solver == "cpsat" or args.engine != "compact"):
+        parser.error("--weekly supports the cbc and highs solvers without --heuristic-only, --aggregate or --engine")
+    if args.engine == "patterns" and args.solver == "cpsat":
+        parser.error("--engine patterns needs the cbc or highs solver")
+    if args.anytime and (args.weekly or args.heuristic_only or args.aggregate or args.engine != "compact"):
+        parser.error("--anytime cannot be combined with --weekly, --heuristic-only, --aggregate or --engine")
+    if args.anytime and args.solver != "cpsat" and (args.solver, args.backend) != ("cbc", "matrix"):
+        parser.error("--anytime supports cpsat, or cbc with --backend matrix")
+
+    metrics = ModelMetrics(profile=args.profile)
+    with metrics.phase("read_data"):
+        data = read_data(args.input, cache=args.input_cache)
+    with metrics.phase("diagnostics"):
+        if args.weekly:
+            violations = [v for week in split_weeks(data) for v in check_feasibility(week_data(data, week))]
+        else:
+            violations = check_feasibility(data)
+    if violations and not args.heuristic_only:
+        hint = ""
+        if not args.weekly and len(split_weeks(data)) > 1:
+            hint = "\nThe input spans several weeks; --weekly applies the weekly rules to each week"
+        sys.exit(str(InfeasibleInputError(violations)) + hint)
+    for violation in violations:
+        print(f"Warning: {violation.message}")
+    options = dict(
+        sparse=args.sparse,
+        backend=args.backend,
+        solver=args.solver,
+        threads=args.threads,
+        gap=args.gap,
+        aggregate=args.aggregate,
+        engine=args.engine,
+        w_cost=args.w_cost,
+        w_wish=args.w_wish,
+        w_fair=args.w_fair,
+    )
+
+    def write_output(schedule_df, hours_df, kpi_df, diagnostics_df=None, weeks_df=None) -> None:
+        export_to_excel(
+            schedule_df,
+            hours_df,
+            kpi_df,
+            args.output,
+            diagnostics_df,
+            grid_df=schedule_grid(schedule_df, data) if args.grid else None,
+            weeks_df=weeks_df,
+            constant_memory=args.constant_memory,
+        )
+
+    weeks_df = None
+    if args.weekly:
+        with metrics.phase("weekly"):
+            horizon = solve_weekly(
+                data,
+                processes=args.processes,
+                time_limit=args.time_limit,
+                rest_hours=args.rest_hours,
+                solver=args.solver,
+                threads=args.threads,
+                gap=args.gap,
+                w_cost=args.w_cost,
+                w_wish=args.w_wish,
+                w_fair=args.w_fair,
+            )
+        for week in horizon.failed:
+            print(f"Warning: week {week} has no solution")
+        schedule_df, hours_df, kpi_df = horizon.results()
+        weeks_df = horizon.weeks
+    elif args.anytime:
+        model = ShiftSchedulingModel(data, metrics=metrics, **options)
+        written = -args.snapshot_interval
+        for incumbent in model.iter_incumbents(
+            time_limit=args.time_limit,
+            target_gap=args.target_gap,
+            stall=args.stall,
+            snapshot_interval=args.snapshot_interval,
+            warm_start=args.warm_start,
+        ):
+            gap = "" if incumbent.gap is None else f", gap {incumbent.gap:.3%}"
+            print(f"{incumbent.elapsed:7.1f}s  objective {incumbent.objective:,.1f}{gap}")
+            if incumbent.assign is not None and incumbent.elapsed - written >= args.snapshot_interval:
+                write_output(*model.results())
+                written = incumbent.elapsed
+        solver = model.metrics.solver
+        print(f"Stopped ({solver.get('stopped')}): {solver['solution']}")
+        schedule_df, hours_df, kpi_df = model.results()
+    elif args.heuristic_only or args.profile:
+        model = ShiftSchedulingModel(data, metrics=metrics, **options)
+        if args.heuristic_only:
+            draft = model.solve_heuristic()
+            for (date, slot), missing in draft.shortfall.items():
+                print(f"Warning: {date} {slot} is short of {missing} staff")
+            for sid, missing in draft.below_min.items():
+                print(f"Warning: {sid} is {missing}h below WeeklyMinH")
+        else:
+            model.build()
+            model.solve(time_limit=args.time_limit, warm_start=args.warm_start)
+        schedule_df, hours_df, kpi_df = model.results()
+    else:
+        cache = None if args.no_cache else SolutionCache(args.cache_dir)
+        (schedule_df, hours_df, kpi_df), hit = solve_cached(
+            data, cache, time_limit=args.time_limit, warm_start=args.warm_start, **options
+        )
+        if hit:
+            print("Using cached solution")
+    write_output(schedule_df, hours_df, kpi_df, metrics.to_frame() if args.profile else None, weeks_df)
+    if args.profile:
+        print(metrics.report())
 
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,183 @@
+"""OR-Tools CP-SAT formulation of the shift scheduling model.
+
+The constraints match the MILP built in :mod:`shift_optimizer.model`:
+demand coverage, weekly hour bounds, at most ``max_slots_per_day`` slots a
+day, at most ``max_worked_days`` worked days and no night slots for minors.
+CP-SAT needs integer variables, so the fairness term
+``sum |h_s - mean(h)|`` is multiplied by the staff count ``n`` and written
+as ``sum |n h_s - sum(h)|``; the whole objective is scaled by ``n``
+accordingly and reported divided by it again.
+"""
+
+import threading
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Dict, Optional
+
+import numpy as np
+import pulp
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .model import ShiftSchedulingModel
+
+
+@dataclass
+class CpSatSolution:
+    """Staff x slot assignment found by CP-SAT with its PuLP status codes."""
+
+    assign: np.ndarray
+    status: int
+    sol_status: int
+    stats: Dict[str, object] = field(default_factory=dict)
+
+
+def _integral(values: np.ndarray):
+    """Return ``values`` as ints when they are whole numbers, else as floats."""
+    values = np.asarray(values, dtype=float)
+    if np.all(values == np.round(values)):
+        return np.round(values).astype(np.int64).tolist()
+    return values.tolist()
+
+
+def solve_cpsat(
+    model: "ShiftSchedulingModel",
+    *,
+    max_slots_per_day: int,
+    max_worked_days: int,
+    msg: bool,
+    time_limit: int,
+    threads: Optional[int] = None,
+    gap: Optional[float] = None,
+    hint: Optional[np.ndarray] = None,
+    on_solution: Optional[Callable[[np.ndarray, float, float], None]] = None,
+    stop: Optional[threading.Event] = None,
+) -> CpSatSolution:
+    """Solve the prepared parameters of ``model`` with CP-SAT.
+
+    ``threads`` sets the number of parallel search workers (all cores by
+    default), ``gap`` the relative gap limit and ``hint`` an optional
+    staff x slot assignment used as a solution hint.  ``on_solution`` is
+    called from the search thread with the assignment, objective and bound
+    of every improved solution, and setting ``stop`` ends the search.
+    """
+    try:
+        from ortools.sat.python import cp_model
+    except ImportError as exc:
+        raise RuntimeError("The cpsat solver requires OR-Tools (pip install ortools)") from exc
+
+    compact = model.data.compact
+    time = model.time
+    hours = time.hours
+    if not np.all(hours == np.round(hours)):
+        raise ValueError("The cpsat solver needs slots of whole hours")
+    hours = np.round(hours).astype(np.int64)
+    n_staff, n_slots = model.feasible_matrix.shape
+    min_hours = compact.min_hours.tolist()
+    max_hours = compact.max_hours.tolist()
+
+    cp = cp_model.CpModel()
+    cells = np.argwhere(model.feasible_matrix)
+    x = {(i, t): cp.NewBoolVar(f"x_{i}_{t}") for i, t in cells.tolist()}
+    by_staff = [[] for _ in range(n_staff)]
+    by_slot = [[] for _ in range(n_slots)]
+    for (i, t), var in x.items():
+        by_staff[i].append(t)
+        by_slot[t].append(var)
+
+    for t, (date, slot) in enumerate(model.slot_keys):
+        cp.Add(sum(by_slot[t]) >= model.req[(date, slot)])
+
+    h = []
+    for i in range(n_staff):
+        h_i = cp.NewIntVar(0, max(0, max_hours[i]), f"h_{i}")
+        cp.Add(h_i == sum(int(hours[t]) * x[(i, t)] for t in by_staff[i]))
+        cp.Add(h_i >= min_hours[i])
+        h.append(h_i)
+
+        worked = []
+        for d, date in enumerate(model.dates_unique):
+            day = [x[(i, t)] for t in time.day_slots.get(date, []) if (i, t) in x]
+            if not day:
+                continue
+            cp.Add(sum(day) <= max_slots_per_day)
+            y = cp.NewBoolVar(f"worked_{i}_{d}")
+            for var in day:
+                cp.AddImplication(var, y)
+            worked.append(y)
+        cp.Add(sum(worked) <= max_worked_days)
+
+    total = cp.NewIntVar(0, max(0, sum(max_hours)), "total_h")
+    cp.Add(total == sum(h))
+    dev = []
+    for i in range(n_staff):
+        dev_i = cp.NewIntVar(0, max(0, n_staff * max(max_hours)), f"dev_{i}")
+        cp.Add(dev_i >= n_staff * h[i] - total)
+        cp.Add(dev_i >= total - n_staff * h[i])
+        dev.append(dev_i)
+
+    score = n_staff * (model.w_cost * model.cost_matrix - model.w_wish * model.wish_matrix)
+    x_vars = list(x.values())
+    coefficients = _integral([score[i, t] for i, t in x])
+    fair = _integral([model.w_fair])[0]
+    cp.Minimize(sum(c * var for c, var in zip(coefficients, x_vars)) + fair * sum(dev))
+
+    if hint is not None:
+        for (i, t), var in x.items():
+            cp.AddHint(var, int(hint[i, t]))
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = float(time_limit)
+    solver.parameters.log_search_progress = msg
+    if threads is not None:
+        solver.parameters.num_workers = threads
+    if gap is not None:
+        solver.parameters.relative_gap_limit = gap
+    callback = None
+    if on_solution is not None:
+
+        class Callback(cp_model.CpSolverSolutionCallback):
+            def on_solution_callback(self) -> None:
+                found = np.zeros((n_staff, n_slots), dtype=bool)
+                for (i, t), var in x.items():
+                    found[i, t] = self.BooleanValue(var)
+                on_solution(found, self.ObjectiveValue() / n_staff, self.BestObjectiveBound() / n_staff)
+
+        callback = Callback()
+    finished = threading.Event()
+    if stop is not None:
+
+        def watch() -> None:
+            while not finished.wait(0.1):
+                if stop.is_set():
+                    solver.StopSearch()
+                    return
+
+        threading.Thread(target=watch, daemon=True).start()
+    try:
+        result = solver.Solve(cp, callback)
+    finally:
+        finished.set()
+
+    assign = np.zeros((n_staff, n_slots), dtype=bool)
+    stats: Dict[str, object] = {"result": solver.StatusName(result)}
+    if result == cp_model.OPTIMAL:
+        status, sol_status = pulp.LpStatusOptimal, pulp.LpSolutionOptimal
+    elif result == cp_model.FEASIBLE:  # stopped by a limit, reported like CBC does
+        status, sol_status = pulp.LpStatusOptimal, pulp.LpSolutionIntegerFeasible
+    elif result == cp_model.INFEASIBLE:
+        status, sol_status = pulp.LpStatusInfeasible, pulp.LpSolutionInfeasible
+    elif result == cp_model.MODEL_INVALID:
+        raise RuntimeError(f"CP-SAT rejected the model: {cp.Validate()}")
+    else:
+        status, sol_status = pulp.LpStatusNotSolved, pulp.LpSolutionNoSolutionFound
+
+    if result in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        for (i, t), var in x.items():
+            assign[i, t] = solver.BooleanValue(var)
+        objective, bound = solver.ObjectiveValue() / n_staff, solver.BestObjectiveBound() / n_staff
+        stats.update(
+            objective=objective,
+            best_bound=bound,
+            gap=abs(objective - bound) / max(1.0, abs(objective)),
+        )
+    stats.update(nodes=solver.NumBranches(), solver_seconds=solver.WallTime())
+    return CpSatSolution(assign, status, sol_status, stats)
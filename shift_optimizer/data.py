@@ -1,23 +1,302 @@
-from dataclasses import dataclass
+import hashlib
+import importlib.util
+import pickle
+from dataclasses import dataclass, field, replace
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
 import pandas as pd
 
+from .timeindex import TimeIndex
+
+TABLES = ("Staff", "Availability", "Demand", "Wages")
+EXCEL_SUFFIXES = (".xlsx", ".xlsm", ".xls")
+# per-table files accepted in an input directory
+TABLE_READERS = {
+    ".csv": pd.read_csv,
+    ".parquet": pd.read_parquet,
+    ".feather": pd.read_feather,
+    ".arrow": pd.read_feather,
+}
+# parsed workbooks kept in the input cache
+MAX_CACHED_WORKBOOKS = 32
+
+REQUIRED_COLUMNS = {
+    "Staff": ("StaffID", "Age", "HourlyWage", "WeeklyMinH", "WeeklyMaxH"),
+    "Availability": ("StaffID", "Date", "Slot", "Availability"),
+    "Demand": ("Date", "Slot", "RequiredCnt"),
+    "Wages": ("NightRate", "HolidayRate"),
+}
+# int8 codes of the availability matrix
+AVAIL_NG = 0
+AVAIL_OK = 1
+AVAIL_WISH = 2
+AVAILABILITY_CODES = {"NG": AVAIL_NG, "OK": AVAIL_OK, "Wish": AVAIL_WISH}
+
+
+@dataclass
+class CompactInput:
+    """Validated array form of :class:`InputData`.
+
+    Staff follow the Staff sheet order and slot ``t`` is Demand row ``t``
+    (see ``time``; ``time.slot_date`` is its date code into ``time.dates``).
+    ``availability`` is a staff x slot ``int8`` matrix of
+    ``AVAIL_NG``/``AVAIL_OK``/``AVAIL_WISH``; cells missing from the
+    Availability sheet are NG.
+    """
+
+    staff_ids: pd.Index
+    time: TimeIndex
+    required: np.ndarray
+    availability: np.ndarray
+    availability_dates: List[str]
+    age: np.ndarray
+    wage: np.ndarray
+    min_hours: np.ndarray
+    max_hours: np.ndarray
+    night_rate: float
+    holiday_rate: float
+
+    @classmethod
+    def from_tables(
+        cls, staff: pd.DataFrame, availability: pd.DataFrame, demand: pd.DataFrame, wages: pd.Series
+    ) -> "CompactInput":
+        """Validate the tables and build the arrays; raises ``ValueError`` for malformed sheets."""
+        for sheet, table in (("Staff", staff), ("Availability", availability), ("Demand", demand)):
+            missing = [column for column in REQUIRED_COLUMNS[sheet] if column not in table.columns]
+            if missing:
+                raise ValueError(f"{sheet} sheet is missing column(s) {', '.join(missing)}")
+        missing = [name for name in REQUIRED_COLUMNS["Wages"] if name not in wages.index]
+        if missing:
+            raise ValueError(f"Wages sheet is missing column(s) {', '.join(missing)}")
+
+        staff_ids = pd.Index(staff["StaffID"])
+        if staff_ids.has_duplicates:
+            raise ValueError(f"Staff sheet has duplicate StaffID {staff_ids[staff_ids.duplicated()][0]!r}")
+        numeric = {}
+        for column in REQUIRED_COLUMNS["Staff"][1:]:
+            values = pd.to_numeric(staff[column], errors="coerce")
+            if values.isna().any():
+                row = staff.loc[values.isna(), "StaffID"].iloc[0]
+                raise ValueError(f"Staff sheet has a missing or non-numeric {column} for {row!r}")
+            numeric[column] = values.to_numpy()
+        if (numeric["WeeklyMinH"] > numeric["WeeklyMaxH"]).any():
+            row = staff_ids[numeric["WeeklyMinH"] > numeric["WeeklyMaxH"]][0]
+            raise ValueError(f"Staff sheet has WeeklyMinH above WeeklyMaxH for {row!r}")
+
+        if demand.duplicated(["Date", "Slot"]).any():
+            date, slot = demand.loc[demand.duplicated(["Date", "Slot"]), ["Date", "Slot"]].iloc[0]
+            raise ValueError(f"Demand sheet lists slot {date} {slot} more than once")
+        required = pd.to_numeric(demand["RequiredCnt"], errors="coerce")
+        if required.isna().any() or (required < 0).any():
+            raise ValueError("Demand sheet has a missing or negative RequiredCnt")
+        time = TimeIndex.from_demand(demand)
+
+        codes = availability["Availability"].map(AVAILABILITY_CODES)
+        if codes.isna().any():
+            value = availability.loc[codes.isna(), "Availability"].iloc[0]
+            raise ValueError(f"Availability sheet has invalid value {value!r}; expected NG, OK or Wish")
+        staff_pos = staff_ids.get_indexer(availability["StaffID"])
+        if (staff_pos < 0).any():
+            unknown = availability.loc[staff_pos < 0, "StaffID"].iloc[0]
+            raise ValueError(f"Availability sheet refers to unknown StaffID {unknown!r}")
+        if availability.duplicated(["StaffID", "Date", "Slot"]).any():
+            row = availability.loc[availability.duplicated(["StaffID", "Date", "Slot"])].iloc[0]
+            raise ValueError(f"Availability sheet lists {row.StaffID} {row.Date} {row.Slot} more than once")
+        slot_pos = pd.MultiIndex.from_tuples(time.slot_keys, names=["Date", "Slot"]).get_indexer(
+            pd.MultiIndex.from_arrays([availability["Date"], availability["Slot"]])
+        )
+        # availability for slots without demand is ignored
+        known = slot_pos >= 0
+        matrix = np.full((len(staff_ids), len(time)), AVAIL_NG, dtype=np.int8)
+        matrix[staff_pos[known], slot_pos[known]] = codes.to_numpy(dtype=np.int8)[known]
+
+        return cls(
+            staff_ids=staff_ids,
+            time=time,
+            required=required.to_numpy(dtype=np.int64),
+            availability=matrix,
+            availability_dates=list(pd.unique(availability["Date"])),
+            age=numeric["Age"].astype(np.int64),
+            wage=numeric["HourlyWage"].astype(np.int64),
+            min_hours=numeric["WeeklyMinH"].astype(np.int64),
+            max_hours=numeric["WeeklyMaxH"].astype(np.int64),
+            night_rate=float(wages["NightRate"]),
+            holiday_rate=float(wages["HolidayRate"]),
+        )
+
 
 @dataclass
 class InputData:
-    """Container for input tables loaded from Excel."""
+    """Container for input tables loaded from Excel.
+
+    ``compact`` is the validated array form of the tables, built on first
+    access; call :meth:`invalidate` after changing a table in place.
+    """
 
     staff: pd.DataFrame
     availability: pd.DataFrame
     demand: pd.DataFrame
     wages: pd.Series
+    _compact: Optional[CompactInput] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def compact(self) -> CompactInput:
+        if self._compact is None:
+            self._compact = CompactInput.from_tables(self.staff, self.availability, self.demand, self.wages)
+        return self._compact
+
+    def validate(self) -> "InputData":
+        """Check the tables and build :attr:`compact`; raises ``ValueError`` if malformed."""
+        self.compact
+        return self
+
+    def invalidate(self) -> None:
+        """Drop :attr:`compact` so it is rebuilt from the current tables."""
+        self._compact = None
+
+    def copy(self) -> "InputData":
+        """Copy the tables and, if built, the arrays of :attr:`compact`."""
+        data = InputData(self.staff.copy(), self.availability.copy(), self.demand.copy(), self.wages.copy())
+        compact = self._compact
+        if compact is not None:
+            data._compact = replace(
+                compact,
+                required=compact.required.copy(),
+                availability=compact.availability.copy(),
+                min_hours=compact.min_hours.copy(),
+                max_hours=compact.max_hours.copy(),
+            )
+        return data
+
+
+def _has_module(name: str) -> bool:
+    return importlib.util.find_spec(name) is not None
+
+
+def excel_engine() -> Optional[str]:
+    """Fastest available ``pd.read_excel`` engine, ``None`` for the pandas default."""
+    version = tuple(int(part) for part in pd.__version__.split(".")[:2])
+    if version >= (2, 2) and _has_module("python_calamine"):
+        return "calamine"
+    return None
+
+
+def _parquet_available() -> bool:
+    return _has_module("pyarrow") or _has_module("fastparquet")
+
+
+def _from_tables(tables: Dict[str, pd.DataFrame]) -> InputData:
+    data = InputData(tables["Staff"], tables["Availability"], tables["Demand"], tables["Wages"].iloc[0])
+    return data.validate()
+
+
+def _read_table_dir(path: Path) -> Dict[str, pd.DataFrame]:
+    files = {file.stem.lower(): file for file in path.iterdir() if file.suffix.lower() in TABLE_READERS}
+    tables = {}
+    for name in TABLES:
+        file = files.get(name.lower())
+        if file is None:
+            raise FileNotFoundError(f"{path} has no {name} table ({', '.join(TABLE_READERS)})")
+        tables[name] = TABLE_READERS[file.suffix.lower()](file)
+    return tables
+
+
+def _read_excel(source) -> Dict[str, pd.DataFrame]:
+    xls = pd.ExcelFile(source, engine=excel_engine())
+    return {name: pd.read_excel(xls, name) for name in TABLES}
+
+
+def _input_cache_dir() -> Path:
+    from .cache import DEFAULT_CACHE_DIR
+
+    return DEFAULT_CACHE_DIR / "inputs"
+
+
+def _load_cached(entry: Path) -> Optional[Dict[str, pd.DataFrame]]:
+    try:
+        if entry.is_dir():
+            return {name: pd.read_parquet(entry / f"{name}.parquet") for name in TABLES}
+        with open(entry.with_suffix(".pkl"), "rb") as fh:
+            return pickle.load(fh)
+    except (OSError, ValueError, pickle.UnpicklingError, EOFError):
+        return None
+
+
+def _store_cached(entry: Path, tables: Dict[str, pd.DataFrame]) -> None:
+    entry.parent.mkdir(parents=True, exist_ok=True)
+    stored = False
+    if _parquet_available():
+        try:
+            entry.mkdir(exist_ok=True)
+            for name, table in tables.items():
+                table.to_parquet(entry / f"{name}.parquet", index=False)
+            stored = True
+        except (ValueError, TypeError):  # columns Parquet cannot represent
+            for file in entry.glob("*.parquet"):
+                file.unlink()
+            entry.rmdir()
+    if not stored:
+        with open(entry.with_suffix(".pkl"), "wb") as fh:
+            pickle.dump(tables, fh, protocol=pickle.HIGHEST_PROTOCOL)
+
+    # other processes may evict the same entries concurrently
+    entries = []
+    for path in entry.parent.iterdir():
+        try:
+            entries.append((path.stat().st_mtime, path))
+        except OSError:
+            continue
+    entries.sort()
+    for _, old in entries[: max(0, len(entries) - MAX_CACHED_WORKBOOKS)]:
+        try:
+            if old.is_dir():
+                for file in old.iterdir():
+                    file.unlink(missing_ok=True)
+                old.rmdir()
+            else:
+                old.unlink(missing_ok=True)
+        except OSError:
+            continue
+
+
+def _read_workbook(content: bytes, stamp: str, cache: bool) -> InputData:
+    """Parse workbook ``content``, reusing the cached tables of an identical file."""
+    if not cache:
+        return _from_tables(_read_excel(BytesIO(content)))
+    key = hashlib.sha256(content + stamp.encode()).hexdigest()
+    entry = _input_cache_dir() / key
+    tables = _load_cached(entry)
+    if tables is None:
+        tables = _read_excel(BytesIO(content))
+        try:
+            _store_cached(entry, tables)
+        except OSError:  # entry evicted by another process while writing; the tables are still good
+            pass
+    return _from_tables(tables)
+
+
+def read_data(path: Union[str, Path], *, cache: bool = False) -> InputData:
+    """Load the required tables from ``path``.
 
+    ``path`` is an Excel workbook with Staff, Availability, Demand and Wages
+    sheets, or a directory with one CSV, Parquet or Arrow/Feather file per
+    table (``staff.csv``, ``availability.parquet``, ...).  With ``cache``
+    parsed workbooks are cached as Parquet (pickle without a Parquet engine)
+    keyed by the file hash and modification time, so repeated runs skip
+    Excel parsing.  The cache is shared by every process of the user; it
+    tolerates concurrent use but a pool of readers gains little from it.
+    """
+    path = Path(path)
+    if path.is_dir():
+        return _from_tables(_read_table_dir(path))
+    if path.suffix.lower() not in EXCEL_SUFFIXES:
+        raise ValueError(f"Unsupported input {path}; expected an Excel workbook or a directory of tables")
+    return _read_workbook(path.read_bytes(), str(path.stat().st_mtime_ns), cache)
 
-def read_data(path: str) -> InputData:
-    """Load the required tables from ``path``."""
-    xls = pd.ExcelFile(path)
-    staff = pd.read_excel(xls, "Staff")
-    avail = pd.read_excel(xls, "Availability")
-    demand = pd.read_excel(xls, "Demand")
-    wages = pd.read_excel(xls, "Wages").iloc[0]
-    return InputData(staff, avail, demand, wages)
 
+def read_data_from_bytes(content: bytes, *, cache: bool = False) -> InputData:
+    """Load the tables from an uploaded Excel workbook's bytes."""
+    return _read_workbook(content, "", cache)
@@ -0,0 +1,199 @@
+"""Pre-solve feasibility checks on :class:`InputData`.
+
+Every check is a necessary condition of the MILP, so a reported violation
+proves the model infeasible.  An empty list does not prove it feasible.
+The checks are vectorized over ``InputData.compact`` and take milliseconds
+even for large stores, which is much cheaper than letting CBC spend its
+time limit before it reports "Infeasible" without a reason:
+
+* ``slot_supply``: a slot needs more staff than are available (OK/Wish).
+* ``minor_night``: a night slot has enough available staff only when
+  under-18 staff are counted.
+* ``min_hours``: a staff member's WeeklyMinH is more than their available
+  slots can give.  This accounts for the daily slot cap, the worked-day
+  cap, WeeklyMaxH and the slot length.
+* ``day_capacity``: a day needs more assignments than the available staff
+  can take at the daily slot cap.
+* ``day_off``: the horizon needs more staff-days than staff can work while
+  keeping their days off.
+* ``total_hours``: the demand needs more hours than the staff can work.
+"""
+
+from dataclasses import asdict, dataclass
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .data import AVAIL_NG, InputData
+from .model import MAX_SLOTS_PER_DAY, MAX_WORKED_DAYS
+
+
+@dataclass
+class Violation:
+    """One failed check; ``required`` exceeds ``available``."""
+
+    check: str
+    message: str
+    required: float
+    available: float
+    staff_id: Optional[str] = None
+    date: Optional[str] = None
+    slot: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        # plain floats so violations serialize to JSON
+        self.required, self.available = float(self.required), float(self.available)
+
+
+class InfeasibleInputError(ValueError):
+    """Raised when the input fails the pre-solve checks; see ``violations``."""
+
+    def __init__(self, violations: List[Violation]) -> None:
+        self.violations = violations
+        lines = "\n".join(f"  - {violation.message}" for violation in violations)
+        super().__init__(f"Input is infeasible ({len(violations)} problem(s)):\n{lines}")
+
+
+def _hours(value: float) -> str:
+    return f"{value:g}h"
+
+
+def check_feasibility(
+    data: InputData,
+    *,
+    max_slots_per_day: int = MAX_SLOTS_PER_DAY,
+    max_worked_days: int = MAX_WORKED_DAYS,
+) -> List[Violation]:
+    """Return the violations of the necessary feasibility conditions of ``data``."""
+    compact = data.compact
+    time = compact.time
+    staff_ids = list(compact.staff_ids)
+    required = compact.required
+    hours = time.hours.astype(float)
+    available = compact.availability != AVAIL_NG
+    minor = compact.age < 18
+    feasible = available & ~(minor[:, None] & time.is_night[None, :])
+    violations: List[Violation] = []
+
+    # slot supply, with and without under-18 staff at night
+    supply = available.sum(axis=0)
+    adult_supply = feasible.sum(axis=0)
+    for t in np.nonzero(required > adult_supply)[0].tolist():
+        date, slot = time.slot_keys[t]
+        if required[t] > supply[t]:
+            violations.append(
+                Violation(
+                    "slot_supply",
+                    f"{date} {slot} needs {required[t]} staff but only {supply[t]} are available",
+                    required[t],
+                    supply[t],
+                    date=date,
+                    slot=slot,
+                )
+            )
+        else:
+            violations.append(
+                Violation(
+                    "minor_night",
+                    f"{date} {slot} needs {required[t]} staff but only {adult_supply[t]} available staff "
+                    f"are 18 or older ({supply[t] - adult_supply[t]} under-18 staff cannot work at night)",
+                    required[t],
+                    adult_supply[t],
+                    date=date,
+                    slot=slot,
+                )
+            )
+
+    # per staff and day: the most hours and slots a person can work that day
+    days = [time.day_slots.get(date, []) for date in compact.availability_dates]
+    capped = np.zeros(len(hours), dtype=bool)
+    day_hours = np.zeros((len(staff_ids), len(days)))
+    day_slots = np.zeros((len(staff_ids), len(days)), dtype=np.int64)
+    for d, day in enumerate(days):
+        capped[day] = True
+        if not day:
+            continue
+        slot_hours = np.where(feasible[:, day], hours[day], 0.0)
+        best = -np.sort(-slot_hours, axis=1)[:, :max_slots_per_day]
+        day_hours[:, d] = best.sum(axis=1)
+        day_slots[:, d] = np.minimum(feasible[:, day].sum(axis=1), max_slots_per_day)
+
+    # min hours reachability: best worked days plus slots outside the daily limits
+    best_days = -np.sort(-day_hours, axis=1)[:, :max_worked_days]
+    reachable = best_days.sum(axis=1) + (feasible[:, ~capped] * hours[~capped]).sum(axis=1)
+    reachable = np.minimum(reachable, compact.max_hours)
+    if len(hours) and np.all(hours == hours[0]) and hours[0] > 0:
+        # every assignment adds a whole slot, so hours are multiples of its length
+        reachable = np.floor(reachable / hours[0]) * hours[0]
+    for i in np.nonzero(compact.min_hours > reachable)[0].tolist():
+        violations.append(
+            Violation(
+                "min_hours",
+                f"{staff_ids[i]} needs WeeklyMinH {_hours(compact.min_hours[i])} but can work at most "
+                f"{_hours(reachable[i])} (availability, {max_slots_per_day} slots a day, "
+                f"{max_worked_days} days, WeeklyMaxH {_hours(compact.max_hours[i])})",
+                compact.min_hours[i],
+                reachable[i],
+                staff_id=staff_ids[i],
+            )
+        )
+
+    # day capacity and staff-days
+    needed_days = 0
+    for d, (date, day) in enumerate(zip(compact.availability_dates, days)):
+        if not day:
+            continue
+        demand = int(required[day].sum())
+        capacity = int(day_slots[:, d].sum())
+        if demand > capacity:
+            violations.append(
+                Violation(
+                    "day_capacity",
+                    f"{date} needs {demand} assignments but the available staff can take at most "
+                    f"{capacity} ({max_slots_per_day} slots a day each)",
+                    demand,
+                    capacity,
+                    date=date,
+                )
+            )
+        needed_days += max(int(required[day].max()), -(-demand // max_slots_per_day))
+    workable_days = int(np.minimum((day_slots > 0).sum(axis=1), max_worked_days).sum())
+    if needed_days > workable_days:
+        violations.append(
+            Violation(
+                "day_off",
+                f"The horizon needs at least {needed_days} staff-days but staff can work at most "
+                f"{workable_days} ({max_worked_days} days each)",
+                needed_days,
+                workable_days,
+            )
+        )
+
+    # total hours
+    demand_hours = float((required * hours).sum())
+    max_hours = float(reachable.sum())
+    if demand_hours > max_hours:
+        violations.append(
+            Violation(
+                "total_hours",
+                f"Demand needs {_hours(demand_hours)} but the staff can work at most {_hours(max_hours)} "
+                f"within availability and WeeklyMaxH",
+                demand_hours,
+                max_hours,
+            )
+        )
+    return violations
+
+
+def violations_frame(violations: List[Violation]) -> pd.DataFrame:
+    """Violations as a table, e.g. for an output sheet."""
+    columns = list(Violation.__dataclass_fields__)
+    return pd.DataFrame([asdict(violation) for violation in violations], columns=columns)
+
+
+def ensure_feasible(data: InputData, **limits) -> None:
+    """Raise :class:`InfeasibleInputError` if ``data`` fails :func:`check_feasibility`."""
+    violations = check_feasibility(data, **limits)
+    if violations:
+        raise InfeasibleInputError(violations)
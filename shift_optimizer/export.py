@@ -0,0 +1,118 @@
+"""Writing result tables to Excel, CSV, Parquet or JSON."""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .data import InputData
+
+EXPORT_FORMATS = (".xlsx", ".csv", ".parquet", ".json")
+
+
+def schedule_grid(schedule_df: pd.DataFrame, data: InputData) -> pd.DataFrame:
+    """Return the schedule as a wide 0/1 grid, one row per staff and one column per slot.
+
+    Rows follow the Staff sheet and columns (``"<Date> <Slot>"``) the Demand
+    sheet, so unassigned staff and slots appear as all-zero rows/columns.
+    """
+    compact = data.compact
+    slot_keys = pd.MultiIndex.from_tuples(compact.time.slot_keys, names=["Date", "Slot"])
+    grid = np.zeros((len(compact.staff_ids), len(slot_keys)), dtype=np.int8)
+    if len(schedule_df):
+        staff_pos = compact.staff_ids.get_indexer(schedule_df["StaffID"])
+        slot_pos = slot_keys.get_indexer(pd.MultiIndex.from_arrays([schedule_df["Date"], schedule_df["Slot"]]))
+        grid[staff_pos, slot_pos] = 1
+    columns = [f"{date} {slot}" for date, slot in compact.time.slot_keys]
+    grid_df = pd.DataFrame(grid, columns=columns)
+    grid_df.insert(0, "StaffID", compact.staff_ids.to_numpy())
+    return grid_df
+
+
+def _write_excel_rows(output_path: Path, tables: Dict[str, pd.DataFrame]) -> None:
+    """Write ``tables`` row by row with xlsxwriter's ``constant_memory`` mode.
+
+    ``DataFrame.to_excel`` writes column by column, which constant-memory
+    worksheets cannot accept, so the rows are written here directly.
+    """
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(str(output_path), {"constant_memory": True})
+    try:
+        for name, table in tables.items():
+            worksheet = workbook.add_worksheet(name)
+            worksheet.write_row(0, 0, [str(column) for column in table.columns])
+            values = table.astype(object).where(table.notna(), None)
+            for row, record in enumerate(values.itertuples(index=False, name=None), start=1):
+                worksheet.write_row(row, 0, record)
+    finally:
+        workbook.close()
+
+
+def export_results(
+    tables: Dict[str, pd.DataFrame], output_path: str, *, constant_memory: bool = False
+) -> List[str]:
+    """Write named result tables in the format given by the suffix of ``output_path``.
+
+    ``.xlsx`` writes one sheet per table, optionally in xlsxwriter's
+    ``constant_memory`` mode for very large schedules.  ``.json`` writes one
+    object mapping table names to lists of records.  ``.csv`` and
+    ``.parquet`` write one file per table, named ``<stem>_<table>.<suffix>``.
+    Returns the written paths.
+    """
+    path = Path(output_path)
+    suffix = path.suffix.lower()
+    if suffix == ".xlsx":
+        if constant_memory:
+            _write_excel_rows(path, tables)
+        else:
+            with pd.ExcelWriter(path, engine="xlsxwriter") as writer:
+                for name, table in tables.items():
+                    table.to_excel(writer, sheet_name=name, index=False)
+        return [str(path)]
+    if suffix == ".json":
+        payload = {name: json.loads(table.to_json(orient="records")) for name, table in tables.items()}
+        path.write_text(json.dumps(payload, indent=1))
+        return [str(path)]
+    if suffix in (".csv", ".parquet"):
+        written = []
+        for name, table in tables.items():
+            table_path = path.with_name(f"{path.stem}_{name.lower()}{suffix}")
+            if suffix == ".csv":
+                table.to_csv(table_path, index=False)
+            else:
+                table.to_parquet(table_path, index=False)
+            written.append(str(table_path))
+        return written
+    raise ValueError(f"Unsupported output format {suffix!r}; expected one of {', '.join(EXPORT_FORMATS)}")
+
+
+def export_to_excel(
+    schedule_df: pd.DataFrame,
+    hours_df: pd.DataFrame,
+    kpi_df: pd.DataFrame,
+    output_path: str,
+    diagnostics_df: Optional[pd.DataFrame] = None,
+    *,
+    grid_df: Optional[pd.DataFrame] = None,
+    weeks_df: Optional[pd.DataFrame] = None,
+    constant_memory: bool = False,
+) -> None:
+    """Write results to an Excel file (or CSV/Parquet/JSON by suffix).
+
+    ``grid_df`` adds the wide staff x slot Grid sheet, ``weeks_df`` the
+    per-week table of a weekly decomposition and ``diagnostics_df`` a
+    Diagnostics sheet.
+    """
+    tables = {"Schedule": schedule_df, "Hours": hours_df, "KPI": kpi_df}
+    if grid_df is not None:
+        tables["Grid"] = grid_df
+    if weeks_df is not None:
+        tables["Weeks"] = weeks_df
+    if diagnostics_df is not None:
+        tables["Diagnostics"] = diagnostics_df
+    written = export_results(tables, output_path, constant_memory=constant_memory)
+
+    print(f"Written solution to {', '.join(written)}")
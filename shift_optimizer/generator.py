@@ -0,0 +1,114 @@
+"""Parameterized synthetic instances shaped like ``sample_shift_input.xlsx``."""
+
+from datetime import date, timedelta
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .data import InputData
+
+SLOTS = ["10-14", "14-18", "18-22", "22-26"]
+
+# RequiredCnt for 30 staff on Mon-Thu; the weekend_peak profile adds staff on Fri-Sun
+BASE_DEMAND = [3, 2, 4, 2]
+DEMAND_PROFILES = ("weekend_peak", "flat", "random")
+
+
+def _demand_counts(
+    profile: str, dates: Sequence[date], num_slots: int, scale: float, rng: np.random.Generator
+) -> np.ndarray:
+    """Return the date x slot RequiredCnt matrix for ``profile``."""
+    if profile == "random":
+        return rng.integers(2, 5, size=(len(dates), num_slots)) * max(1, int(scale))
+    base = np.resize(np.array(BASE_DEMAND, dtype=float), num_slots)
+    counts = np.tile(base, (len(dates), 1))
+    if profile == "weekend_peak":
+        weekday = np.array([day.weekday() for day in dates])
+        counts[np.isin(weekday, [4, 5])] += 1  # Fri, Sat
+        if num_slots > 1:
+            counts[weekday == 6, 1] += 1  # Sunday afternoon
+    elif profile != "flat":
+        raise ValueError(f"Unknown demand profile {profile!r}; expected one of {', '.join(DEMAND_PROFILES)}")
+    return np.maximum(1, np.rint(counts * scale)).astype(np.int64)
+
+
+def generate_instance(
+    num_staff: int = 30,
+    num_weeks: int = 1,
+    *,
+    slots: Sequence[str] = SLOTS,
+    ng_ratio: float = 0.2,
+    wish_ratio: float = 0.1,
+    minor_share: Optional[float] = None,
+    demand_profile: str = "weekend_peak",
+    num_profiles: Optional[int] = None,
+    start: date = date(2025, 5, 26),
+    seed: int = 42,
+) -> InputData:
+    """Return a random instance with ``num_staff`` staff over ``num_weeks`` weeks.
+
+    Each availability cell is ``NG`` with probability ``ng_ratio``, ``Wish``
+    with ``wish_ratio`` and ``OK`` otherwise.  Ages are drawn uniformly from
+    17-30 unless ``minor_share`` fixes the share of under-18 staff.  Demand
+    follows ``demand_profile`` (one of ``DEMAND_PROFILES``) and grows with
+    the staff count, relative to 30 staff.  With ``num_profiles`` the staff
+    are drawn from that many profiles (age, wage, hour bounds and
+    availability row), so staff sharing a profile are interchangeable.
+    """
+    if ng_ratio < 0 or wish_ratio < 0 or ng_ratio + wish_ratio > 1:
+        raise ValueError("ng_ratio and wish_ratio must be non-negative and sum to at most 1")
+    rng = np.random.default_rng(seed)
+
+    staff_ids = [f"S{i + 1:04d}" for i in range(num_staff)]
+    # one row per profile; without num_profiles every staff member is a profile
+    num_rows = num_staff if num_profiles is None else num_profiles
+    if minor_share is None:
+        ages = rng.integers(17, 31, size=num_rows)
+    else:
+        ages = np.where(rng.random(num_rows) < minor_share, 17, rng.integers(18, 31, size=num_rows))
+    profile = pd.DataFrame(
+        {
+            "Age": ages,
+            "HourlyWage": np.where(ages < 18, 1050, rng.integers(1100, 1301, size=num_rows)),
+            "WeeklyMinH": rng.choice([4, 8, 12], size=num_rows),
+            "WeeklyMaxH": rng.choice([20, 24, 28, 32], size=num_rows),
+        }
+    )
+
+    days = [start + timedelta(days=i) for i in range(7 * num_weeks)]
+    dates = [day.strftime("%Y-%m-%d") for day in days]
+    cells = rng.choice(
+        ["OK", "NG", "Wish"], p=[1 - ng_ratio - wish_ratio, ng_ratio, wish_ratio], size=(num_rows, len(dates) * len(slots))
+    )
+    if num_profiles is not None:
+        of = rng.integers(0, num_profiles, size=num_staff)
+        profile, cells = profile.iloc[of].reset_index(drop=True), cells[of]
+    staff = pd.DataFrame(
+        {"StaffID": staff_ids, "Name": [f"Staff_{i + 1:04d}" for i in range(num_staff)], **profile}
+    )
+    avail = pd.DataFrame(
+        [(sid, day, slot) for sid in staff_ids for day in dates for slot in slots],
+        columns=["StaffID", "Date", "Slot"],
+    )
+    avail["Availability"] = cells.ravel()
+
+    demand = pd.DataFrame([(day, slot) for day in dates for slot in slots], columns=["Date", "Slot"])
+    scale = num_staff / 30 if demand_profile != "random" else num_staff // 30
+    demand["RequiredCnt"] = _demand_counts(demand_profile, days, len(slots), scale, rng).ravel()
+
+    wages = pd.Series({"NormalRate": 1.0, "NightRate": 1.25, "HolidayRate": 1.35})
+    return InputData(staff, avail, demand, wages)
+
+
+def write_instance(data: InputData, path: str) -> None:
+    """Write ``data`` as an input workbook readable by :func:`read_data`."""
+    sheets: Dict[str, pd.DataFrame] = {
+        "Staff": data.staff,
+        "Availability": data.availability,
+        "Demand": data.demand,
+        "Wages": data.wages.to_frame().T,
+    }
+    with pd.ExcelWriter(path, engine="xlsxwriter") as writer:
+        for name, frame in sheets.items():
+            frame.to_excel(writer, sheet_name=name, index=False)
@@ -0,0 +1,111 @@
+"""Greedy construction heuristic for the shift scheduling model.
+
+The heuristic works on the prepared staff x slot arrays of a
+``ShiftSchedulingModel``.  It fills every slot's ``RequiredCnt`` in order of
+scarcity while respecting the hours bounds, the daily slot cap, the
+worked-days cap and the under-18 night ban, then repairs staff that are
+still below their minimum hours.  The result can be used as a draft
+schedule on its own or as a MIP start for CBC.
+"""
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .model import ShiftSchedulingModel
+
+
+@dataclass
+class HeuristicSolution:
+    """Assignment found by :func:`greedy_schedule`."""
+
+    assign: np.ndarray
+    hours: np.ndarray
+    objective: float
+    shortfall: Dict[Tuple[str, str], int]
+    below_min: Dict[str, int]
+
+    @property
+    def feasible(self) -> bool:
+        return not self.shortfall and not self.below_min
+
+
+def greedy_schedule(
+    model: "ShiftSchedulingModel",
+    *,
+    max_slots_per_day: int,
+    max_worked_days: int,
+    initial: Optional[np.ndarray] = None,
+) -> HeuristicSolution:
+    """Build a schedule for ``model`` whose parameters have been prepared.
+
+    ``initial`` is an optional staff x slot assignment to repair instead of
+    starting from an empty schedule, e.g. the previous solution after an edit.
+    """
+    compact = model.data.compact
+    time = model.time
+    feasible = model.feasible_matrix
+    score = model.w_cost * model.cost_matrix - model.w_wish * model.wish_matrix
+    wish = model.wish_matrix.astype(bool)
+    slot_hours = time.hours
+    slot_date = time.slot_date
+    min_h = compact.min_hours
+    max_h = compact.max_hours
+    req = np.array([model.req[key] for key in model.slot_keys])
+
+    n_staff, n_slots = feasible.shape
+    assign = np.zeros((n_staff, n_slots), dtype=bool) if initial is None else initial & feasible
+    hours = (assign * slot_hours).sum(axis=1)
+    day_count = np.zeros((n_staff, len(time.dates)), dtype=np.int64)
+    np.add.at(day_count, (slice(None), slot_date), assign.astype(np.int64))
+
+    def can_take(t: int) -> np.ndarray:
+        d = slot_date[t]
+        worked = day_count[:, d] > 0
+        return (
+            feasible[:, t]
+            & ~assign[:, t]
+            & (hours + slot_hours[t] <= max_h)
+            & (day_count[:, d] < max_slots_per_day)
+            & (worked | ((day_count > 0).sum(axis=1) < max_worked_days))
+        )
+
+    def take(staff: np.ndarray, t: int) -> None:
+        assign[staff, t] = True
+        hours[staff] += slot_hours[t]
+        day_count[staff, slot_date[t]] += 1
+
+    # 1. cover demand, scarcest slots first
+    slack = feasible.sum(axis=0) - req
+    for t in np.argsort(slack, kind="stable").tolist():
+        candidates = np.nonzero(can_take(t))[0]
+        if not len(candidates):
+            continue
+        below = hours[candidates] < min_h[candidates]
+        order = np.lexsort((hours[candidates], score[candidates, t], ~wish[candidates, t], ~below))
+        take(candidates[order[: max(req[t] - assign[:, t].sum(), 0)]], t)
+
+    # 2. top up staff that are still below their minimum hours, cheapest slots first
+    for s in np.nonzero(hours < min_h)[0].tolist():
+        for t in np.argsort(score[s], kind="stable").tolist():
+            if hours[s] >= min_h[s]:
+                break
+            d = slot_date[t]
+            if (
+                feasible[s, t]
+                and not assign[s, t]
+                and hours[s] + slot_hours[t] <= max_h[s]
+                and day_count[s, d] < max_slots_per_day
+                and (day_count[s, d] > 0 or (day_count[s] > 0).sum() < max_worked_days)
+            ):
+                take(np.array([s]), t)
+
+    covered = assign.sum(axis=0)
+    shortfall = {model.slot_keys[t]: int(req[t] - covered[t]) for t in np.nonzero(covered < req)[0].tolist()}
+    below_min = {model.staff_ids[s]: int(min_h[s] - hours[s]) for s in np.nonzero(hours < min_h)[0].tolist()}
+
+    mean_h = hours.mean() if n_staff else 0.0
+    objective = float((score * assign).sum() + model.w_fair * np.abs(hours - mean_h).sum())
+    return HeuristicSolution(assign, hours, objective, shortfall, below_min)
@@ -0,0 +1,275 @@
+"""Weekly decomposition of multi-week planning horizons.
+
+``ShiftSchedulingModel`` applies WeeklyMinH/WeeklyMaxH, the worked-day
+cap and fairness across every date of the Demand sheet, which is only
+right for a one-week horizon.  :func:`solve_weekly` splits the input into
+7-day weeks counted from the first Demand date, applies those rules per
+week and solves the weeks as independent matrix models in a process
+pool.  A partial last week has its WeeklyMinH scaled by its length.
+
+Neighbouring weeks interact only at their boundaries, so the weeks are
+solved in two waves: first the even weeks, then the odd weeks with both
+neighbours fixed.  Each odd week is coupled to them by
+
+* rest: a slot is blocked for a staff member if it starts less than
+  ``rest_hours`` after their last shift of the previous week ends (a
+  22-26 slot ends at 02:00 of the next day) or ends less than
+  ``rest_hours`` before their first shift of the next week;
+* carry-over fairness: deviations are measured on the hours of the week
+  plus the hours already worked in the even weeks, against their overall
+  mean (see :meth:`MatrixModel.set_hours_offset`).
+
+The week schedules are then stitched into one schedule whose KPIs cover
+the whole horizon.
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pulp
+
+from .data import InputData
+from .model import W_COST, W_FAIR, W_WISH, ShiftSchedulingModel
+from .timeindex import TimeIndex
+
+DAYS_PER_WEEK = 7
+# daily rest between the last shift of one week and the first of the next
+MIN_REST_HOURS = 11
+# LpSolution names of weeks that have a schedule
+_SOLVED = (pulp.LpSolution[pulp.LpSolutionOptimal], pulp.LpSolution[pulp.LpSolutionIntegerFeasible])
+
+
+@dataclass
+class Week:
+    """One week of a horizon; ``slots`` are its slot indices in the full input."""
+
+    index: int
+    dates: List[str]
+    slots: np.ndarray
+    days: int
+
+
+@dataclass
+class _WeekTask:
+    data: InputData
+    options: Dict[str, object]
+    time_limit: int
+    offset: Optional[np.ndarray] = None
+
+
+@dataclass
+class HorizonSolution:
+    """Stitched schedule of a weekly decomposition.
+
+    ``assign`` is the staff x slot assignment of the full input,
+    ``week_hours`` the staff x week hours and ``weeks`` has one row per
+    week with its status, KPIs, runtime and the number of cells blocked by
+    the rest coupling.
+    """
+
+    data: InputData
+    assign: np.ndarray
+    week_hours: np.ndarray
+    weeks: pd.DataFrame
+    weights: Tuple[float, float, float]
+
+    @property
+    def failed(self) -> List[int]:
+        """Numbers of the weeks without a schedule."""
+        return self.weeks.loc[~self.weeks["Solution"].isin(_SOLVED), "Week"].tolist()
+
+    def results(self) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """Schedule, Hours and KPI frames in the format of ``ShiftSchedulingModel.results``.
+
+        Hours adds one ``Week<n>`` column per week next to the horizon total.
+        """
+        compact = self.data.compact
+        staff_ids = list(compact.staff_ids)
+        staff_pos, slot_pos = np.nonzero(self.assign)
+        slot_keys = np.array(compact.time.slot_keys, dtype=object).reshape(-1, 2)
+        schedule_df = pd.DataFrame(
+            {
+                "StaffID": np.asarray(staff_ids, dtype=object)[staff_pos],
+                "Date": slot_keys[slot_pos, 0],
+                "Slot": slot_keys[slot_pos, 1],
+                "Assigned": np.ones(len(staff_pos), dtype=np.int64),
+            }
+        )
+
+        hours = self.week_hours.sum(axis=1)
+        hours_df = pd.DataFrame({"StaffID": staff_ids, "Hours": hours})
+        for w in range(self.week_hours.shape[1]):
+            hours_df[f"Week{w + 1}"] = self.week_hours[:, w]
+
+        w_cost, w_wish, w_fair = self.weights
+        cost = int(self.weeks["TotalCost"].fillna(0).sum())
+        wish = int(self.weeks["WishSatisfied"].fillna(0).sum())
+        fairness = float(np.abs(hours - hours.mean()).sum()) if len(hours) else 0.0
+        kpi_df = pd.DataFrame(
+            [
+                {
+                    "ObjectiveValue": w_cost * cost - w_wish * wish + w_fair * fairness,
+                    "TotalCost": cost,
+                    "WishSatisfied": wish,
+                    "Fairness": fairness,
+                }
+            ]
+        )
+        return schedule_df, hours_df, kpi_df
+
+
+def split_weeks(data: InputData) -> List[Week]:
+    """Split the Demand dates of ``data`` into 7-day weeks from the first date."""
+    time_index = data.compact.time
+    day = pd.to_datetime(pd.Series(time_index.dates), format="%Y-%m-%d")
+    elapsed = (day - day.min()).dt.days.to_numpy()
+    day_week = elapsed // DAYS_PER_WEEK
+    horizon_days = int(elapsed.max()) + 1 if len(elapsed) else 0
+    slot_week = day_week[time_index.slot_date]
+
+    weeks = []
+    for w in np.unique(day_week).tolist():
+        weeks.append(
+            Week(
+                index=w,
+                dates=[date for date, week in zip(time_index.dates, day_week.tolist()) if week == w],
+                slots=np.nonzero(slot_week == w)[0],
+                days=min(DAYS_PER_WEEK, horizon_days - w * DAYS_PER_WEEK),
+            )
+        )
+    return weeks
+
+
+def week_data(data: InputData, week: Week, blocked: Optional[np.ndarray] = None) -> InputData:
+    """Return the input restricted to ``week``.
+
+    ``blocked`` is an optional staff x week-slot mask of cells to make NG.
+    WeeklyMinH of a partial week is scaled by its number of days.
+    """
+    demand = data.demand[data.demand["Date"].isin(week.dates)].reset_index(drop=True)
+    availability = data.availability[data.availability["Date"].isin(week.dates)].reset_index(drop=True)
+    staff = data.staff
+    if week.days < DAYS_PER_WEEK:
+        staff = staff.copy()
+        staff["WeeklyMinH"] = staff["WeeklyMinH"] * week.days // DAYS_PER_WEEK
+    if blocked is not None and blocked.any():
+        compact = data.compact
+        s, t = np.nonzero(blocked)
+        keys = np.array(compact.time.slot_keys, dtype=object).reshape(-1, 2)[week.slots[t]]
+        cells = pd.MultiIndex.from_arrays([np.asarray(compact.staff_ids, dtype=object)[s], keys[:, 0], keys[:, 1]])
+        hit = pd.MultiIndex.from_frame(availability[["StaffID", "Date", "Slot"]]).isin(cells)
+        availability.loc[hit, "Availability"] = "NG"
+    return InputData(staff, availability, demand, data.wages).validate()
+
+
+def rest_blocks(
+    week: Week,
+    fixed: np.ndarray,
+    slot_week: np.ndarray,
+    time_index: TimeIndex,
+    rest_hours: float,
+) -> np.ndarray:
+    """Staff x week-slot mask of cells too close to the shifts in ``fixed``.
+
+    ``fixed`` is the staff x slot assignment of the already solved weeks;
+    distances are measured on the absolute hours of ``time_index``.
+    """
+    abs_start, abs_end = time_index.abs_start, time_index.abs_end
+    before = fixed & (slot_week < week.index)
+    after = fixed & (slot_week > week.index)
+    last_end = np.where(before, abs_end, -np.inf).max(axis=1, initial=-np.inf)
+    first_start = np.where(after, abs_start, np.inf).min(axis=1, initial=np.inf)
+    starts, ends = abs_start[week.slots], abs_end[week.slots]
+    return (starts[None, :] < last_end[:, None] + rest_hours) | (ends[None, :] + rest_hours > first_start[:, None])
+
+
+def _solve_week(task: _WeekTask) -> dict:
+    """Build and solve one week as a matrix model."""
+    model = ShiftSchedulingModel(task.data, sparse=True, backend="matrix", **task.options)
+    model.build()
+    if task.offset is not None:
+        model.matrix.set_hours_offset(task.offset)
+    start = time.perf_counter()
+    model.solve(msg=False, time_limit=task.time_limit)
+    runtime = time.perf_counter() - start
+
+    row = {
+        "Status": pulp.LpStatus[model.problem.status],
+        "Solution": pulp.LpSolution[model.problem.sol_status],
+        "Runtime": runtime,
+    }
+    if row["Solution"] in _SOLVED:
+        _, _, kpi_df = model.results()
+        row.update(kpi_df.iloc[0].to_dict())
+        row["assign"] = model.assignment()
+    else:
+        row["assign"] = np.zeros(model.x_exists.shape, dtype=bool)
+    return row
+
+
+def solve_weekly(
+    data: InputData,
+    *,
+    processes: Optional[int] = None,
+    time_limit: int = 300,
+    rest_hours: float = MIN_REST_HOURS,
+    carry_over: bool = True,
+    solver: str = "cbc",
+    threads: Optional[int] = None,
+    gap: Optional[float] = None,
+    w_cost: float = W_COST,
+    w_wish: float = W_WISH,
+    w_fair: float = W_FAIR,
+) -> HorizonSolution:
+    """Solve ``data`` week by week in a process pool and stitch the schedules.
+
+    ``time_limit`` applies to each week.  ``rest_hours=0`` only keeps
+    shifts of neighbouring weeks from overlapping, and ``carry_over=False``
+    measures fairness within each week.  ``solver`` is ``"cbc"`` or
+    ``"highs"``; a week without a solution contributes no assignments and
+    is listed in ``failed``.
+    """
+    if solver not in ("cbc", "highs"):
+        raise ValueError(f"Weekly decomposition supports the cbc and highs solvers, not {solver!r}")
+    weeks = split_weeks(data)
+    compact = data.compact
+    n_staff, n_slots = compact.availability.shape
+    options = dict(solver=solver, threads=threads, gap=gap, w_cost=w_cost, w_wish=w_wish, w_fair=w_fair)
+    slot_week = np.zeros(n_slots, dtype=np.int64)
+    for week in weeks:
+        slot_week[week.slots] = week.index
+
+    assign = np.zeros((n_staff, n_slots), dtype=bool)
+    rows: Dict[int, dict] = {}
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        for wave in (weeks[0::2], weeks[1::2]):
+            if not wave:
+                continue
+            fixed = assign.copy()
+            offset = None
+            if carry_over and fixed.any():
+                offset = (fixed * compact.time.hours).sum(axis=1)
+            blocked = [rest_blocks(week, fixed, slot_week, compact.time, rest_hours) for week in wave]
+            tasks = [
+                _WeekTask(week_data(data, week, mask), options, time_limit, offset)
+                for week, mask in zip(wave, blocked)
+            ]
+            for week, mask, row in zip(wave, blocked, pool.map(_solve_week, tasks)):
+                assign[:, week.slots] = row.pop("assign")
+                row["Blocked"] = int(mask.sum())
+                rows[week.index] = row
+
+    week_hours = np.zeros((n_staff, len(weeks)))
+    table = []
+    for w, week in enumerate(weeks):
+        week_hours[:, w] = (assign[:, week.slots] * compact.time.hours[week.slots]).sum(axis=1)
+        table.append({"Week": week.index + 1, "Start": week.dates[0], "End": week.dates[-1], **rows[week.index]})
+    table_df = pd.DataFrame(table)
+    for column in ("ObjectiveValue", "TotalCost", "WishSatisfied", "Fairness"):
+        if column not in table_df:
+            table_df[column] = np.nan
+    return HorizonSolution(data, assign, week_hours, table_df, (w_cost, w_wish, w_fair))
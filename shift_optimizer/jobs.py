@@ -0,0 +1,258 @@
+"""Background solve jobs with a bounded worker pool.
+
+Jobs wait in a FIFO queue until one of ``max_workers`` slots is free and
+then solve in their own child process.  The child starts a new session so
+cancelling a job kills the CBC subprocess PuLP launched along with it.
+Anytime jobs send every improved incumbent back while they run, so the
+best schedule so far is available on the job before it finishes.
+"""
+
+import multiprocessing as mp
+import os
+import signal
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Tuple
+
+import pulp
+
+from .anytime import Incumbent
+from .cache import Result, SolutionCache, cache_key, run_model
+from .data import InputData
+from .model import ShiftSchedulingModel
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+# finished jobs kept until popped; older ones are dropped on submit
+MAX_FINISHED_JOBS = 64
+
+
+class JobLimitError(RuntimeError):
+    """Raised when a user already has the maximum number of active jobs."""
+
+
+@dataclass
+class Job:
+    """State of one submitted solve."""
+
+    id: str
+    user: str
+    data: Optional[InputData] = field(default=None, repr=False)
+    status: str = QUEUED
+    submitted: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    result: Optional[Result] = None
+    cached: bool = False
+    error: Optional[str] = None
+    # latest incumbent of an anytime job, and the frames and count of its schedules
+    incumbent: Optional[Incumbent] = None
+    best: Optional[Result] = None
+    schedules: int = 0
+    _process: Optional[mp.process.BaseProcess] = field(default=None, repr=False)
+
+    @property
+    def active(self) -> bool:
+        return self.status in (QUEUED, RUNNING)
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds spent running so far, zero while queued."""
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+
+def _run_anytime(
+    conn, data: InputData, *, time_limit: int = 300, warm_start: bool = False, **options
+) -> Tuple[Result, bool]:
+    """Solve like ``run_model`` while sending each incumbent over ``conn``."""
+    model = ShiftSchedulingModel(data, **options)
+    model.build()
+    for incumbent in model.iter_incumbents(time_limit=time_limit, warm_start=warm_start):
+        schedule = model.results() if incumbent.assign is not None else None
+        conn.send(("incumbent", (replace(incumbent, assign=None), schedule)))
+    solved = model.problem.sol_status in (pulp.LpSolutionOptimal, pulp.LpSolutionIntegerFeasible)
+    return model.results(), solved
+
+
+def _solve_child(conn, data: InputData, settings: dict) -> None:
+    if hasattr(os, "setsid"):
+        os.setsid()  # own process group, so CBC is killed with us
+    try:
+        if settings.pop("anytime", False):
+            conn.send(("ok", _run_anytime(conn, data, **settings)))
+        else:
+            conn.send(("ok", run_model(data, msg=False, **settings)))
+    except Exception as exc:  # reported back to the parent as a failed job
+        conn.send(("error", f"{type(exc).__name__}: {exc}"))
+    finally:
+        conn.close()
+
+
+def _kill(process: mp.process.BaseProcess) -> None:
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(process.pid, signal.SIGKILL)
+            return
+    except ProcessLookupError:  # the child has not called setsid yet
+        pass
+    process.kill()
+
+
+class JobManager:
+    """Queue of solve jobs run by at most ``max_workers`` processes at once.
+
+    Each user may have ``max_per_user`` queued or running jobs.  Finished
+    jobs stay until :meth:`pop`, apart from the oldest beyond
+    ``MAX_FINISHED_JOBS``.  When a
+    :class:`SolutionCache` is given, cached results complete immediately
+    and new solutions are stored in it.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_workers: int = 2,
+        max_per_user: int = 1,
+        cache: Optional[SolutionCache] = None,
+    ) -> None:
+        self.max_per_user = max_per_user
+        self.cache = cache
+        self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix="solve-job")
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        # spawn rather than fork: the Dash server is multi-threaded
+        self._context = mp.get_context("spawn")
+
+    def submit(
+        self,
+        user: str,
+        data: InputData,
+        *,
+        time_limit: int = 300,
+        warm_start: bool = False,
+        anytime: bool = False,
+        **options,
+    ) -> Job:
+        """Queue a solve of ``data`` for ``user`` and return its job.
+
+        ``options`` are passed to :class:`ShiftSchedulingModel`.  With
+        ``anytime`` the job solves with ``iter_incumbents`` and keeps the
+        latest incumbent on ``incumbent`` and ``best``.  Raises
+        :class:`JobLimitError` if ``user`` is already at the limit.
+        """
+        settings = dict(time_limit=time_limit, warm_start=warm_start, **options)
+        if anytime:
+            settings["anytime"] = True
+        with self._lock:
+            active = sum(job.active and job.user == user for job in self._jobs.values())
+            if active >= self.max_per_user:
+                raise JobLimitError(f"{user} already has {active} active job(s)")
+            job = Job(uuid.uuid4().hex, user, data)
+            self._jobs[job.id] = job
+            self._prune()
+
+        key = None
+        if self.cache is not None:
+            key = cache_key(data, **settings)
+            result = self.cache.get(key)
+            if result is not None:
+                job.started = job.finished = time.time()
+                job.result, job.cached, job.status = result, True, DONE
+                return job
+
+        self._pool.submit(self._run, job, data, settings, key)
+        return job
+
+    def _run(self, job: Job, data: InputData, settings: dict, key: Optional[str]) -> None:
+        with self._lock:
+            if job.status != QUEUED:  # cancelled while waiting
+                return
+            receiver, sender = self._context.Pipe(duplex=False)
+            process = self._context.Process(target=_solve_child, args=(sender, data, settings), daemon=True)
+            job.status, job.started, job._process = RUNNING, time.time(), process
+            process.start()
+        sender.close()
+
+        try:
+            outcome, payload = receiver.recv()
+            while outcome == "incumbent":
+                with self._lock:
+                    job.incumbent, schedule = payload
+                    if schedule is not None:
+                        job.best = schedule
+                        job.schedules += 1
+                outcome, payload = receiver.recv()
+        except EOFError:  # killed or crashed before reporting
+            outcome, payload = "error", None
+        process.join()
+        receiver.close()
+
+        with self._lock:
+            job.finished = time.time()
+            job._process = None
+            if job.status == CANCELLED:
+                return
+            if outcome == "ok":
+                job.result, solved = payload
+                job.status = DONE
+            else:
+                job.error = payload or f"Solver process exited with code {process.exitcode}"
+                job.status = FAILED
+        if outcome == "ok" and solved and key is not None:
+            self.cache.put(key, job.result)
+
+    def _prune(self) -> None:
+        # finished jobs nobody popped, e.g. of closed browser sessions
+        finished = [job_id for job_id, job in self._jobs.items() if not job.active]
+        for job_id in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Job:
+        """Return the job with ``job_id``; raises ``KeyError`` if unknown."""
+        return self._jobs[job_id]
+
+    def jobs(self, user: Optional[str] = None) -> List[Job]:
+        """Jobs in submission order, optionally only those of ``user``."""
+        with self._lock:
+            return [job for job in self._jobs.values() if user is None or job.user == user]
+
+    def position(self, job_id: str) -> int:
+        """Number of queued jobs ahead of ``job_id``."""
+        with self._lock:
+            job = self._jobs[job_id]
+            return sum(other.status == QUEUED and other.submitted < job.submitted for other in self._jobs.values())
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job; returns ``False`` if it already finished."""
+        with self._lock:
+            job = self._jobs[job_id]
+            if not job.active:
+                return False
+            process = job._process
+            job.status = CANCELLED
+            if process is None:
+                job.finished = time.time()
+        if process is not None:
+            _kill(process)
+        return True
+
+    def pop(self, job_id: str) -> Job:
+        """Forget a finished job and return it."""
+        with self._lock:
+            if self._jobs[job_id].active:
+                raise ValueError(f"Job {job_id} is still {self._jobs[job_id].status}")
+            return self._jobs.pop(job_id)
+
+    def shutdown(self) -> None:
+        """Cancel all active jobs and stop the worker threads."""
+        for job in self.jobs():
+            self.cancel(job.id)
+        self._pool.shutdown(wait=True)
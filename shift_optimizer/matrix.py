@@ -0,0 +1,499 @@
+"""Matrix based assembly of the shift scheduling MILP.
+
+Instead of building ``pulp.LpAffineExpression`` objects, the constraint
+matrix is assembled directly as NumPy COO triplets and written to an MPS
+file in bulk.  Columns and rows follow the exact order ``PuLP`` would use,
+so CBC receives the same problem as with the expression based build.
+"""
+
+import os
+import subprocess
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import numpy as np
+import pulp
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .metrics import ModelMetrics
+    from .model import ShiftSchedulingModel
+
+
+@dataclass
+class MatrixModel:
+    """A MILP in matrix form: ``min c'x`` subject to ``A x (<=, >=, ==) b``."""
+
+    col_names: List[str]
+    integer: np.ndarray
+    binary: np.ndarray
+    obj: np.ndarray
+    in_obj: np.ndarray
+    rows: np.ndarray
+    cols: np.ndarray
+    vals: np.ndarray
+    sense: np.ndarray
+    rhs: np.ndarray
+    # column indices of the variable blocks read back after solving
+    x_cols: np.ndarray
+    h_cols: np.ndarray
+    mean_col: int
+    dev_cols: np.ndarray
+    y_cols: np.ndarray
+    # staff x slot column / row lookups used by incremental edits (-1 where absent)
+    x_index: np.ndarray
+    avail_rows: np.ndarray
+    demand_rows: np.ndarray
+    min_rows: np.ndarray
+    max_rows: np.ndarray
+    # staff x 2 rows of the two absolute-deviation inequalities
+    dev_rows: np.ndarray
+    values: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        # PuLP writes columns sorted by variable name and renames them X0000000...
+        self.column_order = np.array(sorted(range(self.num_cols), key=self.col_names.__getitem__), dtype=np.int64)
+        # columns whose upper bound has been set to zero
+        self.fixed = np.zeros(self.num_cols, dtype=bool)
+
+    @property
+    def num_rows(self) -> int:
+        return len(self.rhs)
+
+    @property
+    def num_cols(self) -> int:
+        return len(self.col_names)
+
+    def write_mps(self, path: str) -> None:
+        """Write the model in the renamed fixed-column MPS layout used by ``PuLP``."""
+        order = self.column_order
+        col_label = np.array(["X%07d" % i for i in range(self.num_cols)], dtype=object)
+        row_label = ["C%07d" % i for i in range(self.num_rows)]
+        rank = np.empty_like(order)
+        rank[order] = np.arange(self.num_cols)
+
+        # sort nonzeros column-major (in written column order), then by row
+        nz = np.lexsort((self.rows, rank[self.cols]))
+        nz_rank = rank[self.cols[nz]]
+        nz_rows = self.rows[nz].tolist()
+        uniq, inverse = np.unique(self.vals[nz], return_inverse=True)
+        fmt = ["% .12e" % v for v in uniq.tolist()]
+        entry = [f"  {row_label[r]}  {fmt[k]}\n" for r, k in zip(nz_rows, inverse.tolist())]
+        starts = np.searchsorted(nz_rank, np.arange(self.num_cols + 1)).tolist()
+
+        columns_lines = []
+        for pos in range(self.num_cols):
+            col = order[pos]
+            name = col_label[pos]
+            if self.integer[col]:
+                columns_lines.append("    MARK      'MARKER'                 'INTORG'\n")
+            prefix = f"    {name}"
+            columns_lines.extend(prefix + line for line in entry[starts[pos] : starts[pos + 1]])
+            if self.in_obj[col]:
+                columns_lines.append(f"{prefix}  OBJ       {'% .12e' % self.obj[col]}\n")
+            if self.integer[col]:
+                columns_lines.append("    MARK      'MARKER'                 'INTEND'\n")
+
+        rhs_lines = ["    RHS       %s  % .12e\n" % (row_label[i], b) for i, b in enumerate(self.rhs.tolist())]
+        bound_lines = []
+        for pos in range(self.num_cols):
+            col = order[pos]
+            if self.fixed[col]:
+                bound_lines.append(f" FX BND       {col_label[pos]}   0.000000000000e+00\n")
+            elif self.binary[col]:
+                bound_lines.append(f" BV BND       {col_label[pos]}\n")
+            elif self.integer[col]:
+                bound_lines.append(f" LO BND       {col_label[pos]}   0.000000000000e+00\n")
+
+        with open(path, "w") as f:
+            f.write("*SENSE:Minimize\n")
+            f.write("NAME          MODEL\n")
+            f.write("ROWS\n")
+            f.write(" N  OBJ\n")
+            f.write("".join(f" {s}  {row_label[i]}\n" for i, s in enumerate(self.sense.tolist())))
+            f.write("COLUMNS\n")
+            f.write("".join(columns_lines))
+            f.write("RHS\n")
+            f.write("".join(rhs_lines))
+            f.write("BOUNDS\n")
+            f.write("".join(bound_lines))
+            f.write("ENDATA\n")
+
+    def write_start(self, path: str, values: np.ndarray) -> None:
+        """Write ``values`` as a CBC solution file usable with ``-mips``."""
+        lines = ["Stopped on time - objective value 0\n"]
+        lines += [
+            "{:>7} {} {:>15} {:>23}\n".format(pos, "X%07d" % pos, value, 0)
+            for pos, value in enumerate(values[self.column_order].tolist())
+        ]
+        with open(path, "w") as f:
+            f.writelines(lines)
+
+    def set_hours_offset(self, offset: np.ndarray) -> None:
+        """Measure fairness on ``h + offset`` instead of ``h``.
+
+        ``offset`` holds hours worked outside the model, e.g. in the earlier
+        weeks of a horizon, so deviations are taken from the overall mean.
+        """
+        delta = np.asarray(offset, dtype=float) - np.mean(offset)
+        self.rhs[self.dev_rows[:, 0]] = delta
+        self.rhs[self.dev_rows[:, 1]] = -delta
+
+    def objective_value(self) -> float:
+        """Evaluate the objective in the same term order as ``pulp.value``."""
+        total = 0
+        for col in np.concatenate([self.x_cols, self.dev_cols]).tolist():
+            total += self.values[col] * self.obj[col]
+        return total
+
+
+def _pulp_name(prefix: str, key) -> str:
+    return f"{prefix}_{key}".translate(pulp.LpElement.trans)
+
+
+def objective_coefficients(model: "ShiftSchedulingModel", n_cols: int, dev_cols: np.ndarray) -> np.ndarray:
+    """Return the objective vector for the current weights of ``model``.
+
+    Only the objective depends on the weights, so an assembled matrix can be
+    re-weighted by replacing its ``obj`` with the result of this function.
+    """
+    obj = np.zeros(n_cols, dtype=object)
+    obj[: int(model.x_exists.sum())] = (model.w_cost * model.cost_matrix - model.w_wish * model.wish_matrix)[
+        model.x_exists
+    ]
+    obj[dev_cols] = model.w_fair
+    return obj
+
+
+def assemble(
+    model: "ShiftSchedulingModel",
+    *,
+    max_slots_per_day: int,
+    max_worked_days: int,
+) -> MatrixModel:
+    """Build the constraint matrix of ``model`` from its prepared parameters."""
+    compact = model.data.compact
+    staff_ids = model.staff_ids
+    slot_keys = model.slot_keys
+    dates = list(model.dates_unique)
+    n_staff, n_slots, n_dates = len(staff_ids), len(slot_keys), len(dates)
+
+    exists = model.x_exists
+    x_id = np.full((n_staff, n_slots), -1, dtype=np.int64)
+    x_id[exists] = np.arange(int(exists.sum()))
+    n_x = int(exists.sum())
+
+    # column layout: x | h | mean_h | dev | y
+    h_col = n_x + np.arange(n_staff)
+    mean_col = n_x + n_staff
+    dev_col = mean_col + 1 + np.arange(n_staff)
+    y_col = (mean_col + 1 + n_staff + np.arange(n_staff * n_dates)).reshape(n_staff, n_dates)
+    n_cols = mean_col + 1 + n_staff + n_staff * n_dates
+
+    col_names = [_pulp_name("x", key) for key in model.x_keys]
+    col_names += [_pulp_name("h", sid) for sid in staff_ids]
+    col_names.append("mean_h")
+    col_names += [_pulp_name("dev", sid) for sid in staff_ids]
+    col_names += [_pulp_name("worked", (sid, date)) for sid in staff_ids for date in dates]
+
+    integer = np.zeros(n_cols, dtype=bool)
+    binary = np.zeros(n_cols, dtype=bool)
+    integer[:n_x] = binary[:n_x] = True
+    integer[h_col] = True
+    integer[y_col.ravel()] = binary[y_col.ravel()] = True
+
+    in_obj = np.zeros(n_cols, dtype=bool)
+    in_obj[:n_x] = in_obj[dev_col] = True
+
+    rows: List[np.ndarray] = []
+    cols: List[np.ndarray] = []
+    vals: List[np.ndarray] = []
+    sense: List[np.ndarray] = []
+    rhs: List[np.ndarray] = []
+    offset = 0
+
+    def add(block_rows, block_cols, block_vals, block_sense, block_rhs) -> None:
+        rows.append(offset + np.asarray(block_rows, dtype=np.int64))
+        cols.append(np.asarray(block_cols, dtype=np.int64))
+        vals.append(np.broadcast_to(np.asarray(block_vals, dtype=float), np.shape(block_rows)))
+        sense.append(np.broadcast_to(np.asarray(block_sense, dtype=object), np.shape(block_rhs)))
+        rhs.append(np.asarray(block_rhs, dtype=float))
+
+    s_idx, t_idx = np.nonzero(exists)
+    x_of = x_id[s_idx, t_idx]
+    time = model.time
+
+    # x == 0 for unavailable cells and for under-18 night cells (dense build only)
+    avail_rows = np.full((n_staff, n_slots), -1, dtype=np.int64)
+    if not model.sparse:
+        minor = compact.age < 18
+        unavailable = model.avail_matrix == 0
+        count = unavailable.astype(np.int64) + (minor[:, None] & time.is_night[None, :])
+        cell = np.repeat(np.arange(count.size), count.ravel())
+        add(np.arange(cell.size), x_id.ravel()[cell], 1, "E", np.zeros(cell.size))
+        # the availability row comes first within each cell
+        first = (np.cumsum(count.ravel()) - count.ravel()).reshape(n_staff, n_slots)
+        avail_rows[unavailable] = first[unavailable]
+        offset += cell.size
+
+    # demand coverage
+    add(t_idx, x_of, 1, "G", [model.req[key] for key in slot_keys])
+    demand_rows = offset + np.arange(n_slots)
+    offset += n_slots
+
+    # hours definition and bounds: three rows per staff member
+    min_h = compact.min_hours
+    max_h = compact.max_hours
+    staff3 = 3 * np.arange(n_staff)
+    add(
+        np.concatenate([3 * s_idx, staff3, staff3 + 1, staff3 + 2]),
+        np.concatenate([x_of, h_col, h_col, h_col]),
+        np.concatenate([-time.hours[t_idx], np.ones(3 * n_staff)]),
+        np.tile(["E", "G", "L"], n_staff),
+        np.column_stack([np.zeros(n_staff), min_h, max_h]).ravel(),
+    )
+    min_rows, max_rows = offset + staff3 + 1, offset + staff3 + 2
+    offset += 3 * n_staff
+
+    # at most two slots per day
+    date_pos = {date: i for i, date in enumerate(dates)}
+    slot_date = np.array([date_pos.get(date, -1) for date, _ in slot_keys], dtype=np.int64)
+    daily = slot_date >= 0
+    sel = daily[t_idx]
+    add(s_idx[sel] * n_dates + slot_date[t_idx[sel]], x_of[sel], 1, "L", np.full(n_staff * n_dates, float(max_slots_per_day)))
+    offset += n_staff * n_dates
+
+    # x <= worked links, followed by the worked-days cap, per staff member
+    link_slots = np.nonzero(daily)[0]
+    link_slots = link_slots[np.lexsort((time.start[link_slots], slot_date[link_slots]))]
+    linked = exists[:, link_slots]
+    per_staff = linked.sum(axis=1)
+    start = np.concatenate([[0], np.cumsum(per_staff + 1)[:-1]])
+    ls, lk = np.nonzero(linked)
+    link_row = start[ls] + np.cumsum(linked, axis=1)[ls, lk] - 1
+    lt = link_slots[lk]
+    cap_row = start + per_staff
+    n_link = int(per_staff.sum()) + n_staff
+    link_rhs = np.zeros(n_link)
+    link_rhs[cap_row] = max_worked_days
+    add(
+        np.concatenate([link_row, link_row, np.repeat(cap_row, n_dates)]),
+        np.concatenate([x_id[ls, lt], y_col[ls, slot_date[lt]], y_col.ravel()]),
+        np.concatenate([np.ones(len(ls)), -np.ones(len(ls)), np.ones(n_staff * n_dates)]),
+        "L",
+        link_rhs,
+    )
+    offset += n_link
+
+    # mean hours definition
+    add(
+        np.zeros(n_staff + 1),
+        np.concatenate([[mean_col], h_col]),
+        np.concatenate([[n_staff], -np.ones(n_staff)]),
+        "E",
+        [0.0],
+    )
+    offset += 1
+
+    # absolute deviation from the mean: dev - h + mean_h >= 0 and dev + h - mean_h >= 0
+    lower, upper = 2 * np.arange(n_staff), 2 * np.arange(n_staff) + 1
+    mean = np.full(n_staff, mean_col)
+    one = np.ones(n_staff)
+    add(
+        np.concatenate([lower, lower, lower, upper, upper, upper]),
+        np.concatenate([dev_col, h_col, mean, dev_col, h_col, mean]),
+        np.concatenate([one, -one, one, one, one, -one]),
+        "G",
+        np.zeros(2 * n_staff),
+    )
+    dev_rows = offset + np.column_stack([lower, upper])
+
+    return MatrixModel(
+        col_names=col_names,
+        integer=integer,
+        binary=binary,
+        obj=objective_coefficients(model, n_cols, dev_col),
+        in_obj=in_obj,
+        rows=np.concatenate(rows),
+        cols=np.concatenate(cols),
+        vals=np.concatenate(vals),
+        sense=np.concatenate(sense),
+        rhs=np.concatenate(rhs),
+        x_cols=np.arange(n_x),
+        h_cols=h_col,
+        mean_col=mean_col,
+        dev_cols=dev_col,
+        y_cols=y_col,
+        x_index=x_id,
+        avail_rows=avail_rows,
+        demand_rows=demand_rows,
+        min_rows=min_rows,
+        max_rows=max_rows,
+        dev_rows=dev_rows,
+    )
+
+
+def cbc_command(
+    matrix: MatrixModel,
+    problem: pulp.LpProblem,
+    *,
+    msg: bool,
+    time_limit: int,
+    initial: Optional[np.ndarray] = None,
+    metrics: Optional["ModelMetrics"] = None,
+    threads: Optional[int] = None,
+    gap: Optional[float] = None,
+) -> Tuple[pulp.PULP_CBC_CMD, List[str], Tuple[str, str, str]]:
+    """Write the MPS (and MIP start) files of ``matrix`` and return the CBC command.
+
+    Returns the PuLP solver object, the argument list matching
+    ``pulp.PULP_CBC_CMD`` and the MPS, solution and MIP start file names.
+    """
+    solver = pulp.PULP_CBC_CMD(msg=msg, timeLimit=time_limit, threads=threads, gapRel=gap)
+    tmp_mps, tmp_sol, tmp_mst = tmp_files = tuple(solver.create_tmp_files(problem.name, "mps", "sol", "mst"))
+    write_mps = matrix.write_mps if metrics is None else metrics.timed(matrix.write_mps, "write_mps")
+    write_mps(tmp_mps)
+
+    args = [solver.path, tmp_mps]
+    if initial is not None:
+        matrix.write_start(tmp_mst, initial)
+        args += ["-mips", tmp_mst]
+    args += ["-sec", str(time_limit)]
+    for option in solver.options + solver.getOptions():
+        args.extend(("-" + option).split())
+    args += ["-branch", "-printingOptions", "all", "-solution", tmp_sol]
+    return solver, args, tmp_files
+
+
+def read_cbc_solution(
+    matrix: MatrixModel,
+    problem: pulp.LpProblem,
+    solver: pulp.PULP_CBC_CMD,
+    tmp_files: Tuple[str, str, str],
+) -> None:
+    """Store the CBC solution file on ``matrix`` and its status on ``problem``, then delete the files."""
+    tmp_mps, tmp_sol, tmp_mst = tmp_files
+    status, sol_status = solver.get_status(tmp_sol)
+    written = np.zeros(matrix.num_cols)
+    with open(tmp_sol) as f:
+        next(f)
+        for line in f:
+            if len(line) <= 2:
+                break
+            parts = line.split()
+            if parts[0] == "**":
+                parts = parts[1:]
+            if parts[1].startswith("X"):
+                written[int(parts[1][1:])] = float(parts[2])
+    matrix.values = np.empty(matrix.num_cols)
+    matrix.values[matrix.column_order] = written
+    problem.assignStatus(status, sol_status)
+    solver.delete_tmp_files(tmp_mps, tmp_sol, tmp_mst)
+
+
+def solve_cbc(
+    matrix: MatrixModel,
+    problem: pulp.LpProblem,
+    *,
+    msg: bool,
+    time_limit: int,
+    initial: Optional[np.ndarray] = None,
+    log_path: Optional[str] = None,
+    metrics: Optional["ModelMetrics"] = None,
+    threads: Optional[int] = None,
+    gap: Optional[float] = None,
+) -> None:
+    """Solve ``matrix`` with the bundled CBC and store the solution vector on it.
+
+    The command line matches ``pulp.PULP_CBC_CMD`` and the solver status is
+    recorded on ``problem`` so ``pulp.LpStatus`` can be used as usual.
+    ``initial`` is an optional column vector passed to CBC as a MIP start.
+    As with PuLP's ``logPath``, the CBC output goes to ``log_path`` if given.
+    """
+    solver, args, tmp_files = cbc_command(
+        matrix,
+        problem,
+        msg=msg,
+        time_limit=time_limit,
+        initial=initial,
+        metrics=metrics,
+        threads=threads,
+        gap=gap,
+    )
+    if log_path:
+        pipe = open(log_path, "w")
+    else:
+        pipe = None if msg else open(os.devnull, "w")
+    try:
+        returncode = subprocess.Popen(args, stdout=pipe, stderr=pipe, stdin=subprocess.DEVNULL).wait()
+    finally:
+        if pipe is not None:
+            pipe.close()
+    if returncode != 0 or not os.path.exists(tmp_files[1]):
+        raise pulp.PulpSolverError(f"Pulp: Error while executing {solver.path}")
+    read_cbc_solution(matrix, problem, solver, tmp_files)
+
+
+def solve_highs(
+    matrix: MatrixModel,
+    problem: pulp.LpProblem,
+    *,
+    msg: bool,
+    time_limit: int,
+    gap: Optional[float] = None,
+) -> Dict[str, object]:
+    """Solve ``matrix`` with HiGHS through ``scipy.optimize.milp``.
+
+    Like :func:`solve_cbc` the solution vector is stored on ``matrix`` and
+    the status on ``problem``.  SciPy exposes neither MIP starts nor a
+    thread count, so both are ignored.  Returns the objective, best bound,
+    gap and node count.
+    """
+    try:
+        from scipy.optimize import Bounds, LinearConstraint, milp
+        from scipy.sparse import csr_matrix
+    except ImportError as exc:
+        raise RuntimeError("The highs solver with the matrix backend requires scipy") from exc
+
+    A = csr_matrix((matrix.vals, (matrix.rows, matrix.cols)), shape=(matrix.num_rows, matrix.num_cols))
+    lower = np.where(matrix.sense == "L", -np.inf, matrix.rhs)
+    upper = np.where(matrix.sense == "G", np.inf, matrix.rhs)
+    # MPS defaults: every column is non-negative, binaries are bounded by one
+    col_upper = np.where(matrix.binary, 1.0, np.inf)
+    col_upper[matrix.fixed] = 0.0
+    options = {"disp": msg, "time_limit": float(time_limit)}
+    if gap is not None:
+        options["mip_rel_gap"] = gap
+    res = milp(
+        matrix.obj.astype(float),
+        integrality=matrix.integer.astype(np.int8),
+        bounds=Bounds(np.zeros(matrix.num_cols), col_upper),
+        constraints=LinearConstraint(A, lower, upper),
+        options=options,
+    )
+
+    found = res.x is not None
+    if res.status == 0:
+        status, sol_status = pulp.LpStatusOptimal, pulp.LpSolutionOptimal
+    elif res.status == 1 and found:  # time limit with an incumbent, as CBC reports it
+        status, sol_status = pulp.LpStatusOptimal, pulp.LpSolutionIntegerFeasible
+    elif res.status == 1:
+        status, sol_status = pulp.LpStatusNotSolved, pulp.LpSolutionNoSolutionFound
+    elif res.status == 2:
+        status, sol_status = pulp.LpStatusInfeasible, pulp.LpSolutionInfeasible
+    elif res.status == 3:
+        status, sol_status = pulp.LpStatusUnbounded, pulp.LpSolutionUnbounded
+    else:
+        status, sol_status = pulp.LpStatusUndefined, pulp.LpSolutionNoSolutionFound
+    values = res.x if found else np.zeros(matrix.num_cols)
+    # HiGHS returns integers up to its feasibility tolerance
+    matrix.values = np.where(matrix.integer, np.round(values), values)
+    problem.assignStatus(status, sol_status)
+
+    stats: Dict[str, object] = {"result": res.message}
+    if found:
+        stats["objective"] = float(res.fun)
+    for name, attr in (("best_bound", "mip_dual_bound"), ("gap", "mip_gap"), ("nodes", "mip_node_count")):
+        value = getattr(res, attr, None)
+        if value is not None:
+            stats[name] = value
+    return stats
@@ -0,0 +1,148 @@
+"""Wall time, memory and solver statistics of an optimization run."""
+
+import re
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Callable, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+# summary lines CBC prints at the end of a solve
+_CBC_PATTERNS = {
+    "result": (r"^Result - (.+)$", str),
+    "objective": (r"^Objective value:\s+(\S+)", float),
+    "best_bound": (r"^Lower bound:\s+(\S+)", float),
+    "gap": (r"^Gap:\s+(\S+)", float),
+    "nodes": (r"^Enumerated nodes:\s+(\d+)", int),
+    "iterations": (r"^Total iterations:\s+(\d+)", int),
+    "cbc_seconds": (r"^Time \(Wallclock seconds\):\s+(\S+)", float),
+}
+
+
+def parse_cbc_log(text: str) -> Dict[str, object]:
+    """Extract the result, objective, bound, gap, nodes and time from a CBC log."""
+    stats: Dict[str, object] = {}
+    for name, (pattern, convert) in _CBC_PATTERNS.items():
+        match = re.search(pattern, text, re.MULTILINE)
+        if match:
+            stats[name] = convert(match.group(1))
+    if stats.get("result") == "Optimal solution found" and "objective" in stats:
+        # CBC only reports a bound and gap when it stops early
+        stats.setdefault("best_bound", stats["objective"])
+        stats.setdefault("gap", 0.0)
+    return stats
+
+
+@dataclass
+class Phase:
+    """Exclusive wall time and peak traced memory of one pipeline phase."""
+
+    name: str
+    seconds: float
+    peak_mb: Optional[float] = None
+
+
+@dataclass
+class ModelMetrics:
+    """Phase timings, model size and solver statistics of a run.
+
+    Wall times are always recorded.  With ``profile=True`` the peak Python
+    memory of each phase is traced with ``tracemalloc`` and the CBC log is
+    captured to fill :attr:`solver` with the bound, gap and node count.
+    Tracing runs only while a phase is open, so peaks count memory
+    allocated since the outermost open phase started.  Nested phases are
+    excluded from the time of the enclosing phase.
+    """
+
+    profile: bool = False
+    phases: List[Phase] = field(default_factory=list)
+    num_variables: int = 0
+    num_constraints: int = 0
+    num_nonzeros: int = 0
+    solver: Dict[str, object] = field(default_factory=dict)
+    _stack: List[list] = field(default_factory=list, init=False, repr=False)
+    # whether this object started tracemalloc, which then stops with the outermost phase
+    _tracing: bool = field(default=False, init=False, repr=False)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Record the block as phase ``name``."""
+        if self.profile:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._tracing = True
+            if self._stack:
+                outer = self._stack[-1]
+                outer[3] = max(outer[3], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        # name, start, seconds spent in nested phases, peak bytes
+        frame = [name, time.perf_counter(), 0.0, 0]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            seconds = time.perf_counter() - frame[1]
+            peak_mb = None
+            if self.profile:
+                frame[3] = max(frame[3], tracemalloc.get_traced_memory()[1])
+                peak_mb = frame[3] / 2**20
+            if self._stack:
+                self._stack[-1][2] += seconds
+                self._stack[-1][3] = max(self._stack[-1][3], frame[3])
+            elif self._tracing:
+                # tracing slows every allocation of a long-lived process
+                tracemalloc.stop()
+                self._tracing = False
+            self.phases.append(Phase(name, seconds - frame[2], peak_mb))
+
+    def timed(self, func: Callable, name: str) -> Callable:
+        """Wrap ``func`` so every call is recorded as phase ``name``."""
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.phase(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(phase.seconds for phase in self.phases)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Long ``Section``/``Metric``/``Value`` table for the Diagnostics sheet."""
+        rows = []
+        for phase in self.phases:
+            rows.append(("Time [s]", phase.name, round(phase.seconds, 4)))
+        rows.append(("Time [s]", "total", round(self.total_seconds, 4)))
+        if self.profile:
+            for phase in self.phases:
+                rows.append(("Peak memory [MB]", phase.name, round(phase.peak_mb, 2)))
+        rows += [
+            ("Model", "variables", self.num_variables),
+            ("Model", "constraints", self.num_constraints),
+            ("Model", "nonzeros", self.num_nonzeros),
+        ]
+        rows += [("Solver", name, value) for name, value in self.solver.items()]
+        return pd.DataFrame(rows, columns=["Section", "Metric", "Value"])
+
+    def report(self) -> str:
+        """Human readable summary, as printed by ``--profile``."""
+        lines = [f"{'Phase':<20} {'Time [s]':>10}" + (f" {'Peak [MB]':>10}" if self.profile else "")]
+        for phase in self.phases:
+            line = f"{phase.name:<20} {phase.seconds:>10.3f}"
+            if self.profile:
+                line += f" {phase.peak_mb:>10.1f}"
+            lines.append(line)
+        lines.append(f"{'total':<20} {self.total_seconds:>10.3f}")
+        lines.append(
+            f"Model: {self.num_variables} variables, {self.num_constraints} constraints, "
+            f"{self.num_nonzeros} nonzeros"
+        )
+        if self.solver:
+            lines.append("Solver: " + ", ".join(f"{name}={value}" for name, value in self.solver.items()))
+        return "\n".join(lines)
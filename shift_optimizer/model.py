@@ -1,18 +1,34 @@
 """Shift scheduling MILP model using ``PuLP``."""
 
+import os
+import tempfile
+import time
 from dataclasses import dataclass, field
-from datetime import datetime
-from typing import Dict, Tuple, List
+from typing import Dict, Iterator, Tuple, List, Optional
 
+import numpy as np
 import pandas as pd
 import pulp
 
-from .data import InputData
+from .aggregate import solve_aggregated, staff_classes
+from .anytime import SNAPSHOT_INTERVAL, AnytimeSolution, Incumbent, StopRule, iter_cbc, iter_cpsat
+from .cpsat import solve_cpsat
+from .data import AVAIL_NG, AVAIL_WISH, AVAILABILITY_CODES, InputData
+from .export import export_to_excel  # noqa: F401  (lived here before moving to export.py)
+from .heuristic import HeuristicSolution, greedy_schedule
+from .matrix import MatrixModel, assemble, solve_cbc, solve_highs
+from .metrics import ModelMetrics, parse_cbc_log
+from .patterns import solve_patterns
+from .solvers import check_solver, pulp_solver
+from .timeindex import TimeIndex
 
-SLOT_HOURS = 4
 W_COST = 1
 W_WISH = 1
 W_FAIR = 1
+MAX_SLOTS_PER_DAY = 2
+MAX_WORKED_DAYS = 6
+ENGINES = ("compact", "patterns")
+BACKENDS = ("pulp", "matrix")
 
 
 class BaseModel:
@@ -21,8 +37,31 @@ class BaseModel:
     def __init__(self, name: str, sense: int = pulp.LpMinimize) -> None:
         self.problem = pulp.LpProblem(name, sense)
 
-    def solve(self, *, msg: bool = True, time_limit: int = 300) -> None:
-        self.problem.solve(pulp.PULP_CBC_CMD(msg=msg, timeLimit=time_limit))
+    def solve(
+        self,
+        *,
+        msg: bool = True,
+        time_limit: int = 300,
+        warm_start: bool = False,
+        log_path: Optional[str] = None,
+        solver: str = "cbc",
+        threads: Optional[int] = None,
+        gap: Optional[float] = None,
+    ) -> None:
+        self.problem.solve(
+            pulp_solver(
+                solver,
+                msg=msg,
+                time_limit=time_limit,
+                threads=threads,
+                gap=gap,
+                warm_start=warm_start,
+                log_path=log_path,
+            )
+        )
+        self._check_status()
+
+    def _check_status(self) -> None:
         status = pulp.LpStatus[self.problem.status]
         if status not in {
             "Optimal",
@@ -37,9 +76,49 @@ class BaseModel:
 
 @dataclass
 class ShiftSchedulingModel(BaseModel):
-    """MILP model for weekly shift scheduling."""
+    """MILP model for weekly shift scheduling.
+
+    With ``sparse=True`` assignment variables are only created for feasible
+    (staff, slot) pairs instead of being fixed to zero by extra rows.
+    ``backend="matrix"`` assembles the same model as NumPy arrays and writes
+    the MPS file directly instead of going through ``pulp.lpSum``.
+    The objective weights ``w_cost``, ``w_wish`` and ``w_fair`` default to
+    the module level ``W_COST``, ``W_WISH`` and ``W_FAIR``.
+    ``solve(warm_start=True)`` passes a greedy schedule to CBC as a MIP start
+    and ``solve_heuristic()`` returns that schedule without calling CBC.
+    ``solver`` selects ``"cbc"`` (default), ``"highs"`` or ``"cpsat"`` (see
+    :mod:`shift_optimizer.solvers`); ``threads`` and ``gap`` set the thread
+    count and relative MIP gap of the chosen solver.
+    With ``aggregate=True`` interchangeable staff are solved as classes and
+    the class counts split back onto individuals (see
+    :mod:`shift_optimizer.aggregate`), falling back to the full model if
+    the split fails.
+    ``engine="patterns"`` solves a set-partitioning model over weekly
+    patterns by column generation instead of the compact model (see
+    :mod:`shift_optimizer.patterns`).
+    ``iter_incumbents()`` solves in anytime mode and yields each improved
+    schedule while the solver runs (see :mod:`shift_optimizer.anytime`).
+    Phase timings, the model size and solver statistics are collected in
+    ``metrics``; pass ``ModelMetrics(profile=True)`` to also trace memory
+    and parse the CBC log.
+
+    A built model can be edited in place with ``set_availability``,
+    ``set_demand`` and ``set_hours_bounds`` and re-solved with ``resolve()``,
+    which starts CBC from the previous solution.
+    """
 
     data: InputData
+    sparse: bool = False
+    backend: str = "pulp"
+    w_cost: float = W_COST
+    w_wish: float = W_WISH
+    w_fair: float = W_FAIR
+    solver: str = "cbc"
+    threads: Optional[int] = None
+    gap: Optional[float] = None
+    aggregate: bool = False
+    engine: str = "compact"
+    metrics: ModelMetrics = field(default_factory=ModelMetrics, repr=False)
     problem: pulp.LpProblem = field(init=False)
     x: Dict[Tuple[str, str, str], pulp.LpVariable] = field(init=False)
     h: Dict[str, pulp.LpVariable] = field(init=False)
@@ -50,64 +129,96 @@ class ShiftSchedulingModel(BaseModel):
     # internal caches used while building the model
     staff_ids: List[str] = field(init=False, repr=False)
     slot_keys: List[Tuple[str, str]] = field(init=False, repr=False)
+    time: TimeIndex = field(init=False, repr=False)
     req: Dict[Tuple[str, str], int] = field(init=False, repr=False)
     avail_ok: Dict[Tuple[str, str, str], int] = field(init=False, repr=False)
     wish: Dict[Tuple[str, str, str], int] = field(init=False, repr=False)
     cost: Dict[Tuple[str, str, str], int] = field(init=False, repr=False)
+    avail_matrix: np.ndarray = field(init=False, repr=False)
+    wish_matrix: np.ndarray = field(init=False, repr=False)
+    cost_matrix: np.ndarray = field(init=False, repr=False)
+    feasible_matrix: np.ndarray = field(init=False, repr=False)
+    x_exists: np.ndarray = field(init=False, repr=False)
+    x_keys: List[Tuple[str, str, str]] = field(init=False, repr=False)
+    matrix: MatrixModel = field(init=False, repr=False)
+    heuristic: HeuristicSolution = field(init=False, repr=False)
+    _heuristic_only: bool = field(default=False, init=False, repr=False)
+    _needs_rebuild: bool = field(default=False, init=False, repr=False)
+    _owns_data: bool = field(default=False, init=False, repr=False)
 
     def build(self) -> None:
         """Construct all variables, constraints and the objective."""
-        self._prepare_parameters()
-        self._create_variables()
-        self._add_constraints()
-        self._set_objective()
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown backend {self.backend!r}")
+        check_solver(self.solver)
+        if self.engine not in ENGINES:
+            raise ValueError(f"Unknown engine {self.engine!r}; expected one of {', '.join(ENGINES)}")
+        if self.engine == "patterns" and self.solver == "cpsat":
+            raise ValueError("The patterns engine solves its master problem with cbc or highs, not cpsat")
+        metrics = self.metrics
+        with metrics.phase("prepare_parameters"):
+            self._prepare_parameters()
+        if self.backend == "matrix":
+            with metrics.phase("assemble"):
+                self.matrix = assemble(
+                    self,
+                    max_slots_per_day=MAX_SLOTS_PER_DAY,
+                    max_worked_days=MAX_WORKED_DAYS,
+                )
+            metrics.num_variables = self.matrix.num_cols
+            metrics.num_constraints = self.matrix.num_rows
+            metrics.num_nonzeros = len(self.matrix.vals)
+            return
+        with metrics.phase("create_variables"):
+            self._create_variables()
+        with metrics.phase("add_constraints"):
+            self._add_constraints()
+        with metrics.phase("set_objective"):
+            self._set_objective()
+        metrics.num_variables = self.problem.numVariables()
+        metrics.num_constraints = self.problem.numConstraints()
+        metrics.num_nonzeros = sum(len(row) for row in self.problem.constraints.values())
 
     # ------------------------------------------------------------------
     # Model assembly helpers
     # ------------------------------------------------------------------
     def _prepare_parameters(self) -> None:
-        staff_df = self.data.staff
-        avail_df = self.data.availability
-        demand_df = self.data.demand
-        wages_row = self.data.wages
-
-        self.staff_ids = list(staff_df["StaffID"])
-        self.slot_keys = [(row.Date, row.Slot) for row in demand_df.itertuples()]
-
-        self.req = demand_df.set_index(["Date", "Slot"]).RequiredCnt.to_dict()
-        self.avail_ok = {
-            (r.StaffID, r.Date, r.Slot): 1 if r.Availability in ("OK", "Wish") else 0
-            for r in avail_df.itertuples()
-        }
-        self.wish = {
-            (r.StaffID, r.Date, r.Slot): 1 if r.Availability == "Wish" else 0
-            for r in avail_df.itertuples()
-        }
-
-        self.cost = {}
-        for sid in self.staff_ids:
-            base = int(staff_df.loc[staff_df.StaffID == sid, "HourlyWage"].values[0])
-            for date, slot in self.slot_keys:
-                is_night = slot == "22-26"
-                dt = datetime.strptime(date, "%Y-%m-%d")
-                is_holiday = dt.weekday() == 6
-                mult = 1.0
-                if is_night:
-                    mult *= wages_row["NightRate"]
-                if is_holiday:
-                    mult *= wages_row["HolidayRate"]
-                self.cost[(sid, date, slot)] = int(base * SLOT_HOURS * mult)
-
-        self.dates_unique = avail_df["Date"].unique()
+        compact = self.data.compact
+
+        self.staff_ids = list(compact.staff_ids)
+        self.time = compact.time
+        self.slot_keys = self.time.slot_keys
+        self.req = dict(zip(self.slot_keys, compact.required.tolist()))
+
+        # Dense staff x slot arrays; rows follow ``staff_ids``, columns ``slot_keys``.
+        n_staff, n_slots = len(self.staff_ids), len(self.slot_keys)
+        self.avail_matrix = (compact.availability != AVAIL_NG).astype(np.int8)
+        self.wish_matrix = (compact.availability == AVAIL_WISH).astype(np.int8)
+
+        mult = np.ones(n_slots)
+        mult = np.where(self.time.is_night, mult * compact.night_rate, mult)
+        mult = np.where(self.time.is_holiday, mult * compact.holiday_rate, mult)
+        base = compact.wage
+        self.cost_matrix = ((base[:, None] * self.time.hours[None, :]) * mult[None, :]).astype(np.int64)
+
+        minor = compact.age < 18
+        self.feasible_matrix = (self.avail_matrix == 1) & ~(minor[:, None] & self.time.is_night[None, :])
+        if self.sparse:
+            self.x_exists = self.feasible_matrix.copy()
+        else:
+            self.x_exists = np.ones((n_staff, n_slots), dtype=bool)
+        rows, cols = np.nonzero(self.x_exists)
+        self.x_keys = [(self.staff_ids[i], *self.slot_keys[j]) for i, j in zip(rows.tolist(), cols.tolist())]
+
+        keys = [(sid, date, slot) for sid in self.staff_ids for (date, slot) in self.slot_keys]
+        self.avail_ok = dict(zip(keys, self.avail_matrix.ravel().tolist()))
+        self.wish = dict(zip(keys, self.wish_matrix.ravel().tolist()))
+        self.cost = dict(zip(keys, self.cost_matrix.ravel().tolist()))
+
+        self.dates_unique = compact.availability_dates
 
     def _create_variables(self) -> None:
-        self.x = pulp.LpVariable.dicts(
-            "x",
-            ((sid, date, slot) for sid in self.staff_ids for (date, slot) in self.slot_keys),
-            lowBound=0,
-            upBound=1,
-            cat="Binary",
-        )
+        self.x = pulp.LpVariable.dicts("x", self.x_keys, lowBound=0, upBound=1, cat="Binary")
         self.h = pulp.LpVariable.dicts("h", self.staff_ids, lowBound=0, cat="Integer")
         self.mean_h = pulp.LpVariable("mean_h", lowBound=0)
         self.dev = pulp.LpVariable.dicts("dev", self.staff_ids, lowBound=0)
@@ -120,44 +231,62 @@ class ShiftSchedulingModel(BaseModel):
         )
 
     def _add_constraints(self) -> None:
-        staff_df = self.data.staff
-
-        for sid in self.staff_ids:
-            age = int(staff_df.loc[staff_df.StaffID == sid, "Age"].values[0])
-            for date, slot in self.slot_keys:
-                if self.avail_ok.get((sid, date, slot), 0) == 0:
-                    self.problem += self.x[(sid, date, slot)] == 0
-                if age < 18 and slot == "22-26":
-                    self.problem += self.x[(sid, date, slot)] == 0
+        compact = self.data.compact
+        time_index = self.time
+        ages = compact.age
+        min_hours = compact.min_hours.tolist()
+        max_hours = compact.max_hours.tolist()
+        slot_hours = time_index.hours.tolist()
+
+        # rows whose right-hand side can be changed by the edit API
+        self.avail_rows: Dict[Tuple[str, str, str], pulp.LpConstraint] = {}
+        self.demand_rows: Dict[Tuple[str, str], pulp.LpConstraint] = {}
+        self.min_rows: Dict[str, pulp.LpConstraint] = {}
+        self.max_rows: Dict[str, pulp.LpConstraint] = {}
+
+        if not self.sparse:
+            for i, sid in enumerate(self.staff_ids):
+                for t, (date, slot) in enumerate(self.slot_keys):
+                    if self.avail_matrix[i, t] == 0:
+                        row = self.x[(sid, date, slot)] == 0
+                        self.problem += row
+                        self.avail_rows[(sid, date, slot)] = row
+                    if ages[i] < 18 and time_index.is_night[t]:
+                        self.problem += self.x[(sid, date, slot)] == 0
 
         for date, slot in self.slot_keys:
-            self.problem += (
-                pulp.lpSum(self.x[(sid, date, slot)] for sid in self.staff_ids) >= self.req[(date, slot)]
+            row = (
+                pulp.lpSum(
+                    self.x[(sid, date, slot)] for sid in self.staff_ids if (sid, date, slot) in self.x
+                )
+                >= self.req[(date, slot)]
             )
-
-        for sid in self.staff_ids:
-            self.problem += self.h[sid] == SLOT_HOURS * pulp.lpSum(
-                self.x[(sid, date, slot)] for (date, slot) in self.slot_keys
+            self.problem += row
+            self.demand_rows[(date, slot)] = row
+
+        for i, sid in enumerate(self.staff_ids):
+            self.problem += self.h[sid] == pulp.LpAffineExpression(
+                (self.x[(sid, date, slot)], slot_hours[t])
+                for t, (date, slot) in enumerate(self.slot_keys)
+                if (sid, date, slot) in self.x
             )
-            min_h = int(staff_df.loc[staff_df.StaffID == sid, "WeeklyMinH"].values[0])
-            max_h = int(staff_df.loc[staff_df.StaffID == sid, "WeeklyMaxH"].values[0])
-            self.problem += self.h[sid] >= min_h
-            self.problem += self.h[sid] <= max_h
+            self.min_rows[sid] = self.h[sid] >= min_hours[i]
+            self.max_rows[sid] = self.h[sid] <= max_hours[i]
+            self.problem += self.min_rows[sid]
+            self.problem += self.max_rows[sid]
 
         for sid in self.staff_ids:
             for date in self.dates_unique:
-                slots_day = ["10-14", "14-18", "18-22", "22-26"]
-                self.problem += pulp.lpSum(
-                    self.x[(sid, date, slot)] for slot in slots_day if (date, slot) in self.slot_keys
-                ) <= 2
+                day_keys = [(sid, *self.slot_keys[t]) for t in time_index.day_slots.get(date, [])]
+                self.problem += pulp.lpSum(self.x[key] for key in day_keys if key in self.x) <= MAX_SLOTS_PER_DAY
 
         for sid in self.staff_ids:
             for date in self.dates_unique:
-                slots_day = ["10-14", "14-18", "18-22", "22-26"]
-                for slot in slots_day:
-                    if (date, slot) in self.slot_keys:
-                        self.problem += self.x[(sid, date, slot)] <= self.y[(sid, date)]
-            self.problem += pulp.lpSum(self.y[(sid, date)] for date in self.dates_unique) <= 6
+                for t in time_index.day_slots.get(date, []):
+                    key = (sid, *self.slot_keys[t])
+                    if key in self.x:
+                        self.problem += self.x[key] <= self.y[(sid, date)]
+            self.problem += pulp.lpSum(self.y[(sid, date)] for date in self.dates_unique) <= MAX_WORKED_DAYS
 
         self.problem += self.mean_h * len(self.staff_ids) == pulp.lpSum(self.h[sid] for sid in self.staff_ids)
 
@@ -166,55 +295,511 @@ class ShiftSchedulingModel(BaseModel):
             self.problem += self.dev[sid] >= self.mean_h - self.h[sid]
 
     def _set_objective(self) -> None:
-        total_cost = pulp.lpSum(
-            self.cost[(sid, date, slot)] * self.x[(sid, date, slot)]
-            for sid in self.staff_ids
-            for (date, slot) in self.slot_keys
-        )
-        wish_sat = pulp.lpSum(
-            self.wish.get((sid, date, slot), 0) * self.x[(sid, date, slot)]
-            for sid in self.staff_ids
-            for (date, slot) in self.slot_keys
-        )
+        total_cost = pulp.lpSum(self.cost[key] * var for key, var in self.x.items())
+        wish_sat = pulp.lpSum(self.wish.get(key, 0) * var for key, var in self.x.items())
         fairness = pulp.lpSum(self.dev[sid] for sid in self.staff_ids)
 
-        self.problem += W_COST * total_cost - W_WISH * wish_sat + W_FAIR * fairness
+        self.problem += self.w_cost * total_cost - self.w_wish * wish_sat + self.w_fair * fairness
 
-    def solve(self, *, msg: bool = True, time_limit: int = 300) -> None:
-        if not hasattr(self, "x"):
+    # ------------------------------------------------------------------
+    # Incremental edits
+    # ------------------------------------------------------------------
+    def set_availability(self, staff_id: str, date: str, slot: str, availability: str) -> None:
+        """Change one availability cell (``"NG"``, ``"OK"`` or ``"Wish"``) of a built model."""
+        if availability not in ("NG", "OK", "Wish"):
+            raise ValueError(f"Invalid availability {availability!r}")
+        i, t = self._edit_position(staff_id, (date, slot))
+        self._edit_data("availability", {"StaffID": staff_id, "Date": date, "Slot": slot}, "Availability", availability)
+        self.data.compact.availability[i, t] = AVAILABILITY_CODES[availability]
+
+        key = (staff_id, date, slot)
+        available = availability != "NG"
+        minor = self.data.staff["Age"].iloc[i] < 18
+        self.avail_matrix[i, t] = self.avail_ok[key] = int(available)
+        self.wish_matrix[i, t] = self.wish[key] = int(availability == "Wish")
+        self.feasible_matrix[i, t] = available and not (minor and self.time.is_night[t])
+
+        if not self.x_exists[i, t]:
+            # the sparse build has no variable for this cell yet
+            self._needs_rebuild = self._needs_rebuild or self.feasible_matrix[i, t]
+            return
+        coef = self.w_cost * self.cost_matrix[i, t] - self.w_wish * self.wish_matrix[i, t]
+        if self.backend == "matrix":
+            col = self.matrix.x_index[i, t]
+            self.matrix.obj[col] = coef
+            row = self.matrix.avail_rows[i, t]
+            if row >= 0:
+                self.matrix.sense[row], self.matrix.rhs[row] = ("L", 1) if available else ("E", 0)
+            else:
+                self.matrix.fixed[col] = not self.feasible_matrix[i, t]
+        else:
+            var = self.x[key]
+            self.problem.objective[var] = coef
+            row = self.avail_rows.get(key)
+            if row is not None:
+                row.sense = pulp.LpConstraintLE if available else pulp.LpConstraintEQ
+                row.changeRHS(1 if available else 0)
+            else:
+                var.upBound = 1 if self.feasible_matrix[i, t] else 0
+
+    def set_demand(self, date: str, slot: str, required: int) -> None:
+        """Change the ``RequiredCnt`` of one slot of a built model."""
+        self._require_built()
+        self._edit_data("demand", {"Date": date, "Slot": slot}, "RequiredCnt", required)
+        if (date, slot) not in self.time.slot_ids:
+            # a new slot adds variables and rows
+            self.data.invalidate()
+            self._needs_rebuild = True
+            return
+        self.data.compact.required[self.time.slot_ids[(date, slot)]] = required
+        self.req[(date, slot)] = required
+        if self.backend == "matrix":
+            self.matrix.rhs[self.matrix.demand_rows[self.time.slot_ids[(date, slot)]]] = required
+        else:
+            self.demand_rows[(date, slot)].changeRHS(required)
+
+    def set_hours_bounds(
+        self, staff_id: str, *, min_hours: Optional[int] = None, max_hours: Optional[int] = None
+    ) -> None:
+        """Change ``WeeklyMinH`` and/or ``WeeklyMaxH`` of one staff member of a built model.
+
+        Raises ``ValueError`` for a negative bound or a minimum above the maximum.
+        """
+        i, _ = self._edit_position(staff_id, None)
+        row = self.data.staff.loc[self.data.staff["StaffID"] == staff_id].iloc[0]
+        new_min = row["WeeklyMinH"] if min_hours is None else min_hours
+        new_max = row["WeeklyMaxH"] if max_hours is None else max_hours
+        if new_min < 0 or new_max < 0:
+            raise ValueError(f"Weekly hour bounds of {staff_id!r} must not be negative")
+        if new_min > new_max:
+            raise ValueError(f"WeeklyMinH {new_min} is above WeeklyMaxH {new_max} for {staff_id!r}")
+        for column, value in (("WeeklyMinH", min_hours), ("WeeklyMaxH", max_hours)):
+            if value is None:
+                continue
+            self._edit_data("staff", {"StaffID": staff_id}, column, value)
+            bounds = self.data.compact.min_hours if column == "WeeklyMinH" else self.data.compact.max_hours
+            bounds[i] = value
+            if self.backend == "matrix":
+                rows = self.matrix.min_rows if column == "WeeklyMinH" else self.matrix.max_rows
+                self.matrix.rhs[rows[i]] = value
+            else:
+                rows = self.min_rows if column == "WeeklyMinH" else self.max_rows
+                rows[staff_id].changeRHS(value)
+
+    def resolve(self, *, msg: bool = True, time_limit: int = 300, warm_start: bool = False) -> None:
+        """Re-solve after edits without rebuilding the model.
+
+        The edits only change rows, bounds and objective coefficients of the
+        built model, so this saves the build but CBC still solves from
+        scratch and dominates the time (see ``benchmarks/bench_incremental.py``).
+        With ``warm_start=True`` the previous schedule, less the cells the
+        edits made infeasible, is passed as the MIP start.  Edits that add
+        variables (a new slot, or a newly feasible cell of a sparse model)
+        rebuild the model first.
+        """
+        if not hasattr(self, "x") and not hasattr(self, "matrix"):
+            self.solve(msg=msg, time_limit=time_limit, warm_start=warm_start)
+            return
+        previous = self._assigned_keys() if warm_start else []
+        if self._needs_rebuild:
+            for name in ("x", "matrix"):
+                if hasattr(self, name):
+                    delattr(self, name)
+            BaseModel.__init__(self, "ShiftScheduling")
             self.build()
-        super().solve(msg=msg, time_limit=time_limit)
+            self._needs_rebuild = False
+        if not warm_start:
+            self._solve_backend(msg=msg, time_limit=time_limit, assign=None)
+            return
+
+        assign = np.zeros(self.feasible_matrix.shape, dtype=bool)
+        staff_pos = {sid: i for i, sid in enumerate(self.staff_ids)}
+        for sid, date, slot in previous:
+            if sid in staff_pos and (date, slot) in self.time.slot_ids:
+                assign[staff_pos[sid], self.time.slot_ids[(date, slot)]] = True
+        self._solve_backend(msg=msg, time_limit=time_limit, assign=assign & self.feasible_matrix & self.x_exists)
+
+    def _require_built(self) -> None:
+        if not hasattr(self, "x") and not hasattr(self, "matrix"):
+            raise RuntimeError("Call build() before editing the model")
+
+    def _edit_position(self, staff_id: str, slot_key: Optional[Tuple[str, str]]) -> Tuple[int, int]:
+        self._require_built()
+        try:
+            i = self.staff_ids.index(staff_id)
+        except ValueError:
+            raise KeyError(f"Unknown staff {staff_id!r}") from None
+        if slot_key is None:
+            return i, -1
+        if slot_key not in self.time.slot_ids:
+            raise KeyError(f"Unknown slot {slot_key!r}")
+        return i, self.time.slot_ids[slot_key]
+
+    def _edit_data(self, table: str, match: Dict[str, object], column: str, value: object) -> None:
+        """Set one cell of an input table, copying the data before the first edit.
+
+        The copy keeps the caller's frames unchanged.  The caller applies
+        the same edit to the ``data.compact`` arrays.
+        """
+        if not self._owns_data:
+            self.data = self.data.copy()
+            self._owns_data = True
+        setattr(self.data, table, _set_cell(getattr(self.data, table), match, column, value))
+
+    def _assigned_keys(self) -> List[Tuple[str, str, str]]:
+        if self.backend == "matrix" and not hasattr(self.matrix, "values"):
+            return []
+        x_vals, _, _ = self._solution_values()
+        return [key for key, value in zip(self.x_keys, x_vals.tolist()) if value > 0.5]
+
+    # ------------------------------------------------------------------
+    # Solving
+    # ------------------------------------------------------------------
+    def solve(self, *, msg: bool = True, time_limit: int = 300, warm_start: bool = False) -> None:
+        if not hasattr(self, "x") and not hasattr(self, "matrix"):
+            self.build()
+        assign = self._run_heuristic().assign if warm_start else None
+        self._solve_backend(msg=msg, time_limit=time_limit, assign=assign)
+
+    def iter_incumbents(
+        self,
+        *,
+        msg: bool = False,
+        time_limit: int = 300,
+        target_gap: Optional[float] = None,
+        stall: Optional[float] = None,
+        snapshot_interval: float = SNAPSHOT_INTERVAL,
+        warm_start: bool = False,
+    ) -> Iterator[Incumbent]:
+        """Solve and yield every improved incumbent (see :mod:`shift_optimizer.anytime`).
+
+        The search stops once the gap is at most ``target_gap``, after
+        ``stall`` seconds without improvement or after ``time_limit``
+        seconds.  When an incumbent with a schedule is yielded the model
+        holds it, so ``results()`` returns it; once the generator is
+        exhausted the model holds the final solution and status.  Supports
+        the compact engine with ``cpsat`` or with ``cbc`` on the matrix
+        backend.  With ``warm_start`` the greedy schedule is yielded first
+        if it is feasible.
+        """
+        if self.engine != "compact" or self.aggregate:
+            raise ValueError("Anytime solving needs the compact engine without aggregation")
+        if self.solver != "cpsat" and (self.solver, self.backend) != ("cbc", "matrix"):
+            raise ValueError("Anytime solving supports cpsat, or cbc with the matrix backend")
+        if not hasattr(self, "x") and not hasattr(self, "matrix"):
+            self.build()
+        self._heuristic_only = False
+        rule = StopRule(time_limit, target_gap, stall)
+        hint = None
+        if warm_start:
+            draft = self._run_heuristic()
+            hint = draft.assign
+            if draft.feasible and rule.improve(draft.objective):
+                self._store_solution(self._incumbent_solution(hint, rule), msg=False)
+                yield rule.incumbent(hint)
+
+        if self.solver == "cpsat":
+            search = iter_cpsat(
+                self,
+                rule,
+                msg=msg,
+                hint=hint,
+                max_slots_per_day=MAX_SLOTS_PER_DAY,
+                max_worked_days=MAX_WORKED_DAYS,
+            )
+        else:
+            initial = None if hint is None else self._warm_start_values(hint)
+            search = iter_cbc(self, rule, msg=msg, snapshot_interval=snapshot_interval, initial=initial)
+        with self.metrics.phase("anytime"):
+            while True:
+                try:
+                    incumbent = next(search)
+                except StopIteration as stop:
+                    solution = stop.value
+                    break
+                if incumbent.assign is not None:
+                    self._store_solution(self._incumbent_solution(incumbent.assign, rule), msg=False)
+                yield incumbent
+        self._store_solution(solution, msg)
+
+    def solve_anytime(self, callback=None, **options) -> Optional[Incumbent]:
+        """Run :meth:`iter_incumbents`, calling ``callback`` with each incumbent; return the last one."""
+        last = None
+        for incumbent in self.iter_incumbents(**options):
+            last = incumbent
+            if callback is not None:
+                callback(incumbent)
+        return last
+
+    def _incumbent_solution(self, assign: np.ndarray, rule: StopRule) -> AnytimeSolution:
+        return AnytimeSolution(assign, pulp.LpStatusOptimal, pulp.LpSolutionIntegerFeasible, rule.stats())
+
+    def _solve_backend(self, *, msg: bool, time_limit: int, assign: Optional[np.ndarray]) -> None:
+        """Solve with the selected solver, starting from ``assign`` if given."""
+        self._heuristic_only = False
+        if self.engine == "patterns":
+            self._solve_patterns(msg=msg, time_limit=time_limit, initial=assign)
+            return
+        if self.aggregate and self.solver != "cpsat":
+            start = time.perf_counter()
+            if self._solve_aggregated(msg=msg, time_limit=time_limit):
+                return
+            # the full model gets what is left of the time limit
+            time_limit = max(1, int(np.ceil(time_limit - (time.perf_counter() - start))))
+        if self.solver == "cpsat":
+            self._solve_cpsat(msg=msg, time_limit=time_limit, hint=assign)
+            return
+        initial = None if assign is None else self._warm_start_values(assign)
+        if self.solver == "highs":
+            with self.metrics.phase("highs"):
+                if self.backend == "matrix":
+                    stats = solve_highs(self.matrix, self.problem, msg=msg, time_limit=time_limit, gap=self.gap)
+                    self._check_status()
+                else:
+                    stats = {}
+                    super().solve(
+                        msg=msg,
+                        time_limit=time_limit,
+                        warm_start=assign is not None,
+                        solver="highs",
+                        threads=self.threads,
+                        gap=self.gap,
+                    )
+            self._record_solver(None, msg, stats)
+            return
+
+        log_path = None
+        if self.metrics.profile:
+            fd, log_path = tempfile.mkstemp(suffix="-cbc.log")
+            os.close(fd)
+        try:
+            with self.metrics.phase("cbc"):
+                if self.backend == "matrix":
+                    solve_cbc(
+                        self.matrix,
+                        self.problem,
+                        msg=msg,
+                        time_limit=time_limit,
+                        initial=initial,
+                        log_path=log_path,
+                        metrics=self.metrics,
+                        threads=self.threads,
+                        gap=self.gap,
+                    )
+                    self._check_status()
+                else:
+                    # PuLP writes the MPS file inside solve(); time it separately
+                    self.problem.writeMPS = self.metrics.timed(self.problem.writeMPS, "write_mps")
+                    try:
+                        super().solve(
+                            msg=msg and log_path is None,
+                            time_limit=time_limit,
+                            warm_start=assign is not None,
+                            log_path=log_path,
+                            threads=self.threads,
+                            gap=self.gap,
+                        )
+                    finally:
+                        del self.problem.writeMPS
+            self._record_solver(log_path, msg)
+        finally:
+            if log_path is not None:
+                os.unlink(log_path)
+
+    def _solve_aggregated(self, *, msg: bool, time_limit: int) -> bool:
+        """Solve over staff classes; return ``False`` if the full model is needed."""
+        with self.metrics.phase("aggregate"):
+            classes = staff_classes(self)
+            solution = solve_aggregated(
+                self,
+                classes,
+                max_slots_per_day=MAX_SLOTS_PER_DAY,
+                max_worked_days=MAX_WORKED_DAYS,
+                msg=msg,
+                time_limit=time_limit,
+                solver=self.solver,
+                threads=self.threads,
+                gap=self.gap,
+            )
+        if solution.assign is None and solution.status != pulp.LpStatusInfeasible:
+            # the phases then show both "aggregate" and the full solve
+            return False
+        # the aggregated model is a relaxation, so its infeasibility is final
+        self._store_solution(solution, msg)
+        return True
+
+    def _solve_patterns(self, *, msg: bool, time_limit: int, initial: Optional[np.ndarray]) -> None:
+        with self.metrics.phase("patterns"):
+            solution = solve_patterns(
+                self,
+                max_slots_per_day=MAX_SLOTS_PER_DAY,
+                max_worked_days=MAX_WORKED_DAYS,
+                msg=msg,
+                time_limit=time_limit,
+                solver=self.solver,
+                threads=self.threads,
+                gap=self.gap,
+                initial=initial,
+            )
+        self._store_solution(solution, msg)
+
+    def _solve_cpsat(self, *, msg: bool, time_limit: int, hint: Optional[np.ndarray]) -> None:
+        with self.metrics.phase("cpsat"):
+            solution = solve_cpsat(
+                self,
+                max_slots_per_day=MAX_SLOTS_PER_DAY,
+                max_worked_days=MAX_WORKED_DAYS,
+                msg=msg,
+                time_limit=time_limit,
+                threads=self.threads,
+                gap=self.gap,
+                hint=hint,
+            )
+        self._store_solution(solution, msg)
+
+    def _store_solution(self, solution, msg: bool) -> None:
+        """Take the schedule and status of a solver that does not run on the compact model."""
+        assign = solution.assign
+        if assign is None:
+            assign = np.zeros(self.feasible_matrix.shape, dtype=bool)
+        # store the schedule as MILP variable values so results() reads it as usual
+        values = self._warm_start_values(assign)
+        if self.backend == "matrix":
+            self.matrix.values = values
+        self.problem.assignStatus(solution.status, solution.sol_status)
+        self._check_status()
+        self._record_solver(None, msg, solution.stats)
+
+    def _record_solver(self, log_path: Optional[str], msg: bool, stats: Optional[Dict[str, object]] = None) -> None:
+        solver = {
+            "status": pulp.LpStatus[self.problem.status],
+            "solution": pulp.LpSolution[self.problem.sol_status],
+        }
+        if log_path is not None:
+            with open(log_path) as fh:
+                log = fh.read()
+            if msg:
+                print(log)
+            solver.update(parse_cbc_log(log))
+        solver.update(stats or {})
+        self.metrics.solver = solver
+
+    def solve_heuristic(self) -> HeuristicSolution:
+        """Build a draft schedule with the greedy heuristic only, without CBC."""
+        if not hasattr(self, "staff_ids"):
+            with self.metrics.phase("prepare_parameters"):
+                self._prepare_parameters()
+        self._heuristic_only = True
+        return self._run_heuristic()
+
+    def _run_heuristic(self, initial: Optional[np.ndarray] = None) -> HeuristicSolution:
+        with self.metrics.phase("heuristic"):
+            self.heuristic = greedy_schedule(
+                self,
+                max_slots_per_day=MAX_SLOTS_PER_DAY,
+                max_worked_days=MAX_WORKED_DAYS,
+                initial=initial,
+            )
+        return self.heuristic
+
+    def _warm_start_values(self, assign: np.ndarray) -> Optional[np.ndarray]:
+        """Set ``assign`` and the implied h/y/dev values as the MIP start.
+
+        Returns the full column vector for the matrix backend.
+        """
+        hours = (assign * self.time.hours).sum(axis=1)
+        mean_h = hours.mean() if len(hours) else 0.0
+        dev = np.abs(hours - mean_h)
+        worked = np.zeros((len(self.staff_ids), len(self.dates_unique)), dtype=bool)
+        for d, date in enumerate(self.dates_unique):
+            day = self.time.day_slots.get(date, [])
+            worked[:, d] = assign[:, day].any(axis=1)
+        x_start = assign[self.x_exists]
+
+        if self.backend == "matrix":
+            initial = np.zeros(self.matrix.num_cols)
+            initial[self.matrix.x_cols] = x_start
+            initial[self.matrix.h_cols] = hours
+            initial[self.matrix.mean_col] = mean_h
+            initial[self.matrix.dev_cols] = dev
+            initial[self.matrix.y_cols.ravel()] = worked.ravel()
+            return initial
+
+        for key, value in zip(self.x_keys, x_start.tolist()):
+            self.x[key].setInitialValue(int(value))
+        for i, sid in enumerate(self.staff_ids):
+            self.h[sid].setInitialValue(int(hours[i]))
+            self.dev[sid].setInitialValue(float(dev[i]))
+            for d, date in enumerate(self.dates_unique):
+                self.y[(sid, date)].setInitialValue(int(worked[i, d]))
+        self.mean_h.setInitialValue(float(mean_h))
+        return None
+
+    def _solution_values(self) -> Tuple[np.ndarray, np.ndarray, float]:
+        """Return the ``x`` values (aligned with ``x_keys``), hours and objective."""
+        if self._heuristic_only:
+            heuristic = self.heuristic
+            return heuristic.assign[self.x_exists].astype(float), heuristic.hours.astype(float), heuristic.objective
+        if self.backend == "matrix":
+            values = self.matrix.values
+            return values[self.matrix.x_cols], values[self.matrix.h_cols], self.matrix.objective_value()
+        # x and h are created in x_keys / staff order
+        x_vals = np.array([var.varValue for var in self.x.values()], dtype=float)
+        h_vals = np.array([var.varValue for var in self.h.values()], dtype=float)
+        return x_vals, h_vals, pulp.value(self.problem.objective)
 
     def results(self) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
-        staff_df = self.data.staff
-        demand_df = self.data.demand
+        with self.metrics.phase("results"):
+            return self._results()
+
+    def assignment(self) -> np.ndarray:
+        """Staff x slot boolean matrix of the solved (or heuristic) schedule."""
+        x_vals, _, _ = self._solution_values()
+        assign = np.zeros(self.x_exists.shape, dtype=bool)
+        assign[self.x_exists] = x_vals > 0.5
+        return assign
 
-        staff_ids = list(staff_df["StaffID"])
-        slot_keys = [(row.Date, row.Slot) for row in demand_df.itertuples()]
+    def _results(self) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        x_vals, h_vals, objective = self._solution_values()
+
+        assign = np.zeros(self.x_exists.shape, dtype=bool)
+        assign[self.x_exists] = x_vals > 0.5
 
         # Schedule sheet
-        records = []
-        for sid in staff_ids:
-            for date, slot in slot_keys:
-                if pulp.value(self.x[(sid, date, slot)]) > 0.5:
-                    records.append({"StaffID": sid, "Date": date, "Slot": slot, "Assigned": 1})
-        schedule_df = pd.DataFrame(records)
+        staff_pos, slot_pos = np.nonzero(assign)
+        slot_keys = np.array(self.slot_keys, dtype=object).reshape(-1, 2)
+        schedule_df = pd.DataFrame(
+            {
+                "StaffID": np.asarray(self.staff_ids, dtype=object)[staff_pos],
+                "Date": slot_keys[slot_pos, 0],
+                "Slot": slot_keys[slot_pos, 1],
+                "Assigned": np.ones(len(staff_pos), dtype=np.int64),
+            }
+        )
 
         # Hours sheet
-        hours_df = pd.DataFrame({"StaffID": staff_ids, "Hours": [pulp.value(self.h[sid]) for sid in staff_ids]})
+        hours_df = pd.DataFrame({"StaffID": self.staff_ids, "Hours": h_vals.tolist()})
 
         # KPI sheet
-        kpi_df = pd.DataFrame([{"ObjectiveValue": pulp.value(self.problem.objective)}])
+        kpi_df = pd.DataFrame(
+            [
+                {
+                    "ObjectiveValue": objective,
+                    "TotalCost": int((self.cost_matrix * assign).sum()),
+                    "WishSatisfied": int((self.wish_matrix * assign).sum()),
+                    "Fairness": float(np.abs(h_vals - h_vals.mean()).sum()) if len(h_vals) else 0.0,
+                }
+            ]
+        )
 
         return schedule_df, hours_df, kpi_df
 
 
-def export_to_excel(schedule_df: pd.DataFrame, hours_df: pd.DataFrame, kpi_df: pd.DataFrame, output_path: str) -> None:
-    """Write results to an Excel file."""
-    with pd.ExcelWriter(output_path, engine="xlsxwriter") as writer:
-        schedule_df.to_excel(writer, sheet_name="Schedule", index=False)
-        hours_df.to_excel(writer, sheet_name="Hours", index=False)
-        kpi_df.to_excel(writer, sheet_name="KPI", index=False)
-
-    print(f"Written solution to {output_path}")
+def _set_cell(df: pd.DataFrame, match: Dict[str, object], column: str, value: object) -> pd.DataFrame:
+    """Set ``column`` on the rows matching ``match``, appending a row if none match."""
+    mask = np.logical_and.reduce([df[key].to_numpy() == val for key, val in match.items()])
+    if mask.any():
+        df.loc[mask, column] = value
+        return df
+    return pd.concat([df, pd.DataFrame([{**match, column: value}])], ignore_index=True)
 
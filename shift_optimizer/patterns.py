@@ -0,0 +1,328 @@
+"""Pattern-based (set-partitioning) engine solved by column generation.
+
+Instead of one binary per staff and slot, the master problem picks one
+*pattern* per staff member: a set of slots that already satisfies all of
+that person's rules (availability, under-18 night ban, WeeklyMinH and
+WeeklyMaxH, the daily slot cap and the worked-day cap).  Only demand
+coverage and fairness remain as master rows::
+
+    min  sum c_p l_p + w_fair * sum dev_i + PENALTY * sum short_t
+    s.t. sum_{p of i} l_p = 1                      (one pattern per staff)
+         sum_p a_pt l_p + short_t >= RequiredCnt_t (coverage)
+         n * mean_h = sum_p H_p l_p
+         dev_i >= +-(sum_{p of i} H_p l_p - mean_h)
+
+Its LP relaxation is much tighter than the compact model's, where the
+``x <= worked`` links and the deviation rows are nearly free.  Patterns
+are generated by :class:`PatternPricer`, an exact dynamic program over
+(day, worked days, hours) for each staff member.  It uses the duals of
+the restricted master LP and finds the pattern with the most negative
+reduced cost.  When no pattern prices out, or the time share for column
+generation is used up, the master is solved once more with integer
+``l`` over the generated patterns (price-and-branch).
+
+The shortfall columns ``short_t`` keep the restricted master feasible
+before enough patterns exist.  A final schedule with a shortfall is
+reported as infeasible if the converged LP also needs it, and as not
+solved otherwise.
+"""
+
+import itertools
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import numpy as np
+import pulp
+
+from .solvers import pulp_solver
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .model import ShiftSchedulingModel
+
+# share of the time limit spent generating columns before the integer solve
+PRICING_TIME_SHARE = 0.5
+MAX_ITERATIONS = 500
+# reduced cost below which a pattern enters the master
+TOLERANCE = 1e-6
+# staff priced together; bounds the size of the DP arrays
+PRICING_CHUNK = 256
+
+
+@dataclass
+class PatternSolution:
+    """Schedule chosen from the generated patterns with its PuLP status codes."""
+
+    assign: Optional[np.ndarray]
+    status: int
+    sol_status: int
+    stats: Dict[str, object] = field(default_factory=dict)
+
+
+class PatternPricer:
+    """Exact pricing of weekly patterns by dynamic programming.
+
+    For each group of slots (a day with the daily limits, or a single slot
+    on a date without them) the options are the slot subsets a person may
+    work there.  The DP runs over (worked days, hours) states for a chunk
+    of staff at once; hours above WeeklyMaxH are cut off at the end, as
+    they can only grow.
+    """
+
+    def __init__(self, model: "ShiftSchedulingModel", *, max_slots_per_day: int, max_worked_days: int) -> None:
+        compact = model.data.compact
+        time_index = model.time
+        self.slot_hours = time_index.hours.astype(np.int64)
+        self.min_hours = compact.min_hours.astype(np.int64)
+        self.max_hours = compact.max_hours.astype(np.int64)
+        feasible = model.feasible_matrix
+
+        days = [time_index.day_slots.get(date, []) for date in model.dates_unique]
+        limited = np.zeros(len(self.slot_hours), dtype=bool)
+        for day in days:
+            limited[day] = True
+        groups = [(day, max_slots_per_day, 1) for day in days if day]
+        groups += [([t], 1, 0) for t in np.nonzero(~limited)[0].tolist()]
+        self.max_worked = min(max_worked_days, len(days))
+
+        # per group: (O, cap) slot ids padded with -1, option hours, worked flag, staff x O allowed
+        self.groups = []
+        for slots, cap, worked in groups:
+            combos = [()] + [
+                combo for size in range(1, min(cap, len(slots)) + 1) for combo in itertools.combinations(slots, size)
+            ]
+            width = max(len(combo) for combo in combos) or 1
+            option_slots = np.full((len(combos), width), -1, dtype=np.int64)
+            for o, combo in enumerate(combos):
+                option_slots[o, : len(combo)] = combo
+            used = option_slots >= 0
+            option_hours = np.where(used, self.slot_hours[option_slots], 0).sum(axis=1)
+            allowed = np.where(used[None, :, :], feasible[:, option_slots], True).all(axis=2)
+            self.groups.append((option_slots, used, option_hours, worked, allowed))
+
+    def price(self, weights: np.ndarray) -> Tuple[np.ndarray, List[Optional[np.ndarray]]]:
+        """Cheapest feasible pattern of each staff member under staff x slot ``weights``.
+
+        Returns the pattern costs and slot indices, ``inf`` / ``None`` for
+        staff without a feasible pattern.
+        """
+        n_staff = weights.shape[0]
+        costs = np.full(n_staff, np.inf)
+        patterns: List[Optional[np.ndarray]] = [None] * n_staff
+        for first in range(0, n_staff, PRICING_CHUNK):
+            rows = np.arange(first, min(first + PRICING_CHUNK, n_staff))
+            chunk_costs, chunk_patterns = self._price_rows(weights, rows)
+            costs[rows] = chunk_costs
+            patterns[first : first + len(rows)] = chunk_patterns
+        return costs, patterns
+
+    def _price_rows(self, weights: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, List[Optional[np.ndarray]]]:
+        n_rows = len(rows)
+        n_worked = self.max_worked
+        max_h = int(self.max_hours[rows].max(initial=0))
+        # cost[s, w, h]: cheapest partial pattern with w worked days and h hours
+        cost = np.full((n_rows, n_worked + 1, max_h + 1), np.inf)
+        cost[:, 0, 0] = 0.0
+        choices = []
+        for option_slots, used, option_hours, worked, allowed in self.groups:
+            option_cost = np.where(used[None, :, :], weights[rows][:, option_slots], 0.0).sum(axis=2)
+            option_cost[~allowed[rows]] = np.inf
+            candidates = np.full((len(option_hours), *cost.shape), np.inf)
+            for o, hours in enumerate(option_hours.tolist()):
+                w = worked if o else 0
+                if hours > max_h:
+                    continue
+                candidates[o, :, w:, hours:] = cost[:, : n_worked + 1 - w, : max_h + 1 - hours]
+                candidates[o] += option_cost[:, o, None, None]
+            choice = np.argmin(candidates, axis=0)
+            cost = np.take_along_axis(candidates, choice[None], axis=0)[0]
+            choices.append(choice)
+
+        hours_axis = np.arange(max_h + 1)
+        in_bounds = (hours_axis[None, :] >= self.min_hours[rows, None]) & (hours_axis[None, :] <= self.max_hours[rows, None])
+        final = np.where(in_bounds[:, None, :], cost, np.inf).reshape(n_rows, -1)
+        best = np.argmin(final, axis=1)
+        costs = final[np.arange(n_rows), best]
+        w, h = np.divmod(best, max_h + 1)
+
+        chosen = np.zeros((n_rows, len(self.slot_hours)), dtype=bool)
+        index = np.arange(n_rows)
+        for (option_slots, used, option_hours, worked, _), choice in zip(reversed(self.groups), reversed(choices)):
+            o = choice[index, w, h]
+            slots = option_slots[o]
+            hit = used[o]
+            chosen[np.repeat(index, hit.sum(axis=1)), slots[hit]] = True
+            w = w - worked * (o > 0)
+            h = h - option_hours[o]
+        patterns = [np.nonzero(chosen[k])[0] if np.isfinite(costs[k]) else None for k in range(n_rows)]
+        return costs, patterns
+
+
+class _Master:
+    """Restricted master problem; patterns are added as new columns of its rows."""
+
+    def __init__(self, model: "ShiftSchedulingModel", penalty: float) -> None:
+        n_staff, n_slots = model.feasible_matrix.shape
+        self.score = model.w_cost * model.cost_matrix - model.w_wish * model.wish_matrix
+        self.slot_hours = model.time.hours
+        self.problem = pulp.LpProblem("ShiftSchedulingPatterns", pulp.LpMinimize)
+        self.short = [pulp.LpVariable(f"short_{t}", lowBound=0) for t in range(n_slots)]
+        mean_h = pulp.LpVariable("mean_h", lowBound=0)
+        dev = [pulp.LpVariable(f"dev_{i}", lowBound=0) for i in range(n_staff)]
+        self.lam: List[pulp.LpVariable] = []
+        self.owner: List[int] = []
+        self.slots: List[np.ndarray] = []
+        self._seen: set = set()
+
+        self.convexity = [pulp.LpConstraint(sense=pulp.LpConstraintEQ, rhs=1) for _ in range(n_staff)]
+        self.coverage = [short + 0 >= model.req[key] for short, key in zip(self.short, model.slot_keys)]
+        self.mean_row = n_staff * mean_h == 0
+        self.lower = [dev[i] + mean_h >= 0 for i in range(n_staff)]
+        self.upper = [dev[i] - mean_h >= 0 for i in range(n_staff)]
+        for name, rows in (("one", self.convexity), ("cover", self.coverage), ("lo", self.lower), ("up", self.upper)):
+            for k, row in enumerate(rows):
+                self.problem.addConstraint(row, f"{name}_{k}")
+        self.problem.addConstraint(self.mean_row, "mean")
+        self.problem += model.w_fair * pulp.lpSum(dev) + penalty * pulp.lpSum(self.short)
+
+    def __len__(self) -> int:
+        return len(self.lam)
+
+    def add(self, staff: int, slots: np.ndarray) -> bool:
+        """Add a pattern unless it is already a column."""
+        key = (staff, slots.tobytes())
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        var = pulp.LpVariable(f"l_{len(self.lam)}", lowBound=0, upBound=1)
+        hours = float(self.slot_hours[slots].sum())
+        self.problem.objective.addterm(var, float(self.score[staff, slots].sum()))
+        self.convexity[staff].addterm(var, 1)
+        for t in slots.tolist():
+            self.coverage[t].addterm(var, 1)
+        self.mean_row.addterm(var, -hours)
+        self.lower[staff].addterm(var, -hours)
+        self.upper[staff].addterm(var, hours)
+        self.lam.append(var)
+        self.owner.append(staff)
+        self.slots.append(slots)
+        return True
+
+    def solve(self, *, integer: bool, solver: str, msg: bool, time_limit: int, threads, gap) -> None:
+        for var in self.lam:
+            var.cat = pulp.LpInteger if integer else pulp.LpContinuous
+        self.problem.solve(pulp_solver(solver, msg=msg, time_limit=time_limit, threads=threads, gap=gap))
+
+    def duals(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Convexity duals, coverage duals per slot and hour duals per staff member."""
+        convexity = np.array([row.pi for row in self.convexity], dtype=float)
+        coverage = np.array([row.pi for row in self.coverage], dtype=float)
+        hours = (
+            -np.array([row.pi for row in self.lower], dtype=float)
+            + np.array([row.pi for row in self.upper], dtype=float)
+            - self.mean_row.pi
+        )
+        return convexity, coverage, hours
+
+
+def solve_patterns(
+    model: "ShiftSchedulingModel",
+    *,
+    max_slots_per_day: int,
+    max_worked_days: int,
+    msg: bool,
+    time_limit: int,
+    solver: str = "cbc",
+    threads: Optional[int] = None,
+    gap: Optional[float] = None,
+    initial: Optional[np.ndarray] = None,
+) -> PatternSolution:
+    """Generate patterns for a prepared ``model`` and choose one per staff member.
+
+    ``initial`` is an optional staff x slot schedule (e.g. the greedy
+    heuristic) whose rows seed the master.
+    """
+    start = time.perf_counter()
+    deadline = start + time_limit
+    n_staff, n_slots = model.feasible_matrix.shape
+    score = (model.w_cost * model.cost_matrix - model.w_wish * model.wish_matrix).astype(float)
+    slot_hours = model.time.hours
+    # a shortfall costs more than any schedule change that could avoid it
+    penalty = 1.0 + np.abs(score).max(initial=0.0) * n_staff + model.w_fair * slot_hours.sum() * n_staff
+    stats: Dict[str, object] = {}
+
+    pricer = PatternPricer(model, max_slots_per_day=max_slots_per_day, max_worked_days=max_worked_days)
+    master = _Master(model, penalty)
+    _, patterns = pricer.price(score)
+    missing = [model.staff_ids[i] for i, pattern in enumerate(patterns) if pattern is None]
+    if missing:
+        # somebody's own rules cannot be met, so the full model is infeasible too
+        stats["no_pattern"] = missing
+        return PatternSolution(None, pulp.LpStatusInfeasible, pulp.LpSolutionInfeasible, stats)
+    for i, pattern in enumerate(patterns):
+        master.add(i, pattern)
+    if initial is not None:
+        compact = model.data.compact
+        hours = (initial * slot_hours).sum(axis=1)
+        for i in np.nonzero((hours >= compact.min_hours) & (hours <= compact.max_hours))[0].tolist():
+            master.add(i, np.nonzero(initial[i])[0])
+
+    iterations = 0
+    converged = False
+    lp_bound = None
+    while iterations < MAX_ITERATIONS:
+        iterations += 1
+        remaining = max(1, int(deadline - time.perf_counter()))
+        master.solve(integer=False, solver=solver, msg=False, time_limit=remaining, threads=threads, gap=None)
+        if master.problem.status != pulp.LpStatusOptimal:
+            break
+        lp_bound = pulp.value(master.problem.objective)
+        convexity_dual, cover_dual, hour_dual = master.duals()
+        weights = score - cover_dual[None, :] - hour_dual[:, None] * slot_hours[None, :]
+        costs, patterns = pricer.price(weights)
+        added = 0
+        for i in np.nonzero(costs - convexity_dual < -TOLERANCE)[0].tolist():
+            added += master.add(i, patterns[i])
+        if not added:
+            converged = True
+            break
+        if time.perf_counter() > start + PRICING_TIME_SHARE * time_limit:
+            break
+    stats.update(
+        patterns=len(master),
+        iterations=iterations,
+        converged=converged,
+        pricing_seconds=time.perf_counter() - start,
+    )
+    if lp_bound is not None:
+        stats["lp_bound"] = lp_bound
+
+    remaining = max(1, int(deadline - time.perf_counter()))
+    master.solve(integer=True, solver=solver, msg=msg, time_limit=remaining, threads=threads, gap=gap)
+    problem = master.problem
+    if problem.sol_status not in (pulp.LpSolutionOptimal, pulp.LpSolutionIntegerFeasible):
+        return PatternSolution(None, problem.status, problem.sol_status, stats)
+
+    shortfall = sum(var.varValue or 0.0 for var in master.short)
+    if shortfall > 0.5:
+        stats["shortfall"] = shortfall
+        if converged and lp_bound is not None and lp_bound > penalty / 2:
+            # the LP optimum over all patterns needs a shortfall too
+            return PatternSolution(None, pulp.LpStatusInfeasible, pulp.LpSolutionInfeasible, stats)
+        return PatternSolution(None, pulp.LpStatusNotSolved, pulp.LpSolutionNoSolutionFound, stats)
+
+    assign = np.zeros((n_staff, n_slots), dtype=bool)
+    for var, staff, slots in zip(master.lam, master.owner, master.slots):
+        if (var.varValue or 0.0) > 0.5:
+            assign[staff, slots] = True
+    hours = (assign * slot_hours).sum(axis=1)
+    objective = float((score * assign).sum() + model.w_fair * np.abs(hours - hours.mean()).sum())
+    stats["objective"] = objective
+    sol_status = pulp.LpSolutionIntegerFeasible
+    if converged and lp_bound is not None:
+        # the converged LP bounds every schedule, not just those in the master
+        stats["best_bound"] = lp_bound
+        stats["gap"] = abs(objective - lp_bound) / max(1.0, abs(objective))
+        if stats["gap"] <= 1e-9:
+            sol_status = pulp.LpSolutionOptimal
+    return PatternSolution(assign, pulp.LpStatusOptimal, sol_status, stats)
@@ -0,0 +1,142 @@
+"""Server-side storage and paging of solved results.
+
+The Dash app keeps finished results here under their job id and only
+sends the id to the browser.  Tables are then served one page at a time
+through :func:`query_table`, which applies the ``filter_query`` and
+``sort_by`` of a ``dash_table.DataTable`` with ``page_action="custom"``.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# finished results kept in memory; the least recently used are dropped first
+MAX_STORED_RESULTS = 64
+PAGE_SIZE = 50
+
+# "{column} op value" parts of a DataTable filter_query, joined by " && "
+_FILTER_PART = re.compile(r"^\s*\{(?P<column>[^}]+)\}\s+(?P<op>\S+)\s*(?P<value>.*?)\s*$")
+_OPERATORS = {
+    "=": "eq",
+    "s=": "eq",
+    "i=": "eq",
+    "eq": "eq",
+    "!=": "ne",
+    "ne": "ne",
+    "<": "lt",
+    "lt": "lt",
+    "<=": "le",
+    "le": "le",
+    ">": "gt",
+    "gt": "gt",
+    ">=": "ge",
+    "ge": "ge",
+    "contains": "contains",
+    "icontains": "contains",
+    "scontains": "contains",
+    "datestartswith": "startswith",
+}
+
+
+class ResultStore:
+    """Thread-safe LRU map from job id to its result tables."""
+
+    def __init__(self, max_entries: int = MAX_STORED_RESULTS) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, pd.DataFrame]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, key: str, tables: Dict[str, pd.DataFrame]) -> None:
+        with self._lock:
+            self._entries[key] = tables
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key: Optional[str]) -> Optional[Dict[str, pd.DataFrame]]:
+        """Tables stored under ``key``, or ``None`` if unknown or evicted."""
+        with self._lock:
+            tables = self._entries.get(key) if key is not None else None
+            if tables is not None:
+                self._entries.move_to_end(key)
+            return tables
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+def parse_filter(filter_query: Optional[str]) -> List[Tuple[str, str, object]]:
+    """Split a DataTable ``filter_query`` into ``(column, operator, value)`` terms.
+
+    Operators are normalized to ``eq``, ``ne``, ``lt``, ``le``, ``gt``,
+    ``ge``, ``contains`` and ``startswith``; unsupported parts are skipped.
+    """
+    terms = []
+    for part in (filter_query or "").split(" && "):
+        match = _FILTER_PART.match(part)
+        if not match or match["op"] not in _OPERATORS:
+            continue
+        value: object = match["value"]
+        if value[:1] in ("'", '"', "`") and value[-1:] == value[:1] and len(value) > 1:
+            value = value[1:-1]
+        else:
+            try:
+                value = float(value)
+            except ValueError:
+                pass
+        terms.append((match["column"], _OPERATORS[match["op"]], value))
+    return terms
+
+
+def _mask(column: pd.Series, op: str, value: object) -> np.ndarray:
+    if op in ("contains", "startswith"):
+        text = column.astype(str)
+        found = text.str.contains(str(value), regex=False) if op == "contains" else text.str.startswith(str(value))
+        return found.to_numpy()
+    if isinstance(value, float) and not pd.api.types.is_numeric_dtype(column):
+        # "S01" typed into a text column arrives unquoted; compare as text
+        value = f"{value:g}"
+    if isinstance(value, str) and pd.api.types.is_numeric_dtype(column):
+        return np.zeros(len(column), dtype=bool)
+    compare = {"eq": "__eq__", "ne": "__ne__", "lt": "__lt__", "le": "__le__", "gt": "__gt__", "ge": "__ge__"}
+    return getattr(column, compare[op])(value).to_numpy()
+
+
+def query_table(
+    table: pd.DataFrame,
+    *,
+    filter_query: Optional[str] = None,
+    sort_by: Optional[Sequence[Dict[str, str]]] = None,
+    page: Optional[int] = 0,
+    page_size: int = PAGE_SIZE,
+) -> Tuple[pd.DataFrame, int]:
+    """Return one page of ``table`` after filtering and sorting, and the page count.
+
+    ``sort_by`` is the DataTable list of ``{"column_id", "direction"}``.
+    Filters on unknown columns are ignored.
+    """
+    mask = np.ones(len(table), dtype=bool)
+    for column, op, value in parse_filter(filter_query):
+        if column in table.columns:
+            mask &= _mask(table[column], op, value)
+    view = table[mask] if not mask.all() else table
+
+    sort_by = [item for item in sort_by or [] if item.get("column_id") in table.columns]
+    if sort_by:
+        view = view.sort_values(
+            [item["column_id"] for item in sort_by],
+            ascending=[item.get("direction", "asc") == "asc" for item in sort_by],
+            kind="stable",
+        )
+    page_count = max(1, -(-len(view) // page_size))
+    start = min(page or 0, page_count - 1) * page_size
+    return view.iloc[start : start + page_size], page_count
@@ -0,0 +1,495 @@
+"""Long-running local optimizer service with an HTTP/JSON API.
+
+Each CLI call pays for importing pandas and PuLP, parsing the workbook and
+validating it again.  ``shift-optimizer serve`` does that once: inputs stay
+in memory as validated :class:`InputData` (with their ``compact`` arrays
+built) keyed by path and modification time or by table content, finished
+results stay in a :class:`ResultStore`, and solves run on a thread pool.
+Model building is NumPy work and CBC, HiGHS and CP-SAT solve outside the
+GIL, so threads are enough and share the cached inputs.
+
+Submitted jobs are dispatched in batches: the dispatcher waits up to
+``batch_window`` seconds after a request for more to arrive, and jobs of
+one batch (or of a solve already running) that have the same input and
+settings share a single solve.  Endpoints, all JSON:
+
+``POST /jobs``
+    ``{"input": "store.xlsx"}`` or ``{"tables": {"Staff": [...],
+    "Availability": [...], "Demand": [...], "Wages": [...]}}`` plus any of
+    :data:`OPTIONS`.  Returns ``202`` with the job id and status.
+``GET /jobs/<id>``
+    Status and timings, and the KPI row once done.
+``GET /jobs/<id>/result?wait=<seconds>``
+    Schedule, Hours and KPI records, waiting up to ``wait`` seconds for the
+    job to finish; ``202`` with the status if it has not.
+``DELETE /jobs/<id>``
+    Cancel a queued job.
+``GET /health``
+    Job, input, result and batch counters.
+
+The server binds to ``127.0.0.1`` by default and has no authentication.
+"""
+
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from .cache import cache_key, run_model
+from .data import TABLES, InputData, read_data
+from .diagnostics import check_feasibility
+from .jobs import CANCELLED, DONE, FAILED, QUEUED, RUNNING
+from .model import BACKENDS, ENGINES
+from .result_store import ResultStore
+from .solvers import SOLVERS
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8750
+# seconds the dispatcher waits for more requests before starting a batch
+BATCH_WINDOW = 0.02
+MAX_BATCH = 32
+MAX_CACHED_INPUTS = 32
+# finished jobs kept for status and result requests
+MAX_FINISHED_JOBS = 4096
+# longest ``wait`` accepted by the result endpoint
+MAX_WAIT = 300.0
+# request fields passed to run_model and their types
+OPTIONS = {
+    "solver": str,
+    "backend": str,
+    "sparse": bool,
+    "threads": int,
+    "gap": float,
+    "aggregate": bool,
+    "engine": str,
+    "w_cost": float,
+    "w_wish": float,
+    "w_fair": float,
+    "time_limit": int,
+    "warm_start": bool,
+}
+DEFAULT_OPTIONS = {"backend": "matrix", "sparse": True, "time_limit": 300}
+OPTION_CHOICES = {"solver": SOLVERS, "backend": BACKENDS, "engine": ENGINES}
+RESULT_TABLES = ("Schedule", "Hours", "KPI")
+
+
+class RequestError(ValueError):
+    """Raised for a malformed request; ``status`` is the HTTP status to answer with."""
+
+    def __init__(self, message: str, status: HTTPStatus = HTTPStatus.BAD_REQUEST) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class ServiceJob:
+    """State of one request; jobs with the same ``key`` share a solve."""
+
+    id: str
+    key: str
+    status: str = QUEUED
+    submitted: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    cached: bool = False
+    error: Optional[str] = None
+    _done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "cached": self.cached,
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished,
+            "error": self.error,
+        }
+
+
+@dataclass
+class _Solve:
+    data: InputData
+    settings: Dict[str, object]
+
+
+def parse_options(payload: dict) -> Dict[str, object]:
+    """Solve settings of a ``POST /jobs`` body; raises :class:`RequestError` for invalid fields."""
+    unknown = sorted(set(payload) - set(OPTIONS) - {"input", "tables"})
+    if unknown:
+        raise RequestError(f"Unknown field(s) {', '.join(unknown)}")
+    settings = dict(DEFAULT_OPTIONS)
+    for name, kind in OPTIONS.items():
+        value = payload.get(name)
+        if value is None:
+            continue
+        if kind is float and isinstance(value, int) and not isinstance(value, bool):
+            value = float(value)
+        if not isinstance(value, kind) or (kind is int and isinstance(value, bool)):
+            raise RequestError(f"{name} must be of type {kind.__name__}")
+        if name in OPTION_CHOICES and value not in OPTION_CHOICES[name]:
+            raise RequestError(f"Unknown {name} {value!r}; expected one of {', '.join(OPTION_CHOICES[name])}")
+        if name in ("time_limit", "threads") and value <= 0:
+            raise RequestError(f"{name} must be positive")
+        if name == "gap" and value < 0:
+            raise RequestError("gap must not be negative")
+        settings[name] = value
+    return settings
+
+
+def tables_from_records(tables: dict) -> InputData:
+    """Build :class:`InputData` from ``{table: [records]}``; Wages is a single record."""
+    if not isinstance(tables, dict):
+        raise RequestError("tables must map table names to lists of records")
+    missing = [name for name in TABLES if name not in tables]
+    if missing:
+        raise RequestError(f"tables is missing {', '.join(missing)}")
+    frames = {name: pd.DataFrame.from_records(tables[name]) for name in TABLES}
+    if len(frames["Wages"]) != 1:
+        raise RequestError("Wages must have exactly one record")
+    return InputData(frames["Staff"], frames["Availability"], frames["Demand"], frames["Wages"].iloc[0])
+
+
+def result_payload(tables: Dict[str, pd.DataFrame]) -> Dict[str, list]:
+    """Result tables as ``{table: [records]}``, the layout of the JSON export."""
+    return {name: json.loads(table.to_json(orient="records")) for name, table in tables.items()}
+
+
+class OptimizerService:
+    """Warm input and result caches in front of a pool of solver threads.
+
+    ``workers`` solves run at once (default: the CPU count).  Requests
+    are grouped for ``batch_window`` seconds, up to ``max_batch`` per
+    batch, and identical ones are solved once.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: Optional[int] = None,
+        batch_window: float = BATCH_WINDOW,
+        max_batch: int = MAX_BATCH,
+        max_inputs: int = MAX_CACHED_INPUTS,
+        max_results: int = 256,
+    ) -> None:
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.max_inputs = max_inputs
+        self.results = ResultStore(max_results)
+        self.workers = workers or os.cpu_count() or 1
+        self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="solve")
+        self._jobs: "OrderedDict[str, ServiceJob]" = OrderedDict()
+        self._inputs: "OrderedDict[str, Tuple[InputData, List[str]]]" = OrderedDict()
+        # jobs attached to each queued or running solve
+        self._waiting: Dict[str, List[ServiceJob]] = {}
+        self._queue: "queue.Queue[Optional[Tuple[ServiceJob, _Solve]]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._counts = {"solves": 0, "batches": 0, "shared": 0, "input_hits": 0, "input_misses": 0}
+        self._dispatcher = threading.Thread(target=self._dispatch, name="solve-dispatch", daemon=True)
+        self._dispatcher.start()
+
+    def _cached_input(self, key: str) -> Optional[Tuple[InputData, List[str]]]:
+        with self._lock:
+            entry = self._inputs.get(key)
+            if entry is not None:
+                self._inputs.move_to_end(key)
+            self._counts["input_hits" if entry is not None else "input_misses"] += 1
+            return entry
+
+    def _store_input(self, key: str, data: InputData) -> Tuple[InputData, List[str]]:
+        data.validate()
+        entry = (data, [violation.message for violation in check_feasibility(data)])
+        with self._lock:
+            self._inputs[key] = entry
+            while len(self._inputs) > self.max_inputs:
+                self._inputs.popitem(last=False)
+        return entry
+
+    def load_input(self, payload: dict) -> Tuple[InputData, List[str]]:
+        """Return the validated input of a request and its feasibility violations.
+
+        Workbooks are keyed by resolved path and modification time and
+        inline tables by a hash of their JSON, so repeated requests skip
+        reading and validation.
+        """
+        if ("input" in payload) == ("tables" in payload):
+            raise RequestError("Give exactly one of input and tables")
+        if "input" in payload:
+            path = Path(str(payload["input"])).resolve()
+            try:
+                key = f"{path}:{path.stat().st_mtime_ns}"
+            except OSError as exc:
+                raise RequestError(f"Cannot read input: {exc}") from exc
+            entry = self._cached_input(key)
+            return entry if entry is not None else self._store_input(key, read_data(path))
+        key = hashlib.sha256(json.dumps(payload["tables"], sort_keys=True, default=str).encode()).hexdigest()
+        entry = self._cached_input(key)
+        return entry if entry is not None else self._store_input(key, tables_from_records(payload["tables"]))
+
+    def submit(self, payload: dict) -> ServiceJob:
+        """Validate a ``POST /jobs`` body and queue its solve.
+
+        Raises :class:`RequestError` for a malformed request and, with
+        status 422, for an input that fails the feasibility checks.
+        """
+        settings = parse_options(payload)
+        try:
+            data, violations = self.load_input(payload)
+        except RequestError:
+            raise
+        except (ValueError, OSError) as exc:  # unreadable or malformed input
+            raise RequestError(str(exc)) from exc
+        if violations:
+            raise RequestError("; ".join(violations), HTTPStatus.UNPROCESSABLE_ENTITY)
+
+        job = ServiceJob(uuid.uuid4().hex, cache_key(data, **settings))
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        if job.key in self.results:
+            job.started = job.finished = time.time()
+            job.cached, job.status = True, DONE
+            job._done.set()
+        else:
+            self._queue.put((job, _Solve(data, settings)))
+        return job
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job._done.is_set()]
+        for job_id in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> ServiceJob:
+        """Return the job with ``job_id``; raises ``KeyError`` if unknown."""
+        with self._lock:
+            return self._jobs[job_id]
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> ServiceJob:
+        """Block until the job has finished or ``timeout`` seconds have passed."""
+        job = self.get(job_id)
+        job._done.wait(timeout)
+        return job
+
+    def result(self, job_id: str) -> Optional[Dict[str, pd.DataFrame]]:
+        """Schedule, Hours and KPI tables of a finished job, ``None`` if not done or evicted."""
+        job = self.get(job_id)
+        return self.results.get(job.key) if job.status == DONE else None
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued job; returns ``False`` once its solve has started."""
+        with self._lock:
+            job = self._jobs[job_id]
+            if job.status != QUEUED:
+                return False
+            job.status, job.finished = CANCELLED, time.time()
+        job._done.set()
+        return True
+
+    def stats(self) -> dict:
+        """Job counts by status, cache sizes and dispatch counters."""
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+            counts = dict(self._counts)
+            inputs = len(self._inputs)
+        return {
+            "jobs": {status: statuses.count(status) for status in (QUEUED, RUNNING, DONE, FAILED, CANCELLED)},
+            "inputs": inputs,
+            "results": len(self.results),
+            **counts,
+        }
+
+    def _dispatch(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+
+            with self._lock:
+                self._counts["batches"] += 1
+                for job, solve in batch:
+                    if job.status == CANCELLED:
+                        continue
+                    if job.key in self._waiting:
+                        self._waiting[job.key].append(job)
+                        self._counts["shared"] += 1
+                        continue
+                    self._waiting[job.key] = [job]
+                    self._counts["solves"] += 1
+                    self._pool.submit(self._solve, job.key, solve)
+
+    def _solve(self, key: str, solve: _Solve) -> None:
+        with self._lock:
+            jobs = [job for job in self._waiting[key] if job.status == QUEUED]
+            if not jobs:  # every request for it was cancelled
+                del self._waiting[key]
+                return
+            started = time.time()
+            for job in jobs:
+                job.status, job.started = RUNNING, started
+        error = None
+        try:
+            if key not in self.results:
+                result, solved = run_model(solve.data, msg=False, **solve.settings)
+                if solved:
+                    self.results.put(key, dict(zip(RESULT_TABLES, result)))
+                else:
+                    error = "The solver found no schedule within the time limit"
+        except Exception as exc:  # reported on the jobs
+            error = f"{type(exc).__name__}: {exc}"
+
+        with self._lock:
+            # requests that arrived while solving were attached to the same list
+            jobs = [job for job in self._waiting.pop(key) if job.status in (QUEUED, RUNNING)]
+            finished = time.time()
+            for job in jobs:
+                job.started = job.started or started
+                job.finished, job.error = finished, error
+                job.status = FAILED if error else DONE
+        for job in jobs:
+            job._done.set()
+
+    def shutdown(self) -> None:
+        """Stop dispatching and wait for running solves to finish."""
+        self._queue.put(None)
+        self._dispatcher.join()
+        self._pool.shutdown(wait=True)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service: OptimizerService
+    quiet = True
+
+    def _send(self, status: HTTPStatus, body: dict) -> None:
+        content = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _job_route(self) -> Tuple[Optional[str], Optional[str], dict]:
+        url = urlsplit(self.path)
+        parts = [part for part in url.path.split("/") if part]
+        if len(parts) in (2, 3) and parts[0] == "jobs":
+            return parts[1], (parts[2] if len(parts) == 3 else None), parse_qs(url.query)
+        return None, None, {}
+
+    def _status_body(self, job: ServiceJob) -> dict:
+        body = job.to_dict()
+        result = self.service.result(job.id)
+        if result is not None:
+            body["KPI"] = result_payload({"KPI": result["KPI"]})["KPI"][0]
+        return body
+
+    def do_GET(self) -> None:
+        if urlsplit(self.path).path == "/health":
+            self._send(HTTPStatus.OK, self.service.stats())
+            return
+        job_id, action, query = self._job_route()
+        if job_id is None or action not in (None, "result"):
+            self._send(HTTPStatus.NOT_FOUND, {"error": f"No route for GET {self.path}"})
+            return
+        try:
+            if action is None:
+                self._send(HTTPStatus.OK, self._status_body(self.service.get(job_id)))
+                return
+            try:
+                wait = min(float(query.get("wait", ["0"])[0]), MAX_WAIT)
+            except ValueError:
+                self._send(HTTPStatus.BAD_REQUEST, {"error": "wait must be a number of seconds"})
+                return
+            job = self.service.wait(job_id, wait)
+            result = self.service.result(job_id)
+        except KeyError:
+            self._send(HTTPStatus.NOT_FOUND, {"error": f"Unknown job {job_id}"})
+            return
+        if result is not None:
+            self._send(HTTPStatus.OK, {"id": job.id, "status": job.status, **result_payload(result)})
+        elif job.status in (QUEUED, RUNNING):
+            self._send(HTTPStatus.ACCEPTED, job.to_dict())
+        elif job.status == DONE:
+            self._send(HTTPStatus.GONE, {**job.to_dict(), "error": "Result was evicted; submit the job again"})
+        else:
+            self._send(HTTPStatus.CONFLICT, job.to_dict())
+
+    def do_POST(self) -> None:
+        if urlsplit(self.path).path != "/jobs":
+            self._send(HTTPStatus.NOT_FOUND, {"error": f"No route for POST {self.path}"})
+            return
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if not isinstance(payload, dict):
+                raise RequestError("Request body must be a JSON object")
+            job = self.service.submit(payload)
+        except json.JSONDecodeError as exc:
+            self._send(HTTPStatus.BAD_REQUEST, {"error": f"Invalid JSON: {exc}"})
+            return
+        except RequestError as exc:
+            self._send(exc.status, {"error": str(exc)})
+            return
+        self._send(HTTPStatus.ACCEPTED, {"id": job.id, "status": job.status})
+
+    def do_DELETE(self) -> None:
+        job_id, action, _ = self._job_route()
+        if job_id is None or action is not None:
+            self._send(HTTPStatus.NOT_FOUND, {"error": f"No route for DELETE {self.path}"})
+            return
+        try:
+            cancelled = self.service.cancel(job_id)
+            job = self.service.get(job_id)
+        except KeyError:
+            self._send(HTTPStatus.NOT_FOUND, {"error": f"Unknown job {job_id}"})
+            return
+        self._send(HTTPStatus.OK if cancelled else HTTPStatus.CONFLICT, job.to_dict())
+
+    def log_message(self, format: str, *args) -> None:
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(
+    service: OptimizerService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, *, quiet: bool = True
+) -> ThreadingHTTPServer:
+    """HTTP server answering the service endpoints; ``port=0`` picks a free port."""
+    handler = type("Handler", (_Handler,), {"service": service, "quiet": quiet})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, *, quiet: bool = True, **options) -> None:
+    """Run the service until interrupted; ``options`` are passed to :class:`OptimizerService`."""
+    service = OptimizerService(**options)
+    server = make_server(service, host, port, quiet=quiet)
+    print(f"Serving on http://{server.server_address[0]}:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
@@ -0,0 +1,62 @@
+"""Selection of the MILP/CP solver used by :class:`ShiftSchedulingModel`.
+
+``cbc`` is the CBC binary bundled with PuLP.  ``highs`` uses PuLP's HiGHS
+interfaces (``highspy`` or the ``highs`` executable) for the expression
+build and ``scipy.optimize.milp``, which ships HiGHS, for the matrix build.
+``cpsat`` solves the same model with OR-Tools CP-SAT (see
+:mod:`shift_optimizer.cpsat`).  ``threads`` and ``gap`` (relative MIP gap)
+are passed to whichever solver is selected.
+"""
+
+import importlib.util
+from typing import List, Optional
+
+import pulp
+
+SOLVERS = ("cbc", "highs", "cpsat")
+
+
+def check_solver(name: str) -> None:
+    if name not in SOLVERS:
+        raise ValueError(f"Unknown solver {name!r}; expected one of {', '.join(SOLVERS)}")
+
+
+def pulp_solver(
+    name: str,
+    *,
+    msg: bool,
+    time_limit: int,
+    threads: Optional[int] = None,
+    gap: Optional[float] = None,
+    warm_start: bool = False,
+    log_path: Optional[str] = None,
+) -> pulp.LpSolver:
+    """Return the PuLP solver object for ``name`` (``"cbc"`` or ``"highs"``)."""
+    if name == "cbc":
+        return pulp.PULP_CBC_CMD(
+            msg=msg, timeLimit=time_limit, threads=threads, gapRel=gap, warmStart=warm_start, logPath=log_path
+        )
+    if name == "highs":
+        options = dict(msg=msg, timeLimit=time_limit, threads=threads, gapRel=gap)
+        solver = pulp.HiGHS(**options)
+        if solver.available():
+            return solver
+        solver = pulp.HiGHS_CMD(warmStart=warm_start, **options)
+        if solver.available():
+            return solver
+        raise RuntimeError("HiGHS is not available; install highspy or put the highs executable on PATH")
+    raise ValueError(f"Solver {name!r} has no PuLP interface")
+
+
+def available_solvers(backend: str = "pulp") -> List[str]:
+    """Solvers usable with ``backend`` in the current environment."""
+    names = ["cbc"]
+    if backend == "matrix":
+        highs = importlib.util.find_spec("scipy") is not None
+    else:
+        highs = pulp.HiGHS().available() or pulp.HiGHS_CMD().available()
+    if highs:
+        names.append("highs")
+    if importlib.util.find_spec("ortools") is not None:
+        names.append("cpsat")
+    return names
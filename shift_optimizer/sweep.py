@@ -0,0 +1,93 @@
+"""Objective weight sweeps and the cost / wish / fairness Pareto frontier."""
+
+import copy
+import itertools
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pulp
+
+from .data import InputData
+from .matrix import objective_coefficients
+from .metrics import ModelMetrics
+from .model import ShiftSchedulingModel
+
+Weights = Tuple[float, float, float]
+
+# prepared model shared by the tasks of one worker process
+_PREPARED: Optional[ShiftSchedulingModel] = None
+
+
+def weight_grid(w_cost: Iterable[float], w_wish: Iterable[float], w_fair: Iterable[float]) -> List[Weights]:
+    """Return every ``(w_cost, w_wish, w_fair)`` combination."""
+    return list(itertools.product(w_cost, w_wish, w_fair))
+
+
+def _init_worker(prepared: ShiftSchedulingModel) -> None:
+    global _PREPARED
+    _PREPARED = prepared
+
+
+def _solve_weights(weights: Weights, time_limit: int) -> dict:
+    """Re-weight the shared matrix model and solve it."""
+    model = copy.copy(_PREPARED)
+    model.w_cost, model.w_wish, model.w_fair = weights
+    model.metrics = ModelMetrics()
+    model.problem = pulp.LpProblem("ShiftScheduling", pulp.LpMinimize)
+    model.matrix = copy.copy(_PREPARED.matrix)
+    model.matrix.obj = objective_coefficients(model, model.matrix.num_cols, model.matrix.dev_cols)
+
+    start = time.perf_counter()
+    model.solve(msg=False, time_limit=time_limit)
+    runtime = time.perf_counter() - start
+
+    row = {"w_cost": weights[0], "w_wish": weights[1], "w_fair": weights[2]}
+    row["Status"] = pulp.LpStatus[model.problem.status]
+    if model.problem.status == pulp.LpStatusOptimal:
+        _, _, kpi_df = model.results()
+        row.update(kpi_df.iloc[0].to_dict())
+    row["Runtime"] = runtime
+    return row
+
+
+def pareto_front(table: pd.DataFrame) -> np.ndarray:
+    """Mask of rows not dominated in (TotalCost min, WishSatisfied max, Fairness min)."""
+    points = np.column_stack([table["TotalCost"], -table["WishSatisfied"], table["Fairness"]]).astype(float)
+    valid = ~np.isnan(points).any(axis=1)
+    front = valid.copy()
+    for i in np.nonzero(valid)[0]:
+        other = points[valid]
+        dominated = (other <= points[i]).all(axis=1) & (other < points[i]).any(axis=1)
+        front[i] = not dominated.any()
+    return front
+
+
+def run_sweep(
+    data: InputData,
+    weights: Sequence[Weights],
+    *,
+    processes: Optional[int] = None,
+    time_limit: int = 300,
+    sparse: bool = True,
+) -> pd.DataFrame:
+    """Solve ``data`` for each weight combination in a process pool.
+
+    Parameters and the constraint matrix are prepared once and shared with
+    the workers; each run only replaces the objective vector.  Returns one
+    row per combination with its KPIs and a ``Pareto`` flag.
+    """
+    prepared = ShiftSchedulingModel(data, sparse=sparse, backend="matrix")
+    prepared.build()
+
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(prepared,)) as pool:
+        rows = list(pool.map(_solve_weights, weights, itertools.repeat(time_limit)))
+
+    table = pd.DataFrame(rows)
+    for column in ("ObjectiveValue", "TotalCost", "WishSatisfied", "Fairness"):
+        if column not in table:
+            table[column] = np.nan
+    table["Pareto"] = pareto_front(table)
+    return table
@@ -0,0 +1,89 @@
+"""Time index of the planning horizon built from the Demand sheet."""
+
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Late-night work (22:00-05:00) is paid at the night rate and banned for minors.
+NIGHT_START = 22
+NIGHT_END = 5
+
+
+def parse_slot(slot: str) -> Tuple[int, int]:
+    """Return the start and end hour of a ``"HH-HH"`` slot label.
+
+    End hours past midnight are written as ``24 + h`` (e.g. ``"22-26"``).
+    """
+    try:
+        start, end = (int(part) for part in str(slot).split("-"))
+    except ValueError:
+        raise ValueError(f"Invalid slot label {slot!r}; expected 'start-end' hours such as '10-14'") from None
+    if end <= start:
+        raise ValueError(f"Invalid slot label {slot!r}; end hour must be after start hour")
+    return start, end
+
+
+@dataclass
+class TimeIndex:
+    """Integer ids and lookup tables for the (date, slot) pairs of a horizon.
+
+    Slot ``t`` is ``slot_keys[t]``; the arrays below are indexed by ``t``.
+    ``abs_start``/``abs_end`` are its bounds in hours from midnight of the
+    first date, so a 22-26 slot ends at 02:00 of the next day.
+    """
+
+    slot_keys: List[Tuple[str, str]]
+    slot_ids: Dict[Tuple[str, str], int]
+    dates: List[str]
+    day_slots: Dict[str, List[int]]
+    slot_date: np.ndarray
+    start: np.ndarray
+    end: np.ndarray
+    hours: np.ndarray
+    is_night: np.ndarray
+    is_holiday: np.ndarray
+    abs_start: np.ndarray
+    abs_end: np.ndarray
+
+    @classmethod
+    def from_demand(cls, demand: pd.DataFrame) -> "TimeIndex":
+        """Build the index from the ``Date``/``Slot`` columns of ``demand``."""
+        slot_keys = list(zip(demand["Date"], demand["Slot"]))
+        slot_ids = {key: t for t, key in enumerate(slot_keys)}
+
+        bounds = {slot: parse_slot(slot) for slot in demand["Slot"].unique()}
+        start = np.array([bounds[slot][0] for _, slot in slot_keys], dtype=np.int64)
+        end = np.array([bounds[slot][1] for _, slot in slot_keys], dtype=np.int64)
+        night = (end > NIGHT_START) | (start < NIGHT_END)
+
+        date_codes, dates = pd.factorize(demand["Date"])
+        day = pd.to_datetime(pd.Series(dates), format="%Y-%m-%d")
+        holiday = (day.dt.weekday == 6).to_numpy()
+
+        # slots of each day in chronological order
+        order = np.lexsort((start, date_codes))
+        day_slots: Dict[str, List[int]] = {date: [] for date in dates}
+        for t in order.tolist():
+            day_slots[dates[date_codes[t]]].append(t)
+
+        offset = ((day - day.min()).dt.days.to_numpy() * 24)[date_codes]
+
+        return cls(
+            slot_keys=slot_keys,
+            slot_ids=slot_ids,
+            dates=list(dates),
+            day_slots=day_slots,
+            slot_date=date_codes.astype(np.int64),
+            start=start,
+            end=end,
+            hours=end - start,
+            is_night=night,
+            is_holiday=holiday[date_codes],
+            abs_start=offset + start,
+            abs_end=offset + end,
+        )
+
+    def __len__(self) -> int:
+        return len(self.slot_keys)
@@ -0,0 +1,10 @@
+import pytest
+
+from shift_optimizer import InputData
+from shift_optimizer.generator import generate_instance
+
+
+@pytest.fixture(scope="session")
+def small_input() -> InputData:
+    """A 20-staff, one-week store that CBC solves to optimality in well under a second."""
+    return generate_instance(20, seed=1).validate()
@@ -0,0 +1,39 @@
+import glob
+import tempfile
+
+import pulp
+import pytest
+
+from shift_optimizer import ShiftSchedulingModel
+
+
+def _tmp_files():
+    return set(glob.glob(f"{tempfile.gettempdir()}/*-pulp.*"))
+
+
+def test_cbc_anytime_runs_to_optimality(small_input):
+    blocking = ShiftSchedulingModel(small_input, backend="matrix", sparse=True)
+    blocking.build()
+    blocking.solve(msg=False)
+
+    before = _tmp_files()
+    model = ShiftSchedulingModel(small_input, backend="matrix", sparse=True)
+    model.build()
+    incumbents = list(model.iter_incumbents(time_limit=60, snapshot_interval=60))
+
+    assert incumbents
+    assert model.problem.sol_status == pulp.LpSolutionOptimal
+    expected = blocking.results()[2]["ObjectiveValue"].iloc[0]
+    assert incumbents[-1].objective == pytest.approx(expected, rel=1e-6)
+    assert model.results()[2]["ObjectiveValue"].iloc[0] == pytest.approx(expected, rel=1e-6)
+    assert _tmp_files() <= before
+
+
+def test_cbc_anytime_close_cleans_up(small_input):
+    before = _tmp_files()
+    model = ShiftSchedulingModel(small_input, backend="matrix", sparse=True)
+    model.build()
+    incumbents = model.iter_incumbents(time_limit=60)
+    next(incumbents)
+    incumbents.close()
+    assert _tmp_files() <= before
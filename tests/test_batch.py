@@ -0,0 +1,26 @@
+import pandas as pd
+import pytest
+
+from shift_optimizer.batch import SUMMARY_FILE, run_batch
+from shift_optimizer.generator import generate_instance, write_instance
+
+
+def test_batch_solves_and_resumes(tmp_path):
+    inputs = tmp_path / "inputs"
+    inputs.mkdir()
+    for seed in range(4):
+        write_instance(generate_instance(10, seed=seed), inputs / f"store{seed}.xlsx")
+
+    table = run_batch([inputs], tmp_path / "out", processes=2, time_limit=60, progress=False, backend="matrix")
+    assert sorted(table["Store"]) == [f"store{seed}" for seed in range(4)]
+    assert (table["Status"] == "Optimal").all()
+    assert all((tmp_path / "out" / f"store{seed}.xlsx").exists() for seed in range(4))
+    assert pd.read_csv(tmp_path / "out" / SUMMARY_FILE)["Error"].isna().all()
+
+    # a rerun skips the solved stores and solves the one whose input changed
+    write_instance(generate_instance(10, seed=9), inputs / "store0.xlsx")
+    rerun = run_batch([inputs], tmp_path / "out", processes=2, time_limit=60, progress=False, backend="matrix")
+    changed = rerun.set_index("Store")["ObjectiveValue"] != table.set_index("Store")["ObjectiveValue"]
+    assert changed.tolist() == [True, False, False, False]
+    # skipped stores keep the runtime recorded in the summary
+    assert rerun["Runtime"].iloc[1:].tolist() == pytest.approx(table["Runtime"].iloc[1:].tolist())
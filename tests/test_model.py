@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from shift_optimizer import ShiftSchedulingModel
+from shift_optimizer.data import CompactInput
+
+BUILDS = [
+    dict(backend="pulp", sparse=False),
+    dict(backend="pulp", sparse=True),
+    dict(backend="matrix", sparse=False),
+    dict(backend="matrix", sparse=True),
+]
+
+
+def _solve(data, **options):
+    model = ShiftSchedulingModel(data, **options)
+    model.build()
+    model.solve(msg=False, time_limit=60)
+    return model
+
+
+def _objective(model) -> float:
+    return model.results()[2]["ObjectiveValue"].iloc[0]
+
+
+@pytest.fixture(scope="module")
+def expected(small_input) -> float:
+    return _objective(_solve(small_input, **BUILDS[0]))
+
+
+@pytest.mark.parametrize("options", BUILDS[1:], ids=lambda options: f"{options['backend']}-sparse{options['sparse']}")
+def test_builds_reach_the_same_objective(small_input, expected, options):
+    assert _objective(_solve(small_input, **options)) == pytest.approx(expected, rel=1e-6)
+
+
+@pytest.mark.parametrize("warm_start", [False, True])
+@pytest.mark.parametrize("backend", ["pulp", "matrix"])
+def test_edit_and_resolve_matches_rebuild(small_input, backend, warm_start):
+    model = _solve(small_input, backend=backend, sparse=True)
+    schedule = model.results()[0]
+    staff_id, date, slot = schedule.iloc[0][["StaffID", "Date", "Slot"]]
+    model.set_availability(staff_id, date, slot, "NG")
+    model.set_demand(date, slot, 0)
+    demand = small_input.demand
+    busiest = demand.loc[demand["RequiredCnt"].idxmax()]
+    model.set_demand(busiest["Date"], busiest["Slot"], int(busiest["RequiredCnt"]) + 1)
+    other = small_input.staff["StaffID"].iloc[-1]
+    model.set_hours_bounds(other, max_hours=int(small_input.staff["WeeklyMaxH"].iloc[-1]) + 4)
+    model.resolve(msg=False, time_limit=60, warm_start=warm_start)
+
+    data = model.data
+    tables = CompactInput.from_tables(data.staff, data.availability, data.demand, data.wages)
+    for name in ("required", "availability", "min_hours", "max_hours"):
+        np.testing.assert_array_equal(getattr(data.compact, name), getattr(tables, name))
+    rebuilt = _solve(model.data, backend=backend, sparse=True)
+    assert _objective(model) == pytest.approx(_objective(rebuilt), rel=1e-6)
+    assert small_input.demand is demand  # the caller's tables are not edited
+    assert not ((model.results()[0][["StaffID", "Date", "Slot"]] == (staff_id, date, slot)).all(axis=1)).any()
+
+
+def test_invalid_hours_bounds_are_rejected(small_input):
+    model = ShiftSchedulingModel(small_input, backend="matrix", sparse=True)
+    model.build()
+    staff_id = small_input.staff["StaffID"].iloc[0]
+    with pytest.raises(ValueError):
+        model.set_hours_bounds(staff_id, min_hours=-1)
+    with pytest.raises(ValueError):
+        model.set_hours_bounds(staff_id, min_hours=30, max_hours=20)
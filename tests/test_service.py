@@ -0,0 +1,83 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from shift_optimizer.generator import write_instance
+from shift_optimizer.service import OptimizerService, make_server
+
+
+@pytest.fixture
+def service():
+    service = OptimizerService(workers=1)
+    server = make_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield service, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+    service.shutdown()
+
+
+def _call(url, body=None, method=None):
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(url, data=data, method=method, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as exc:
+        return exc.code, json.loads(exc.read())
+
+
+def test_submit_and_fetch_result(service, small_input, tmp_path):
+    service, base = service
+    path = tmp_path / "store.xlsx"
+    write_instance(small_input, path)
+
+    statuses, jobs = zip(*(_call(f"{base}/jobs", {"input": str(path), "time_limit": 60}) for _ in range(2)))
+    assert statuses == (202, 202)
+    status, result = _call(f"{base}/jobs/{jobs[0]['id']}/result?wait=60")
+    assert status == 200
+    assert set(result) >= {"Schedule", "Hours", "KPI"}
+    assert len(result["Hours"]) == len(small_input.staff)
+
+    status, job = _call(f"{base}/jobs/{jobs[1]['id']}")
+    assert (status, job["status"]) == (200, "done")
+    assert job["KPI"] == result["KPI"][0]
+    # the second request shared the first one's solve and input
+    stats = _call(f"{base}/health")[1]
+    assert stats["solves"] == 1
+    assert stats["input_hits"] == 1
+
+
+def test_inline_tables(service, small_input):
+    service, base = service
+    tables = {
+        "Staff": json.loads(small_input.staff.to_json(orient="records")),
+        "Availability": json.loads(small_input.availability.to_json(orient="records")),
+        "Demand": json.loads(small_input.demand.to_json(orient="records")),
+        "Wages": [json.loads(small_input.wages.to_json())],
+    }
+    status, job = _call(f"{base}/jobs", {"tables": tables})
+    assert status == 202
+    assert _call(f"{base}/jobs/{job['id']}/result?wait=60")[0] == 200
+
+
+@pytest.mark.parametrize(
+    "body",
+    [{"solver": "nope"}, {"time_limit": -5}, {"gap": -1}, {"threads": 0}, {"engine": "x"}, {"bogus": 1}],
+)
+def test_invalid_requests_are_rejected(service, small_input, tmp_path, body):
+    service, base = service
+    path = tmp_path / "store.xlsx"
+    write_instance(small_input, path)
+    status, reply = _call(f"{base}/jobs", {"input": str(path), **body})
+    assert status == 400
+    assert "error" in reply
+
+
+def test_unknown_job(service):
+    _, base = service
+    assert _call(f"{base}/jobs/missing")[0] == 404
+    assert _call(f"{base}/jobs/missing", method="DELETE")[0] == 404